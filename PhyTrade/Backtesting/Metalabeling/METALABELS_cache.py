@@ -0,0 +1,90 @@
+
+##################################################################################################################
+"""
+Used to cache the barrier labels (see simple/hybrid metalabels) of the full history of a ticker
+
+Barrier labels only depend on the ticker, price selection, barriers and look ahead. They are computed once over the
+full history and attached to the dataset in the dataset registry (dropped when the technical data source files are
+modified), and can optionally be saved to disk along with the version (mtime) of the data they were generated from.
+Data slices then only need to index the cached labels (see MetaLabels_gen).
+"""
+
+# Built-in/Generic Imports
+import os
+
+# Libs
+import numpy as np
+
+# Own modules
+from PhyTrade.Data_Collection_preparation.Fetch_technical_data import fetch_technical_data_artefact, \
+    get_technical_data_mtime
+from PhyTrade.Data_Collection_preparation.Technical_data_store import get_technical_data_folder_path
+from PhyTrade.Backtesting.Metalabeling.METALABELS_gen import gen_barrier_labels
+
+__version__ = '1.1.1'
+__author__ = 'Victor Guillet'
+__date__ = '10/09/2019'
+
+##################################################################################################################
+
+
+def fetch_history_barrier_labels(ticker, data_selection, upper_barrier, lower_barrier, look_ahead, disk_cache=False):
+    """
+    Fetch the barrier labels of every day of the full history of a ticker (days searched up to the look ahead or
+    to the last day of data)
+
+    :param ticker: Ticker of the data
+    :param data_selection: Price selection (column) used
+    :param upper_barrier: Upper barrier (%)
+    :param lower_barrier: Lower barrier (%)
+    :param look_ahead: Look ahead (days)
+    :param disk_cache: Load/save the labels from/to the metalabels folder
+    :return: Shared read-only int numpy array
+    """
+    key = ("barrier_labels", data_selection, upper_barrier, lower_barrier, look_ahead)
+
+    def builder(data):
+        path = get_metalabels_path(ticker, *key[1:])
+        mtime = get_technical_data_mtime(ticker)
+
+        # --> Load labels from disk if generated from the current version of the data
+        if disk_cache and mtime is not None and os.path.exists(path):
+            with np.load(path) as cached_labels:
+                if cached_labels["mtime"] == mtime and len(cached_labels["labels"]) == len(data):
+                    return freeze(cached_labels["labels"])
+
+        labels = gen_history_barrier_labels(np.ascontiguousarray(data[data_selection], dtype=np.float64),
+                                            upper_barrier, lower_barrier, look_ahead)
+
+        if disk_cache and mtime is not None:
+            if not os.path.exists(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+
+            np.savez(path, labels=labels, mtime=mtime)
+
+        return freeze(labels)
+
+    return fetch_technical_data_artefact(ticker, key, builder)
+
+
+def gen_history_barrier_labels(data, upper_barrier, lower_barrier, look_ahead):
+    """
+    Generate the barrier labels of every day of a price history
+
+    :param data: Full history prices
+    :return: int numpy array
+    """
+    days = np.arange(len(data))
+    last_days = np.minimum(days + look_ahead, len(data) - 1) if look_ahead > 0 else np.full(len(days), len(data) - 1)
+
+    return gen_barrier_labels(data, -len(data), days, last_days, upper_barrier, lower_barrier)
+
+
+def get_metalabels_path(ticker, data_selection, upper_barrier, lower_barrier, look_ahead):
+    return get_technical_data_folder_path() + "/Metalabels/" + ticker + '_' + data_selection + '_' \
+        + str(upper_barrier) + '_' + str(lower_barrier) + '_' + str(look_ahead) + ".npz"
+
+
+def freeze(array):
+    array.setflags(write=False)
+    return array
@@ -2,8 +2,16 @@
 ##################################################################################################################
 """
 Used to generate metalabels based on the peak-dip/simple/hybrid methods
+
+The labels are generated with array operations: peaks and dips are located from the sign changes of the day to day
+price differences, and the first barrier hit of every day is searched for in blocks of look ahead days (only for
+the days for which no barrier was hit in the previous blocks). The barrier labels of the full history can be provided
+(see METALABELS_cache), in which case only the days of which the look ahead reaches the end of the data are searched.
 """
 
+# Libs
+import numpy as np
+
 __version__ = '1.1.1'
 __author__ = 'Victor Guillet'
 __date__ = '10/09/2019'
@@ -14,9 +22,15 @@ __date__ = '10/09/2019'
 class MetaLabels_gen:
     def __init__(self, upper_barrier, lower_barrier, look_ahead,
                  data_slice,
-                 metalabel_setting=0):
+                 metalabel_setting=0,
+                 history_barrier_labels=None):
+        """
+        Generate the metalabels of a data slice
 
+        :param history_barrier_labels: Barrier labels of the full history (see METALABELS_cache), searched if None
+        """
         self.data_slice = data_slice
+        self.history_barrier_labels = history_barrier_labels
 
         self.upper_barrier = upper_barrier
         self.lower_barrier = lower_barrier
@@ -43,93 +57,124 @@ class MetaLabels_gen:
                                                          self.look_ahead)
 
     def peak_dip_metalabel_data(self, sliced_data):
+        return gen_peak_dip_labels(sliced_data).tolist()
 
-        labels = [0]*len(sliced_data)
-
-        # --> Initialise trend tracking
-        if sliced_data[1] > sliced_data[0]:
-            trend = "UP"
-        else:
-            trend = "DOWN"
-
-        # --> Locate peaks and dips
-        for i in range(len(sliced_data)-1):
-            if sliced_data[i+1] >= sliced_data[i]:
-                if trend == "UP":
-                    labels[i] = 0
-                else:
-                    labels[i] = -1
-                    trend = "UP"
-
-            elif sliced_data[i+1] <= sliced_data[i]:
-                if trend == "DOWN":
-                    labels[i] = 0
-                else:
-                    labels[i] = 1
-                    trend = "DOWN"
+    def simple_metalabel_data(self, data_slice, upper_barrier, lower_barrier, look_ahead):
+        data = np.asarray(data_slice.data_selection, dtype=np.float64)
+        days = np.arange(len(data_slice.sliced_data_selection))
 
-        return labels
+        # --> Barriers are searched for up to the look ahead (or last day of data)
+        last_days = np.minimum(days + look_ahead, len(data) - 1) if look_ahead > 0 else np.full(len(days), len(data) - 1)
 
-    def simple_metalabel_data(self, data_slice, upper_barrier, lower_barrier, look_ahead):
+        return self.fetch_barrier_labels(data, data_slice.start_index, days, last_days,
+                                         upper_barrier, lower_barrier, look_ahead).tolist()
+
+    def hybrid_metalabel_data(self, data_slice, upper_barrier, lower_barrier, look_ahead):
+        data = np.asarray(data_slice.data_selection, dtype=np.float64)
 
-        sliced_data = data_slice.sliced_data_selection
-        data = data_slice.data_selection
-        
-        labels = []
+        labels = gen_peak_dip_labels(data_slice.sliced_data_selection)
 
-        for i in range(len(sliced_data)):
-            # --> Day tracker
-            j = i + 1
+        # --> Filter peak-dip labels by simple metalabel
+        days = np.flatnonzero(labels)
+        last_days = np.minimum(days + look_ahead, len(data)) if look_ahead > 0 else np.full(len(days), len(data))
 
-            # --> Compute difference from current day
-            percent_difference = (data[data_slice.start_index+j]-data[data_slice.start_index+i])/data[data_slice.start_index+i]*100
+        labels[days] = self.fetch_barrier_labels(data, data_slice.start_index, days, last_days,
+                                                 upper_barrier, lower_barrier, look_ahead)
 
-            # --> While barriers not hit, compute next day percentage difference
-            while not percent_difference >= upper_barrier and not percent_difference <= lower_barrier and j - i != look_ahead:
-                j += 1
-                if j >= len(data):
-                    break
-                percent_difference = (data[data_slice.start_index+j]-data[data_slice.start_index+i])/data[data_slice.start_index+i]*100
+        return labels.tolist()
 
-            if percent_difference >= upper_barrier:
-                labels.append(-1)
-            elif percent_difference <= lower_barrier:
-                labels.append(1)
-            else:
-                labels.append(0)
+    def fetch_barrier_labels(self, data, start_index, days, last_days, upper_barrier, lower_barrier, look_ahead):
+        if self.history_barrier_labels is None:
+            return gen_barrier_labels(data, start_index, days, last_days, upper_barrier, lower_barrier)
+
+        # --> Data index of each day, and last day searched in the full history labels
+        data_indexes = (start_index + days) % len(data)
+        history_last_days = np.minimum(data_indexes + look_ahead, len(data) - 1) if look_ahead > 0 else np.full(len(days), len(data) - 1)
+
+        # --> Search days of which the look ahead differs from the full history one (ie: reaching the end of the data)
+        searched = np.maximum(last_days, days + 1) - days != np.maximum(history_last_days, data_indexes + 1) - data_indexes
+
+        labels = self.history_barrier_labels[data_indexes]
+        labels[searched] = gen_barrier_labels(data, start_index, days[searched], last_days[searched],
+                                              upper_barrier, lower_barrier)
 
         return labels
 
-    def hybrid_metalabel_data(self, data_slice, upper_barrier, lower_barrier, look_ahead):
-        sliced_data = data_slice.sliced_data_selection
-        data = data_slice.data_selection
 
-        labels = self.peak_dip_metalabel_data(sliced_data)
+def gen_peak_dip_labels(sliced_data):
+    """
+    Generate peak-dip labels: -1 on the days preceding a rise after a fall (dips), 1 on the days preceding
+    a fall after a rise (peaks), 0 otherwise
 
-        # --> Filter labels by simple metalabel
-        for i in range(len(labels)):
-            # --> Day tracker
-            j = i + 1
+    :param sliced_data: Prices
+    :return: int numpy array
+    """
+    sliced_data = np.asarray(sliced_data, dtype=np.float64)
 
-            if labels[i] != 0:
-                labels[i] = 0
-                # --> Compute difference from current day
-                percent_difference = (data[data_slice.start_index + j] - data[data_slice.start_index + i]) / data[
-                    data_slice.start_index + i] * 100
+    # --> Initialise trend tracking (1: "UP", -1: "DOWN")
+    initial_trend = 1 if sliced_data[1] > sliced_data[0] else -1
 
-                # --> While barriers not hit, compute next day percentage difference
-                while not percent_difference >= upper_barrier and not percent_difference <= lower_barrier and j - i != look_ahead:
-                    j += 1
-                    if j > len(data):
-                        labels[i] = 0
-                        break
+    # --> Daily moves (trend left unchanged by undefined moves)
+    moves = np.diff(sliced_data)
+    moves = np.where(moves >= 0, 1, np.where(moves < 0, -1, 0))
 
-                    percent_difference = (data[data_slice.start_index + j] - data[data_slice.start_index + i]) / data[
-                        data_slice.start_index + i] * 100
+    # --> Trend before every move
+    trends = np.concatenate(([initial_trend], moves))
+    defined = np.where(trends != 0, np.arange(len(trends)), 0)
+    trends = trends[np.maximum.accumulate(defined)][:-1]
 
-                if percent_difference >= upper_barrier:
-                    labels[i] = -1
-                elif percent_difference <= lower_barrier:
-                    labels[i] = 1
+    labels = np.zeros(len(sliced_data), dtype=np.int64)
+    labels[:-1] = np.where((moves == 1) & (trends == -1), -1, np.where((moves == -1) & (trends == 1), 1, 0))
 
-        return labels
+    return labels
+
+
+def gen_barrier_labels(data, start_index, days, last_days, upper_barrier, lower_barrier, block_size=16):
+    """
+    Generate the labels of the first barrier hit by the price percentage difference of every day: -1 if the upper
+    barrier is hit first, 1 if the lower barrier is hit first, 0 if no barrier is hit before the last day searched.
+    Data indexes are computed as in a python list (start_index + day, negative indexes wrapping around)
+
+    :param data: Full history prices
+    :param start_index: Data index of the first day of the slice
+    :param days: Days (index in slice) to be labeled
+    :param last_days: Last day (index in slice) searched for every day labeled (at least the next day is searched)
+    :param upper_barrier: Upper barrier (%)
+    :param lower_barrier: Lower barrier (%)
+    :param block_size: Initial number of look ahead days searched per block
+    :return: int numpy array
+    """
+    days = np.asarray(days, dtype=np.int64)
+    last_days = np.maximum(np.asarray(last_days, dtype=np.int64), days + 1)
+
+    labels = np.zeros(len(days), dtype=np.int64)
+    day_values = data[(start_index + days) % len(data)]
+
+    # --> Days still searched
+    searched = np.arange(len(days))
+    offset = 1
+
+    while len(searched) != 0:
+        # --> Percentage differences over the next block of look ahead days
+        look_ahead_days = days[searched, None] + np.arange(offset, offset + block_size)
+        in_range = look_ahead_days <= last_days[searched, None]
+
+        values = data[(start_index + np.minimum(look_ahead_days, last_days[searched, None])) % len(data)]
+        percent_differences = (values - day_values[searched, None])/day_values[searched, None]*100
+
+        upper_hits = in_range & (percent_differences >= upper_barrier)
+        hits = upper_hits | (in_range & (percent_differences <= lower_barrier))
+
+        # --> Label days hitting a barrier
+        hit = hits.any(axis=1)
+        first_hits = np.argmax(hits, axis=1)
+
+        labels[searched[hit]] = np.where(upper_hits[hit, first_hits[hit]], -1, 1)
+
+        # --> Keep searching days not hit before the end of their look ahead
+        searched = searched[~hit & (days[searched] + offset + block_size <= last_days[searched])]
+
+        offset += block_size
+        block_size *= 2
+
+    return labels
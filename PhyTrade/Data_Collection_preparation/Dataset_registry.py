@@ -0,0 +1,172 @@
+
+##################################################################################################################
+"""
+Used to share technical datasets across a process. Every ticker is loaded once and kept in memory
+until its source file changes (file mtime), or it is evicted by the LRU/memory cap policy.
+
+The datasets handed out are shared between all callers and must be treated as read-only. The registry can be
+accessed from multiple threads (see the thread evaluation backend), its content is protected by a re-entrant lock.
+Artefacts derived from a dataset (date index, column arrays, etc...) can be attached to it, and are dropped
+along with it when the dataset is evicted or reloaded.
+"""
+
+# Built-in/Generic Imports
+import os
+import threading
+from collections import OrderedDict
+
+__version__ = '1.1.1'
+__author__ = 'Victor Guillet'
+__date__ = '10/09/2019'
+
+##################################################################################################################
+
+
+class Dataset_registry:
+    def __init__(self, max_dataset_count=32, max_memory=1024*1024*1024):
+        """
+        Process-wide store of technical datasets, keyed by ticker and source file mtime
+
+        :param max_dataset_count: Maximum number of datasets kept in memory
+        :param max_memory: Maximum memory (in bytes) used by the datasets and their derived artefacts
+        """
+        self.max_dataset_count = max_dataset_count
+        self.max_memory = max_memory
+
+        # --> Ticker: {"mtime", "data", "derived", "nbytes" (of data)}, ordered from least to most recently used
+        self.content = OrderedDict()
+
+        # --> Artefact builders may fetch other datasets/artefacts from the registry (re-entrant)
+        self.lock = threading.RLock()
+
+        # --> Counters
+        self.hit_count = 0
+        self.miss_count = 0
+        self.eviction_count = 0
+
+    @property
+    def memory_usage(self):
+        # --> Derived artefacts may grow after being built (lazily filled tables), their size is evaluated on request
+        with self.lock:
+            return sum(entry["nbytes"] + self.calc_nbytes(entry["derived"]) for entry in self.content.values())
+
+    def fetch(self, ticker, path, loader):
+        """
+        Fetch the dataset of a ticker, (re)loading it if missing or if a source file was modified
+
+        :param ticker: Ticker of the dataset
+        :param path: Path (or list of paths) to the source file(s) of the dataset (used for invalidation)
+        :param loader: Callable returning the dataset if it needs to be (re)loaded
+        :return: Shared dataset
+        """
+        mtime = self.get_mtime(path)
+
+        with self.lock:
+            # ---> Return dataset if present and up to date
+            if ticker in self.content and self.content[ticker]["mtime"] == mtime and mtime is not None:
+                self.hit_count += 1
+                self.content.move_to_end(ticker)
+                return self.content[ticker]["data"]
+
+            # ---> Else, (re)load dataset
+            self.miss_count += 1
+            data = loader()
+
+            self.register(ticker, data, self.get_mtime(path))
+            return data
+
+    def register(self, ticker, data, mtime):
+        """
+        Add a dataset to the registry, replacing any previous version of the same ticker
+
+        :param ticker: Ticker of the dataset
+        :param data: Dataset
+        :param mtime: mtime of the dataset source file
+        """
+        with self.lock:
+            self.content.pop(ticker, None)
+            self.content[ticker] = {"mtime": mtime,
+                                    "data": data,
+                                    "derived": {},
+                                    "nbytes": self.calc_nbytes(data)}
+
+            self.enforce_limits()
+
+    def get_derived(self, ticker, key, builder):
+        """
+        Fetch an artefact derived from a registered dataset, building it if necessary
+
+        :param ticker: Ticker of the dataset
+        :param key: Hashable reference of the artefact
+        :param builder: Callable taking the dataset as input and returning the artefact
+        :return: Shared artefact
+        """
+        with self.lock:
+            entry = self.content[ticker]
+
+            if key not in entry["derived"]:
+                artefact = builder(entry["data"])
+
+                entry["derived"][key] = artefact
+
+                # --> Keep current dataset regardless of the memory cap
+                self.content.move_to_end(ticker)
+                self.enforce_limits()
+
+                return artefact
+
+            return entry["derived"][key]
+
+    def enforce_limits(self):
+        # --> Evict least recently used datasets, always keeping the most recent one
+        with self.lock:
+            while len(self.content) > 1 and \
+                    (len(self.content) > self.max_dataset_count or self.memory_usage > self.max_memory):
+                self.content.popitem(last=False)
+                self.eviction_count += 1
+
+    def clear(self):
+        with self.lock:
+            self.content.clear()
+
+    @staticmethod
+    def get_mtime(path):
+        """
+        :param path: Path, or list of paths (newest mtime of the existing files used)
+        :return: mtime, None if no file exists
+        """
+        if type(path) is list or type(path) is tuple:
+            mtimes = [mtime for mtime in (Dataset_registry.get_mtime(file_path) for file_path in path)
+                      if mtime is not None]
+            return max(mtimes) if len(mtimes) != 0 else None
+
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    @staticmethod
+    def calc_nbytes(obj):
+        if hasattr(obj, "memory_usage"):
+            return int(obj.memory_usage(index=True, deep=True).sum())
+
+        elif hasattr(obj, "nbytes"):
+            return int(obj.nbytes)
+
+        elif type(obj) is dict:
+            return sum(Dataset_registry.calc_nbytes(item) for item in obj.values())
+
+        elif type(obj) is list or type(obj) is tuple:
+            return sum(Dataset_registry.calc_nbytes(item) for item in obj)
+
+        else:
+            return 0
+
+    def __str__(self):
+        return "Dataset registry: " + str(len(self.content)) + " datasets, " \
+               + str(round(self.memory_usage/1024/1024, 2)) + "MB, hits - " + str(self.hit_count) \
+               + ", misses - " + str(self.miss_count) + ", evictions - " + str(self.eviction_count)
+
+
+# --> Registry shared by the whole process
+dataset_registry = Dataset_registry()
@@ -1,7 +1,12 @@
 
 ##################################################################################################################
 """
-Used to fetch or download technical data of a specific ticker
+Used to fetch or download technical data of a specific ticker. Datasets are loaded once per process
+and shared through the dataset registry, they must be treated as read-only.
+
+The binary columnar store of a ticker (see Technical_data_store) is used in place of its csv file when it exists
+and is at least as recent as the csv file (a store older than the csv file, ie: after a new download, is ignored
+until it is regenerated). Datasets are versioned on the newest of the csv file and store manifest mtimes.
 
 # TODO: Add self-updating data fetcher
 """
@@ -14,6 +19,9 @@ import pandas
 
 # Own modules
 from PhyTrade.Data_Collection_preparation.Data_sources.Yahoo import pull_yahoo_data
+from PhyTrade.Data_Collection_preparation.Dataset_registry import dataset_registry
+from PhyTrade.Data_Collection_preparation.Technical_data_store import technical_data_store_exists, \
+    get_technical_data_store_manifest_path, open_technical_data_store
 
 __version__ = '1.1.1'
 __author__ = 'Victor Guillet'
@@ -23,7 +31,67 @@ __date__ = '10/09/2019'
 
 
 def fetch_technical_data(ticker):
-    path = r"C:\Users\Victor Guillet\Google Drive\2-Programing\Repos\Python\Steffegium\Data\Technical_data\**_Yahoo_data.csv".replace('\\', '/').replace('**', ticker)
+    """
+    Fetch the technical data of a ticker from the process-wide dataset registry
+
+    :param ticker: Ticker of the data
+    :return: Shared (read-only) pandas dataframe
+    """
+    def loader():
+        # --> Prefer binary store when available and up to date
+        if technical_data_store_up_to_date(ticker):
+            return open_technical_data_store(ticker)
+
+        return load_technical_data(ticker)
+
+    return dataset_registry.fetch(ticker, get_technical_data_source_paths(ticker), loader)
+
+
+def fetch_technical_data_artefact(ticker, key, builder):
+    """
+    Fetch an artefact derived from the technical data of a ticker, built once per dataset version
+
+    :param ticker: Ticker of the data
+    :param key: Hashable reference of the artefact
+    :param builder: Callable taking the technical data as input and returning the artefact
+    :return: Shared artefact
+    """
+    fetch_technical_data(ticker)
+    return dataset_registry.get_derived(ticker, key, builder)
+
+
+def technical_data_store_up_to_date(ticker):
+    """
+    Check if the binary store of a ticker exists and was generated from the current csv file (if any)
+    """
+    if not technical_data_store_exists(ticker):
+        return False
+
+    csv_mtime = dataset_registry.get_mtime(get_technical_data_path(ticker))
+
+    return csv_mtime is None or dataset_registry.get_mtime(get_technical_data_store_manifest_path(ticker)) >= csv_mtime
+
+
+def get_technical_data_source_paths(ticker):
+    """
+    Paths to the files used to version the technical data of a ticker (csv file and store manifest)
+    """
+    return [get_technical_data_path(ticker), get_technical_data_store_manifest_path(ticker)]
+
+
+def get_technical_data_mtime(ticker):
+    """
+    Version of the technical data of a ticker (newest of the csv file and store manifest mtimes)
+    """
+    return dataset_registry.get_mtime(get_technical_data_source_paths(ticker))
+
+
+def get_technical_data_path(ticker):
+    return r"C:\Users\Victor Guillet\Google Drive\2-Programing\Repos\Python\Steffegium\Data\Technical_data\**_Yahoo_data.csv".replace('\\', '/').replace('**', ticker)
+
+
+def load_technical_data(ticker):
+    path = get_technical_data_path(ticker)
 
     # ---> Check if generated path data exists in database
     if os.path.exists(path):
@@ -0,0 +1,198 @@
+
+##################################################################################################################
+"""
+Used to share the technical data of tickers between processes through shared memory.
+
+The parent process copies the dataset of a ticker once into a shared memory block (one contiguous 8 bytes column
+after the other, datetime64 for the dates and float64 for the price/volume columns), and hands out a lightweight
+picklable handle. Worker processes attach to the block by name and register the resulting (read-only, zero copy)
+dataframe in their dataset registry, fetch_technical_data then returns it without loading the data from disk.
+
+Shared blocks are owned by the process that created them, and must be released by it once the workers are done.
+Worker processes close the blocks they attached to when exiting (or explicitly, see
+close_attached_shared_technical_data), the blocks are not unlinked.
+"""
+
+# Built-in/Generic Imports
+from multiprocessing import shared_memory, util
+
+# Libs
+import numpy as np
+import pandas
+
+# Own modules
+from PhyTrade.Data_Collection_preparation.Dataset_registry import dataset_registry
+from PhyTrade.Data_Collection_preparation.Fetch_technical_data import fetch_technical_data, \
+    get_technical_data_mtime
+
+__version__ = '1.1.1'
+__author__ = 'Victor Guillet'
+__date__ = '10/09/2019'
+
+##################################################################################################################
+
+# --> Ticker: (shared memory block, handle) of the blocks created by the process
+owned_shared_technical_data = {}
+
+# --> Shared memory block name: (shared memory block, ticker) of the blocks attached to by the process
+attached_shared_memory = {}
+
+
+class Shared_technical_data_handle:
+    def __init__(self, ticker, shared_memory_name, columns, length, mtime):
+        """
+        Picklable reference to the technical data of a ticker stored in shared memory
+
+        :param ticker: Ticker of the data
+        :param shared_memory_name: Name of the shared memory block
+        :param columns: Ordered list of the data columns
+        :param length: Number of data points
+        :param mtime: mtime of the data source file when shared (used as dataset version)
+        """
+        self.ticker = ticker
+        self.shared_memory_name = shared_memory_name
+        self.columns = columns
+        self.length = length
+        self.mtime = mtime
+
+    def attach(self):
+        """
+        Attach to the shared memory block and register the dataset in the process dataset registry
+
+        :return: Shared (read-only) pandas dataframe
+        """
+        # --> Process owning the block already holds the dataset
+        if self.ticker in owned_shared_technical_data \
+                and owned_shared_technical_data[self.ticker][1].shared_memory_name == self.shared_memory_name:
+            return fetch_technical_data(self.ticker)
+
+        with dataset_registry.lock:
+            # --> Only attach once per process (as long as the dataset is still registered)
+            if self.shared_memory_name in attached_shared_memory \
+                    and self.ticker in dataset_registry.content \
+                    and dataset_registry.content[self.ticker]["mtime"] == self.mtime:
+                return dataset_registry.content[self.ticker]["data"]
+
+            if self.shared_memory_name not in attached_shared_memory:
+                attached_shared_memory[self.shared_memory_name] = \
+                    (shared_memory.SharedMemory(name=self.shared_memory_name), self.ticker)
+
+                # --> Close block on process exit (ran by multiprocessing in the worker processes, atexit otherwise)
+                util.Finalize(None, close_attached_shared_technical_data, args=(self.shared_memory_name,),
+                              exitpriority=10)
+
+            data = gen_shared_dataframe(attached_shared_memory[self.shared_memory_name][0], self.columns, self.length)
+
+            dataset_registry.register(self.ticker, data, self.mtime)
+
+            return data
+
+    def __str__(self):
+        return "Shared technical data: Ticker - " + self.ticker + ", Block - " + self.shared_memory_name \
+               + ", Points - " + str(self.length)
+
+
+def share_technical_data(ticker):
+    """
+    Copy the technical data of a ticker to shared memory (once per dataset version)
+
+    :param ticker: Ticker of the data
+    :return: Shared_technical_data_handle
+    """
+    data = fetch_technical_data(ticker)
+    mtime = get_technical_data_mtime(ticker)
+
+    # --> Reuse block if dataset was already shared
+    if ticker in owned_shared_technical_data:
+        if owned_shared_technical_data[ticker][1].mtime == mtime and mtime is not None:
+            return owned_shared_technical_data[ticker][1]
+
+        release_shared_technical_data(ticker)
+
+    columns = list(data.columns)
+    length = len(data)
+
+    block = shared_memory.SharedMemory(create=True, size=max(1, len(columns)*length*8))
+
+    # ---> Copy columns to shared memory
+    for i, column in enumerate(columns):
+        if column == "Date":
+            column_values = np.array(data[column], dtype="datetime64[D]")
+        else:
+            column_values = np.asarray(data[column], dtype=np.float64)
+
+        np.ndarray(length, dtype=column_values.dtype, buffer=block.buf, offset=i*length*8)[:] = column_values
+
+    handle = Shared_technical_data_handle(ticker, block.name, columns, length, mtime)
+    owned_shared_technical_data[ticker] = (block, handle)
+
+    return handle
+
+
+def release_shared_technical_data(ticker=None):
+    """
+    Release the shared memory block(s) created by the process
+
+    :param ticker: Ticker of the block to release, release all blocks if None
+    """
+    if ticker is None:
+        tickers = list(owned_shared_technical_data.keys())
+    else:
+        tickers = [ticker]
+
+    for ticker in tickers:
+        if ticker in owned_shared_technical_data:
+            block, _ = owned_shared_technical_data.pop(ticker)
+            block.close()
+            block.unlink()
+
+
+def close_attached_shared_technical_data(shared_memory_name=None):
+    """
+    Close the shared memory block(s) attached to by the process (blocks are left to be released by their owner).
+    The datasets backed by the blocks are dropped from the dataset registry.
+
+    :param shared_memory_name: Name of the block to close, close all blocks if None
+    """
+    with dataset_registry.lock:
+        if shared_memory_name is None:
+            shared_memory_names = list(attached_shared_memory.keys())
+        else:
+            shared_memory_names = [shared_memory_name]
+
+        for shared_memory_name in shared_memory_names:
+            if shared_memory_name in attached_shared_memory:
+                block, ticker = attached_shared_memory[shared_memory_name]
+                dataset_registry.content.pop(ticker, None)
+
+                try:
+                    block.close()
+                except BufferError:
+                    # --> Dataset still referenced outside of the registry, keep the block attached
+                    continue
+
+                del attached_shared_memory[shared_memory_name]
+
+
+def gen_shared_dataframe(block, columns, length):
+    """
+    Generate a pandas dataframe backed by the columns of a shared memory block (no copy).
+    Dates are exposed as strings, matching the csv format.
+
+    :param block: Shared memory block
+    :param columns: Ordered list of the data columns
+    :param length: Number of data points
+    :return: Pandas dataframe
+    """
+    data = {}
+    for i, column in enumerate(columns):
+        if column == "Date":
+            data[column] = np.datetime_as_string(
+                np.ndarray(length, dtype="datetime64[D]", buffer=block.buf, offset=i*length*8), unit='D')
+
+        else:
+            column_values = np.ndarray(length, dtype=np.float64, buffer=block.buf, offset=i*length*8)
+            column_values.setflags(write=False)
+            data[column] = column_values
+
+    return pandas.DataFrame(data, copy=False)
@@ -0,0 +1,124 @@
+
+##################################################################################################################
+"""
+Used to convert technical data csv files to a binary columnar store, and to open it.
+
+Each ticker store is a folder containing one contiguous .npy array per column (float64 for the price/volume columns,
+datetime64 for the dates) along with a manifest listing the columns in order. Stores are opened through numpy.memmap,
+allowing every process to share the same pages without parsing or copying the data.
+
+Run this script to convert all the *_Yahoo_data.csv files present in the technical data folder.
+"""
+
+# Built-in/Generic Imports
+import os
+import json
+
+# Libs
+import numpy as np
+import pandas
+
+__version__ = '1.1.1'
+__author__ = 'Victor Guillet'
+__date__ = '10/09/2019'
+
+##################################################################################################################
+
+
+def get_technical_data_folder_path():
+    return r"C:\Users\Victor Guillet\Google Drive\2-Programing\Repos\Python\Steffegium\Data\Technical_data".replace('\\', '/')
+
+
+def get_technical_data_store_path(ticker):
+    return get_technical_data_folder_path() + '/' + ticker + "_Yahoo_data_store"
+
+
+def get_technical_data_store_manifest_path(ticker):
+    # --> The manifest is written last, its mtime is used to version the store
+    return get_technical_data_store_path(ticker) + "/columns.json"
+
+
+def technical_data_store_exists(ticker):
+    return os.path.exists(get_technical_data_store_manifest_path(ticker))
+
+
+def convert_csv_to_store(ticker):
+    """
+    Convert the technical data csv file of a ticker to a binary columnar store
+
+    :param ticker: Ticker of the data
+    """
+    csv_path = get_technical_data_folder_path() + '/' + ticker + "_Yahoo_data.csv"
+    store_path = get_technical_data_store_path(ticker)
+
+    data = pandas.read_csv(csv_path, index_col=0)
+
+    if not os.path.exists(store_path):
+        os.makedirs(store_path)
+
+    # ---> Save one contiguous array per column
+    for column in data.columns:
+        if column == "Date":
+            column_values = np.array(data[column], dtype="datetime64[D]")
+        else:
+            column_values = np.ascontiguousarray(data[column], dtype=np.float64)
+
+        np.save(store_path + '/' + column + ".npy", column_values)
+
+    # ---> Save manifest
+    with open(get_technical_data_store_manifest_path(ticker), 'w') as fout:
+        json.dump({"columns": list(data.columns), "length": len(data)}, fout)
+
+    print(ticker, "technical data store generated successfully (" + str(len(data)) + " points)")
+
+
+def convert_all_csv_to_store():
+    """
+    Convert all the technical data csv files available to binary columnar stores
+    """
+    for file_name in sorted(os.listdir(get_technical_data_folder_path())):
+        if file_name.endswith("_Yahoo_data.csv"):
+            convert_csv_to_store(file_name[:-len("_Yahoo_data.csv")])
+
+
+def open_technical_data_store_columns(ticker):
+    """
+    Open the columns of a ticker store as read-only memory-mapped arrays
+
+    :param ticker: Ticker of the data
+    :return: Dictionary of memory-mapped arrays, ordered as the original csv columns
+    """
+    store_path = get_technical_data_store_path(ticker)
+
+    with open(get_technical_data_store_manifest_path(ticker)) as fin:
+        manifest = json.load(fin)
+
+    columns = {}
+    for column in manifest["columns"]:
+        columns[column] = np.load(store_path + '/' + column + ".npy", mmap_mode='r')
+
+    return columns
+
+
+def open_technical_data_store(ticker):
+    """
+    Open the store of a ticker as a pandas dataframe backed by the memory-mapped columns (no copy).
+    Dates are exposed as strings, matching the csv format.
+
+    :param ticker: Ticker of the data
+    :return: Pandas dataframe
+    """
+    columns = open_technical_data_store_columns(ticker)
+
+    data = {}
+    for column in columns:
+        if column == "Date":
+            data[column] = np.datetime_as_string(columns[column], unit='D')
+        else:
+            data[column] = columns[column]
+
+    return pandas.DataFrame(data, copy=False)
+
+
+if __name__ == "__main__":
+    convert_all_csv_to_store()
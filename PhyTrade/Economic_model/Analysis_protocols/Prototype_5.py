@@ -19,7 +19,7 @@ import numpy as np
 # Own modules
 from PhyTrade.Economic_model.Big_Data import BIGDATA
 # ---> Import model settings
-from PhyTrade.Settings.Model_settings import Model_settings
+from PhyTrade.Settings.Settings_snapshot import get_settings_snapshot
 
 # ---> Import indicators
 from PhyTrade.Economic_model.Technical_Analysis.Technical_Indicators.RSI_gen import RSI
@@ -58,8 +58,7 @@ class Prototype_5:
 
         # ========================= ANALYSIS INITIALISATION ==============================
         # --> Fetch model settings
-        settings = Model_settings()
-        settings.gen_model_settings()
+        settings = get_settings_snapshot().model_settings
 
         # --> Initiate records
         self.big_data = BIGDATA(data_slice)
@@ -0,0 +1,308 @@
+
+##################################################################################################################
+"""
+This script contains the Prototype_5_batch class, used to generate the Prototype_5 models of an entire population
+on a data slice at once. The output (spline, thresholds, trade spline and trade signal) of every individual is
+identical to the one generated by its own Prototype_5 instance.
+
+The population is processed as a matrix:
+    - Indicator bb signals and their splines are only computed once per distinct parameter combination
+      (offsprings share most of their indicators with their parents)
+    - The Bollinger band threshold variations are computed once per data slice and threshold setting/timeframe
+    - The splines of all individuals are stacked in a (individuals x indicators x points) array, and combined
+      with a single weighted sum, then normalised row-wise
+    - Thresholds are initialised for all individuals at once, the sequential threshold and trade signal
+      kernels are then run on each row
+
+The volume and volatility splines are not generated, as they are not used in the model output. Individuals
+relying on the google trends buffer are generated using Prototype_5.
+"""
+
+# Libs
+import numpy as np
+
+# Own modules
+from PhyTrade.Economic_model.Big_Data import BIGDATA
+# ---> Import model settings
+from PhyTrade.Settings.Settings_snapshot import get_settings_snapshot
+
+# ---> Import indicators
+from PhyTrade.Economic_model.Technical_Analysis.Technical_Indicators.RSI_gen import RSI
+from PhyTrade.Economic_model.Technical_Analysis.Technical_Indicators.SMA_gen import SMA
+from PhyTrade.Economic_model.Technical_Analysis.Technical_Indicators.EMA_gen import EMA
+from PhyTrade.Economic_model.Technical_Analysis.Technical_Indicators.LWMA_gen import LWMA
+from PhyTrade.Economic_model.Technical_Analysis.Technical_Indicators.CCI_gen import CCI
+from PhyTrade.Economic_model.Technical_Analysis.Technical_Indicators.EOM_gen import EOM
+from PhyTrade.Economic_model.Technical_Analysis.Technical_Indicators.OC_AVG_GRADIENT_gen import OC_AVG_GRADIENT
+
+# ---> import general tools
+from PhyTrade.Economic_model.Analysis_protocols.Prototype_5 import Prototype_5
+from PhyTrade.Tools.MATH_tools import MATH_tools
+from PhyTrade.Tools.SPLINE_tools import SPLINE
+from PhyTrade.Tools.JIT_tools import gen_kernel_input, gen_kernel_output, \
+    calc_dynamic_upper_threshold, calc_dynamic_lower_threshold, calc_trade_signal
+
+__version__ = '1.1.1'
+__author__ = 'Victor Guillet'
+__date__ = '10/09/2019'
+
+##################################################################################################################
+
+
+class Prototype_5_batch:
+    def __init__(self, parameter_dictionaries, data_slice):
+        """
+        Generate the Prototype_5 models of a list of parameter sets
+
+        :param parameter_dictionaries: List of parameter sets
+        :param data_slice: data_slice class instance
+        """
+        # --> Fetch model settings
+        self.buffer = get_settings_snapshot().model_settings.buffer
+        self.data_slice = data_slice
+
+        # --> Major spline of each parameter set (in input order)
+        self.major_splines = [None]*len(parameter_dictionaries)
+
+        # --> Indicator key: bb signal
+        self.bb_signals = {}
+
+        # ---- Group parameter sets per spline interpolation factor (splines of a group have the same length)
+        groups = {}
+        for i, parameter_dictionary in enumerate(parameter_dictionaries):
+            # --> Google trends buffer is not supported in batch
+            if parameter_dictionary["general_settings"]["buffer_setting"] == 2:
+                self.major_splines[i] = Prototype_5(parameter_dictionary, data_slice).big_data.Major_spline
+                continue
+
+            spline_multiplication_coef = parameter_dictionary["general_settings"]["spline_interpolation_factor"]
+            groups.setdefault(spline_multiplication_coef, []).append(i)
+
+        for spline_multiplication_coef, group in groups.items():
+            group_major_splines = self.gen_group_models([parameter_dictionaries[i] for i in group],
+                                                        spline_multiplication_coef)
+
+            for i, major_spline in zip(group, group_major_splines):
+                self.major_splines[i] = major_spline
+
+    def gen_group_models(self, parameter_dictionaries, spline_multiplication_coef):
+        """
+        Generate the models of a group of parameter sets sharing the same spline interpolation factor
+
+        :return: List of Batch_major_spline
+        """
+        big_data = BIGDATA(self.data_slice)
+        big_data.spline_multiplication_coef = spline_multiplication_coef
+
+        spline_tools = SPLINE(big_data)
+
+        # --> (indicator key, smoothing factor, flip): spline
+        splines = {}
+
+        # ========================= SPLINES GENERATION ===================================
+        splines_lst = []
+        weights_lst = []
+
+        for parameter_dictionary in parameter_dictionaries:
+            individual_splines = []
+            individual_weights = []
+
+            for indicator_type in parameter_dictionary["indicators_count"]:
+                for i in range(parameter_dictionary["indicators_count"][indicator_type]):
+                    indicator_key = self.gen_indicator_key(parameter_dictionary, indicator_type, i)
+
+                    if indicator_key not in self.bb_signals:
+                        self.bb_signals[indicator_key] = self.gen_bb_signal(big_data, parameter_dictionary, indicator_type, i)
+
+                    spline_key = (indicator_key,
+                                  parameter_dictionary["spline_property"]["smoothing_factors"][indicator_type + "_" + str(i)],
+                                  parameter_dictionary["spline_property"]["flip"][indicator_type + "_" + str(i)] is True)
+
+                    if spline_key not in splines:
+                        spline = spline_tools.calc_signal_to_spline(big_data, self.bb_signals[indicator_key],
+                                                                    smoothing_factor=spline_key[1])
+                        if spline_key[2]:
+                            spline = spline_tools.flip_spline(spline)
+
+                        splines[spline_key] = spline
+
+                    individual_splines.append(splines[spline_key])
+                    individual_weights.append(parameter_dictionary["spline_property"]["weights"][indicator_type + "_" + str(i)])
+
+            splines_lst.append(individual_splines)
+            weights_lst.append(individual_weights)
+
+        # ========================= SPLINES COMBINATION ==================================
+        # --> Stack splines in a (individuals x indicators x points) array, padded with null weighted splines
+        nb_of_points = self.data_slice.slice_size*spline_multiplication_coef
+        max_indicators_count = max(len(individual_splines) for individual_splines in splines_lst)
+
+        spline_array = np.zeros((len(parameter_dictionaries), max_indicators_count, nb_of_points))
+        weights_array = np.zeros((len(parameter_dictionaries), max_indicators_count, 1))
+
+        for i in range(len(parameter_dictionaries)):
+            for j in range(len(splines_lst[i])):
+                spline_array[i, j] = splines_lst[i][j]
+                weights_array[i, j] = weights_lst[i][j]
+
+        combined_splines = (spline_array*weights_array).sum(axis=1)
+
+        # ---- Normalise combined splines between -1 and 1
+        combined_splines = MATH_tools().normalise_minus_one_one_rows(combined_splines, out=combined_splines)
+
+        # ========================= THRESHOLD DETERMINATION ==============================
+        standard_upper_thresholds = np.zeros((len(parameter_dictionaries), 1))
+        standard_lower_thresholds = np.zeros((len(parameter_dictionaries), 1))
+
+        upper_variations = np.zeros((len(parameter_dictionaries), nb_of_points))
+        lower_variations = np.zeros((len(parameter_dictionaries), nb_of_points))
+
+        buffers = []
+
+        for i, parameter_dictionary in enumerate(parameter_dictionaries):
+            standard_upper_thresholds[i] = parameter_dictionary["spline_property"]["major_spline_standard_upper_thresholds"]
+            standard_lower_thresholds[i] = parameter_dictionary["spline_property"]["major_spline_standard_lower_thresholds"]
+
+            threshold_setting = parameter_dictionary["general_settings"]["threshold_setting"]
+
+            # --> Threshold variations are shared per data slice (see SPLINE.calc_threshold_variations)
+            if threshold_setting != 0:
+                upper_variations[i], lower_variations[i] = \
+                    spline_tools.calc_threshold_variations(big_data,
+                                                           bband_timeframe=parameter_dictionary["indicator_properties"]["timeframes"]["threshold_timeframe"],
+                                                           threshold_setting=threshold_setting)
+
+            if parameter_dictionary["general_settings"]["buffer_setting"] == 0:
+                buffers.append(0.0000001)
+            else:
+                buffers.append(self.buffer)
+
+        upper_thresholds = standard_upper_thresholds + standard_upper_thresholds*0.5*upper_variations
+        lower_thresholds = standard_lower_thresholds - standard_upper_thresholds*0.5*lower_variations
+
+        # ========================= TRADE SIGNALS GENERATION =============================
+        spline_buffer = gen_kernel_input(np.ones(nb_of_points))
+
+        major_splines = []
+        for i in range(len(parameter_dictionaries)):
+            major_spline = Batch_major_spline()
+            major_spline.spline = combined_splines[i]
+
+            # ---- Define upper and lower dynamic bounds (compiled kernels when available)
+            spline = gen_kernel_input(combined_splines[i])
+            upper_threshold = gen_kernel_input(upper_thresholds[i])
+            lower_threshold = gen_kernel_input(lower_thresholds[i])
+
+            calc_dynamic_upper_threshold(spline, upper_threshold, spline_buffer, buffers[i])
+            calc_dynamic_lower_threshold(spline, lower_threshold, spline_buffer, buffers[i])
+
+            major_spline.upper_threshold = np.array(upper_threshold)
+            major_spline.lower_threshold = np.array(lower_threshold)
+
+            # ---- Generate trade signal (compiled kernel when available)
+            major_spline.trade_spline = combined_splines[i][::spline_multiplication_coef]
+
+            trade_signal = gen_kernel_output(len(major_spline.trade_spline))
+
+            calc_trade_signal(trade_signal,
+                              gen_kernel_input(major_spline.trade_spline),
+                              gen_kernel_input(major_spline.upper_threshold[::spline_multiplication_coef]),
+                              gen_kernel_input(major_spline.lower_threshold[::spline_multiplication_coef]),
+                              self.data_slice.slice_size)
+
+            major_spline.trade_signal = np.array(trade_signal)
+
+            major_splines.append(major_spline)
+
+        return major_splines
+
+    @staticmethod
+    def gen_indicator_key(parameter_dictionary, indicator_type, i):
+        """
+        Generate the key of an indicator, identifying the parameters its bb signal depends on
+
+        :return: Key
+        """
+        include_triggers = parameter_dictionary["general_settings"]["include_triggers_in_bb_signal"][indicator_type]
+        timeframes = parameter_dictionary["indicator_properties"]["timeframes"]
+
+        if indicator_type == "rsi":
+            return (indicator_type, include_triggers,
+                    timeframes["rsi_" + str(i)],
+                    parameter_dictionary["indicator_properties"]["rsi_standard_upper_thresholds"]["rsi_" + str(i)],
+                    parameter_dictionary["indicator_properties"]["rsi_standard_lower_thresholds"]["rsi_" + str(i)],
+                    parameter_dictionary["general_settings"]["rsi_buffer_setting"])
+
+        elif indicator_type in ["sma", "ema"]:
+            return (indicator_type, include_triggers,
+                    timeframes[indicator_type + "_" + str(i) + "_1"],
+                    timeframes[indicator_type + "_" + str(i) + "_2"])
+
+        elif indicator_type in ["lwma", "cci", "eom"]:
+            return indicator_type, include_triggers, timeframes[indicator_type + "_" + str(i)]
+
+        elif indicator_type == "oc_gradient":
+            return indicator_type, include_triggers
+
+        else:
+            raise ValueError("Invalid indicator type: " + str(indicator_type))
+
+    @staticmethod
+    def gen_bb_signal(big_data, parameter_dictionary, indicator_type, i):
+        """
+        Generate the bb signal of an indicator of a parameter set
+
+        :return: bb signal
+        """
+        timeframes = parameter_dictionary["indicator_properties"]["timeframes"]
+
+        if indicator_type == "rsi":
+            indicator = RSI(big_data,
+                            timeframe=timeframes["rsi_" + str(i)],
+                            standard_upper_threshold=parameter_dictionary["indicator_properties"]["rsi_standard_upper_thresholds"]["rsi_" + str(i)],
+                            standard_lower_threshold=parameter_dictionary["indicator_properties"]["rsi_standard_lower_thresholds"]["rsi_" + str(i)],
+                            buffer_setting=parameter_dictionary["general_settings"]["rsi_buffer_setting"])
+
+        elif indicator_type == "sma":
+            indicator = SMA(big_data,
+                            timeperiod_1=timeframes["sma_" + str(i) + "_1"],
+                            timeperiod_2=timeframes["sma_" + str(i) + "_2"])
+
+        elif indicator_type == "ema":
+            indicator = EMA(big_data,
+                            timeperiod_1=timeframes["ema_" + str(i) + "_1"],
+                            timeperiod_2=timeframes["ema_" + str(i) + "_2"])
+
+        elif indicator_type == "lwma":
+            indicator = LWMA(big_data, timeperiod=timeframes["lwma_" + str(i)])
+
+        elif indicator_type == "cci":
+            indicator = CCI(big_data, timeperiod=timeframes["cci_" + str(i)])
+
+        elif indicator_type == "eom":
+            indicator = EOM(big_data, timeperiod=timeframes["eom_" + str(i)])
+
+        elif indicator_type == "oc_gradient":
+            indicator = OC_AVG_GRADIENT(big_data)
+
+        else:
+            raise ValueError("Invalid indicator type: " + str(indicator_type))
+
+        indicator.get_output(big_data,
+                             include_triggers_in_bb_signal=parameter_dictionary["general_settings"]["include_triggers_in_bb_signal"][indicator_type])
+
+        return indicator.bb_signal
+
+
+class Batch_major_spline:
+    def __init__(self):
+        """
+        Output of the model of a parameter set generated in batch (same attributes as MAJOR_SPLINE)
+        """
+        self.spline = None
+
+        self.upper_threshold = None
+        self.lower_threshold = None
+
+        self.trade_spline = None
+        self.trade_signal = None
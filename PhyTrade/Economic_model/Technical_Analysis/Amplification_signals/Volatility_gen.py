@@ -4,9 +4,6 @@
 This script contains the Volatility class for all calculations relating to Volatility
 """
 
-# Built-in/Generic Imports
-import statistics as st
-
 # Libs
 import numpy as np
 
@@ -34,22 +31,19 @@ class VOLATILITY:
         self.timeframe = timeframe
 
         # -------------------------- VOLATILITY CALCULATION --------------------
-        self.volatility = np.zeros(big_data.data_slice.slice_size)
-
-        for i in range(big_data.data_slice.slice_size):
-            # --> Adjust timeframe if necessary
-            if len(big_data.data_slice.data[:big_data.data_slice.start_index]) < self.timeframe:
-                self.timeframe = len(big_data.data_slice.data[:big_data.data_slice.start_index])
-
-            timeframe_values = np.array(big_data.data_slice.data_selection[
-                                        big_data.data_slice.start_index+i-self.timeframe+1:
-                                        big_data.data_slice.start_index+i+1])[::-1]
+        # --> Adjust timeframe if necessary
+        days_before_slice = len(big_data.data_slice.data_selection) + big_data.data_slice.start_index
 
-            self.timeframe_std_dev = st.stdev(timeframe_values)
+        if days_before_slice < self.timeframe:
+            self.timeframe = days_before_slice
 
-            annualised_volatility = self.timeframe_std_dev*np.sqrt(252/self.timeframe)
+        # --> Fetch rolling annualised volatility from the indicator tables
+        self.volatility = big_data.data_slice.indicator_tables.get_volatility(big_data.data_slice.selection,
+                                                                             big_data.data_slice.start_index,
+                                                                             big_data.data_slice.slice_size,
+                                                                             self.timeframe)
 
-            self.volatility[i] = annualised_volatility
+        self.timeframe_std_dev = self.volatility[-1]/np.sqrt(252/self.timeframe)
 
         # Normalising volatility signal values between 0 and 1
         self.amp_coef = MATH_tools().normalise_zero_one(self.volatility)
@@ -24,10 +24,29 @@ class VOLUME:
         """
         from PhyTrade.Tools.MATH_tools import MATH_tools
 
-        self.volume = np.array(big_data.data_slice.sliced_data["Volume"])
-
-        # Normalising volume signal values between 0 and 1
-        self.amp_coef = MATH_tools().normalise_zero_one(self.volume)
+        # --> Volume and normalised volume are generated once per data slice and shared (read-only)
+        self.volume, normalised_volume = \
+            big_data.data_slice.fetch_slice_artefact("volume", lambda: gen_normalised_volume(big_data.data_slice))
 
         # Amplifying volume signal
-        self.amp_coef = MATH_tools().amplify(self.amp_coef, amplification_factor)
+        self.amp_coef = MATH_tools().amplify(normalised_volume, amplification_factor)
+
+
+def gen_normalised_volume(data_slice):
+    """
+    Generate the volume of a data slice, along with the volume normalised between 0 and 1
+
+    :param data_slice: data_slice class instance
+    :return: Read-only volume, read-only normalised volume
+    """
+    from PhyTrade.Tools.MATH_tools import MATH_tools
+
+    volume = np.array(data_slice.sliced_data["Volume"])
+
+    # Normalising volume signal values between 0 and 1
+    normalised_volume = MATH_tools().normalise_zero_one(volume)
+
+    volume.setflags(write=False)
+    normalised_volume.setflags(write=False)
+
+    return volume, normalised_volume
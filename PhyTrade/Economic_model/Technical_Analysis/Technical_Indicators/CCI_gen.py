@@ -6,10 +6,6 @@ Used to generate the CCI indicator
 https://blog.quantinsti.com/build-technical-indicators-in-python/#cci
 """
 
-# Libs
-import pandas as pd
-import numpy as np
-
 # Own modules
 from PhyTrade.Economic_model.Technical_Analysis.Technical_Indicators.ABSTRACT_indicator import ABSTRACT_indicator
 
@@ -26,15 +22,12 @@ class CCI(ABSTRACT_indicator):
         self.timeperiod = timeperiod
 
         # -------------------------- CCI CALCULATION ---------------------------
-        # --> Slice data to obtain Data falling in data slice + timeframe
-        cci_df = big_data.data_slice.data[big_data.data_slice.start_index-self.timeperiod:big_data.data_slice.stop_index]
-
-        tp = (cci_df['High'] + cci_df['Low'] + cci_df['Close']) / 3
-
-        cci = pd.Series((tp - tp.rolling(window=self.timeperiod, center=False).mean()) /
-                        (0.015 * tp.rolling(window=self.timeperiod, center=False).std()), name='CCI')
+        # --> Fetch CCI from the indicator tables (data falling in data slice + timeframe), shared per data slice
+        data_slice = big_data.data_slice
 
-        self.cci_values = np.array(cci.values[self.timeperiod:])
+        self.cci_values = data_slice.fetch_slice_artefact(
+            ("cci", self.timeperiod),
+            lambda: data_slice.indicator_tables.get_cci(data_slice.start_index, data_slice.stop_index, self.timeperiod))
 
     """
 
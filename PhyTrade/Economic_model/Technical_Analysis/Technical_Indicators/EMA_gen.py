@@ -7,11 +7,9 @@ moving average. An exponentially weighted moving average reacts more significant
 a simple moving average (SMA), which applies an equal weight to all observations in the period.
 """
 
-# Libs
-import numpy as np
-
 # Own modules
 from PhyTrade.Economic_model.Technical_Analysis.Technical_Indicators.ABSTRACT_indicator import ABSTRACT_indicator
+from PhyTrade.Tools.JIT_tools import calc_cross_triggers
 
 __version__ = '1.1.1'
 __author__ = 'Victor Guillet'
@@ -34,15 +32,17 @@ class EMA(ABSTRACT_indicator):
         self.timeperiod_2 = timeperiod_2
 
         # -------------------------- EMA CALCULATION ---------------------------
-        # --> Slice data to obtain Data falling in data slice + max timeframe
-        ewma_df = big_data.data_slice.data[big_data.data_slice.start_index-max(self.timeperiod_1, timeperiod_2):big_data.data_slice.stop_index]
-
+        # --> Fetch EMAs from the indicator tables (adjusted EWMA over data slice + max timeframe)
         # TODO: Check whether adjust should be True or False
-        ema_1 = ewma_df[big_data.data_slice.selection].ewm(span=self.timeperiod_1, min_periods=0, adjust=True, ignore_na=False).mean()
-        ema_2 = ewma_df[big_data.data_slice.selection].ewm(span=self.timeperiod_2, min_periods=0, adjust=True, ignore_na=False).mean()
+        indicator_tables = big_data.data_slice.indicator_tables
+        lookback = max(self.timeperiod_1, self.timeperiod_2)
 
-        self.ema_1 = np.array(ema_1.values[self.timeperiod_1:])
-        self.ema_2 = np.array(ema_2.values[self.timeperiod_2:])
+        self.ema_1 = indicator_tables.get_ema(big_data.data_slice.selection,
+                                              big_data.data_slice.start_index, big_data.data_slice.stop_index,
+                                              lookback, self.timeperiod_1)
+        self.ema_2 = indicator_tables.get_ema(big_data.data_slice.selection,
+                                              big_data.data_slice.start_index, big_data.data_slice.stop_index,
+                                              lookback, self.timeperiod_2)
 
     """
 
@@ -61,29 +61,15 @@ class EMA(ABSTRACT_indicator):
         from PhyTrade.Tools.MATH_tools import MATH_tools
 
         # ----------------- Bear/Bullish continuous signal
-        self.bb_signal = np.zeros(big_data.data_slice.slice_size)
+        slice_size = big_data.data_slice.slice_size
 
-        for i in range(big_data.data_slice.slice_size):
-            self.bb_signal[i] = (self.ema_1[i] - self.ema_2[i])/2
+        self.bb_signal = (self.ema_1[:slice_size] - self.ema_2[:slice_size])/2
 
         # --> Normalising ema bb signal values between -1 and 1
         # self.bb_signal = MATH_tools().normalise_minus_one_one(self.bb_signal)
         self.bb_signal = MATH_tools().alignator_minus_one_one(self.bb_signal, signal_max=15, signal_min=-15)
 
         if include_triggers_in_bb_signal:
-            # ----------------- Trigger points determination
-            # ema config can take two values, 0 for when ema_1 is higher than ema_2, and 2 for the other way around
-            if self.ema_1[0] > self.ema_2[0]:
-                ema_config = 0
-            else:
-                ema_config = 1
-
-            for i in range(big_data.data_slice.slice_size):
-                if ema_config == 0:
-                    if self.ema_2[i] > self.ema_1[i]:
-                        self.bb_signal[i] = 1
-                        ema_config = 1
-                else:
-                    if self.ema_1[i] > self.ema_2[i]:
-                        self.bb_signal[i] = -1
-                        ema_config = 0
+            # ----------------- Trigger points determination (compiled kernel when available)
+            # ema config can take two values, 0 for when ema_1 is higher than ema_2, and 1 for the other way around
+            calc_cross_triggers(self.bb_signal, self.ema_1, self.ema_2, slice_size)
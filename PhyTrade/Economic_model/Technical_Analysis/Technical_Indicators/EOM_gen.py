@@ -5,9 +5,6 @@ Used for computing the EOM indicator. The Ease of Movement indicator is a techni
 to quantify a mix of momentum and volume information into one value.
 """
 
-# Libs
-import numpy as np
-
 # Own modules
 from PhyTrade.Economic_model.Technical_Analysis.Technical_Indicators.ABSTRACT_indicator import ABSTRACT_indicator
 
@@ -24,15 +21,12 @@ class EOM(ABSTRACT_indicator):
         self.timeperiod = timeperiod
 
         # -------------------------- CCI CALCULATION ---------------------------
-        # --> Slice data to obtain Data falling in data slice + timeframe
-        eom_df = big_data.data_slice.data[big_data.data_slice.start_index-self.timeperiod:big_data.data_slice.stop_index]
-
-        dm = ((eom_df['High'] + eom_df['Low'])/2) - ((eom_df['High'].shift(1) + eom_df['Low'].shift(1))/2)
-        br = (eom_df['Volume'] / 100000000) / (eom_df['High'] - eom_df['Low'])
-        eom = dm / br
-        eom_values = eom.rolling(self.timeperiod, center=False).mean()
+        # --> Fetch EOM from the indicator tables (data falling in data slice + timeframe), shared per data slice
+        data_slice = big_data.data_slice
 
-        self.eom_values = np.array(eom_values.values[self.timeperiod:])
+        self.eom_values = data_slice.fetch_slice_artefact(
+            ("eom", self.timeperiod),
+            lambda: data_slice.indicator_tables.get_eom(data_slice.start_index, data_slice.stop_index, self.timeperiod))
 
     """
 
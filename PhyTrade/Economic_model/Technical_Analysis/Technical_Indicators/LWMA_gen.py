@@ -12,6 +12,7 @@ import numpy as np
 
 # Own modules
 from PhyTrade.Economic_model.Technical_Analysis.Technical_Indicators.ABSTRACT_indicator import ABSTRACT_indicator
+from PhyTrade.Tools.JIT_tools import calc_cross_triggers
 
 __version__ = '1.1.1'
 __author__ = 'Victor Guillet'
@@ -31,33 +32,23 @@ class LWMA(ABSTRACT_indicator):
         """
 
         self.timeperiod = timeperiod
-        self.lwma = np.zeros(big_data.data_slice.slice_size)
 
-        for i in range(big_data.data_slice.slice_size):
+        # --> Adjust timeframe if necessary
+        data_length = len(big_data.data_slice.data_selection)
 
-            # --> Adjust timeframe if necessary
-            if len(big_data.data_slice.data[:big_data.data_slice.start_index]) < self.timeperiod:
-                self.timeperiod = len(big_data.data_slice.data[:big_data.data_slice.start_index])
+        if data_length + big_data.data_slice.start_index < self.timeperiod:
+            self.timeperiod = data_length + big_data.data_slice.start_index
 
-            # ------------------ Calculate values falling in timeperiod_1 and 2
-            timeperiod_values = np.array(big_data.data_slice.data_selection[
-                                              big_data.data_slice.start_index + i - self.timeperiod + 1:
-                                              big_data.data_slice.start_index + i + 1])[::-1]
+        # ---> Compute weights for each days based on max weight param and lookback period (ordered from oldest day)
+        weights = max_weight-(max_weight/self.timeperiod)*np.arange(self.timeperiod)
 
-            # ---> Compute weights for each days based on max weight param and lookback period
-            weights = np.zeros(self.timeperiod)
+        # ------------------ Calculate values falling in data slice + timeperiod
+        first_day = data_length + big_data.data_slice.start_index
+        timeperiod_values = big_data.data_slice.data_selection[first_day - self.timeperiod + 1:
+                                                               first_day + big_data.data_slice.slice_size]
 
-            for j in range(self.timeperiod):
-                weights[j] = max_weight-(max_weight/self.timeperiod)*j
-
-            weights = weights[::-1]
-
-            # ---> Compute weighted daily values
-            weighted_values = np.zeros(big_data.data_slice.slice_size)
-            for j in range(self.timeperiod):
-                weighted_values[j] = timeperiod_values[j]*weights[j]
-
-            self.lwma[i] = sum(weighted_values)/sum(weights)
+        # ---> Compute weighted average of every day (convolution with the reversed weights)
+        self.lwma = np.convolve(timeperiod_values, weights[::-1], mode='valid')/np.sum(weights)
 
     """
 
@@ -76,31 +67,16 @@ class LWMA(ABSTRACT_indicator):
         from PhyTrade.Tools.MATH_tools import MATH_tools
 
         # ----------------- Bear/Bullish continuous signal
-        self.bb_signal = np.zeros(big_data.data_slice.slice_size)
+        daily_values = big_data.data_slice.sliced_data_selection
 
-        for i in range(big_data.data_slice.slice_size):
-            self.bb_signal[i] = (self.lwma[i] - big_data.data_slice.sliced_data_selection[i]) / 2
+        self.bb_signal = (self.lwma - daily_values) / 2
 
         # Normalising lwma bb signal values between -1 and 1
         # self.bb_signal = MATH_tools().normalise_minus_one_one(self.bb_signal)
         # TODO: Fix alignator boundaries
-        print(self.bb_signal)
         self.bb_signal = MATH_tools().alignator_minus_one_one(self.bb_signal, signal_max=100, signal_min=-100)
 
         if include_triggers_in_bb_signal:
-            # ----------------- Trigger points determination
+            # ----------------- Trigger points determination (compiled kernel when available)
             # lwma config can take two values, 0 for when lwma is higher than the close value, and 1 for the other way around
-            if self.lwma[0] > big_data.data_slice.sliced_data_selection[0]:
-                lwma_config = 0
-            else:
-                lwma_config = 1
-
-            for i in range(big_data.data_slice.slice_size):
-                if lwma_config == 0:
-                    if big_data.data_slice.sliced_data_selection[i] > self.lwma[i]:
-                        self.bb_signal[i] = 1
-                        lwma_config = 1
-                else:
-                    if self.lwma[i] > big_data.data_slice.sliced_data_selection[i]:
-                        self.bb_signal[i] = -1
-                        lwma_config = 0
+            calc_cross_triggers(self.bb_signal, self.lwma, daily_values, big_data.data_slice.slice_size)
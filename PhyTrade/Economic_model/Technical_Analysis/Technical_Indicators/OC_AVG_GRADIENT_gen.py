@@ -19,15 +19,9 @@ __date__ = '10/09/2019'
 
 class OC_AVG_GRADIENT(ABSTRACT_indicator):
     def __init__(self, big_data):
-        # ------- Calculate value fluctuation for each point in data slice
-        self.values_fluctuation = np.zeros(big_data.data_slice.slice_size)
-
-        for i in range(big_data.data_slice.slice_size):
-            self.values_fluctuation[i] = big_data.data_slice.sliced_data.iloc[i, 5] - big_data.data_slice.sliced_data.iloc[i, 4]
-
-        # -------Calculate open/close values gradient:
-        self.close_values_gradient = np.gradient(big_data.data_slice.sliced_data["Close"])
-        self.open_values_gradient = np.gradient(big_data.data_slice.sliced_data["Open"])
+        # --> The indicator has no parameters, its values are generated once per data slice and shared (read-only)
+        self.values_fluctuation, self.close_values_gradient, self.open_values_gradient, self.avg_gradient_bb_signal = \
+            big_data.data_slice.fetch_slice_artefact("oc_avg_gradient", lambda: gen_oc_avg_gradient(big_data.data_slice))
 
     """
 
@@ -39,16 +33,35 @@ class OC_AVG_GRADIENT(ABSTRACT_indicator):
     def get_output(self, big_data, include_triggers_in_bb_signal=False):
 
         # ----------------- Bear/Bullish continuous signal of dataset gradient
-        from PhyTrade.Tools.MATH_tools import MATH_tools
+        self.bb_signal = self.avg_gradient_bb_signal
+
+
+def gen_oc_avg_gradient(data_slice):
+    """
+    Generate the open close average gradient values of a data slice
+
+    :param data_slice: data_slice class instance
+    :return: Read-only values fluctuation, close/open values gradients and average gradient bb signal
+    """
+    from PhyTrade.Tools.MATH_tools import MATH_tools
+
+    sliced_data = data_slice.sliced_data[:data_slice.slice_size]
+
+    # ------- Calculate value fluctuation for each point in data slice
+    values_fluctuation = np.asarray(sliced_data.iloc[:, 5], dtype=np.float64) - np.asarray(sliced_data.iloc[:, 4], dtype=np.float64)
+
+    # -------Calculate open/close values gradient:
+    close_values_gradient = np.gradient(np.asarray(sliced_data["Close"], dtype=np.float64))
+    open_values_gradient = np.gradient(np.asarray(sliced_data["Open"], dtype=np.float64))
 
-        avg_gradient = np.zeros(big_data.data_slice.slice_size)
+    # --> Obtaining the average gradient
+    avg_gradient = (close_values_gradient + open_values_gradient) / 2
 
-        # --> Obtaining the average gradient
-        for i in range(big_data.data_slice.slice_size):
-            avg_gradient[i] = (self.close_values_gradient[i] + self.open_values_gradient[i]) / 2
+    # --> Normalising avg gradient values between -1 and 1
+    # avg_gradient_bb_signal = MATH_tools().normalise_minus_one_one(avg_gradient)
+    avg_gradient_bb_signal = MATH_tools().alignator_minus_one_one(avg_gradient, signal_max=10, signal_min=-10)
 
-        # --> Normalising avg gradient values between -1 and 1
-        # avg_gradient_bb_signal = MATH_tools().normalise_minus_one_one(avg_gradient)
-        avg_gradient_bb_signal = MATH_tools().alignator_minus_one_one(avg_gradient, signal_max=10, signal_min=-10)
+    for values in (values_fluctuation, close_values_gradient, open_values_gradient, avg_gradient_bb_signal):
+        values.setflags(write=False)
 
-        self.bb_signal = avg_gradient_bb_signal
+    return values_fluctuation, close_values_gradient, open_values_gradient, avg_gradient_bb_signal
@@ -9,6 +9,7 @@ import numpy as np
 
 # Own modules
 from PhyTrade.Economic_model.Technical_Analysis.Technical_Indicators.ABSTRACT_indicator import ABSTRACT_indicator
+from PhyTrade.Tools.JIT_tools import gen_kernel_input, calc_rsi_dynamic_bounds, calc_rsi_triggers
 
 __version__ = '1.1.1'
 __author__ = 'Victor Guillet'
@@ -37,25 +38,11 @@ class RSI(ABSTRACT_indicator):
         self.standard_lower_threshold = standard_lower_threshold
         
         # -------------------------- RSI CALCULATION ---------------------------
-        # --> Slice data to obtain Data falling in data slice + rsi timeframe
-        rsi_df = big_data.data_slice.data[big_data.data_slice.start_index-self.timeframe:big_data.data_slice.stop_index]
-
-        # --> Get the difference in price from previous step
-        delta = rsi_df[big_data.data_slice.selection].diff()
-
-        # --> Make the positive gains (up) and negative gains (down) Series
-        up, down = delta.copy(), delta.copy()
-        up[up < 0] = 0
-        down[down > 0] = 0
-
-        # --> Calculate the EWMA
-        roll_up = up.ewm(com=self.timeframe - 1, adjust=False).mean()
-        roll_down = down.ewm(com=self.timeframe - 1, adjust=False).mean().abs()
-
-        # --> Calculate the RSI based on EWMA
-        rsi = 100 - 100 / (1 + roll_up / roll_down)
-
-        self.rsi_values = np.array(rsi.values[self.timeframe:])
+        # --> Fetch RSI from the indicator tables (EWMA of gains/losses over data slice + rsi timeframe)
+        self.rsi_values = big_data.data_slice.indicator_tables.get_rsi(big_data.data_slice.selection,
+                                                                        big_data.data_slice.start_index,
+                                                                        big_data.data_slice.stop_index,
+                                                                        self.timeframe)
 
         # -------------------------WEIGHTED BUFFER DEFINITION-----------------
         # Buffer settings:
@@ -83,41 +70,16 @@ class RSI(ABSTRACT_indicator):
         self.upper_bound[:] = self.standard_lower_threshold
         self.lower_bound[:] = self.standard_upper_threshold
 
-        # Define upper dynamic bound method
-        freeze_trade_upper = False
-
-        for i in range(big_data.data_slice.slice_size):
-            if self.rsi_values[i] < self.standard_upper_threshold:
-                freeze_trade_upper = False
-
-            if self.rsi_values[i] > (self.standard_upper_threshold + rsi_buffer) and freeze_trade_upper is False:
-                new_upper_bound = self.rsi_values[i] - rsi_buffer
-                if new_upper_bound >= self.upper_bound[i-1]:
-                    self.upper_bound[i] = new_upper_bound
-
-                elif self.rsi_values[i] < self.upper_bound[i-1]:
-                    freeze_trade_upper = True
-
-                else:
-                    self.upper_bound[i] = self.upper_bound[i-1]
-
-        # Define lower dynamic bound method
-        freeze_trade_lower = False
-
-        for i in range(len(self.rsi_values)):
-            if self.rsi_values[i] > self.standard_lower_threshold:
-                freeze_trade_lower = False
-
-            if self.rsi_values[i] < (self.standard_lower_threshold - rsi_buffer) and freeze_trade_lower is False:
-                new_lower_bound = self.rsi_values[i] + rsi_buffer
-                if new_lower_bound <= self.upper_bound[i-1]:
-                    self.lower_bound[i] = new_lower_bound
+        # Define upper and lower dynamic bounds (compiled kernel when available)
+        upper_bound = gen_kernel_input(self.upper_bound)
+        lower_bound = gen_kernel_input(self.lower_bound)
 
-                elif self.rsi_values[i] > self.lower_bound[i - 1]:
-                    freeze_trade_lower = True
+        calc_rsi_dynamic_bounds(gen_kernel_input(self.rsi_values), upper_bound, lower_bound,
+                                self.standard_upper_threshold, self.standard_lower_threshold, rsi_buffer,
+                                big_data.data_slice.slice_size)
 
-                else:
-                    self.lower_bound[i] = self.lower_bound[i-1]
+        self.upper_bound = np.array(upper_bound)
+        self.lower_bound = np.array(lower_bound)
 
     """
 
@@ -143,32 +105,10 @@ class RSI(ABSTRACT_indicator):
         self.bb_signal = MATH_tools().alignator_minus_one_one(self.bb_signal, signal_max=100, signal_min=-100)
 
         if include_triggers_in_bb_signal:
-            # ----------------- Trigger points determination
-            # Buy and sell triggers can take three values:
-            # 0 for neutral, 1 for sell at next bound crossing and 2 for post-sell
-            sell_trigger = 0
-            buy_trigger = 0
-
-            # Defining indicator trigger for...
-            for i in range(big_data.data_slice.slice_size):
-                # ...upper bound
-                if self.rsi_values[i] >= self.standard_upper_threshold and sell_trigger == 0:  # Initiate sell trigger
-                    sell_trigger = 1
-
-                if self.rsi_values[i] <= self.upper_bound[i] and sell_trigger == 1:  # Trigger sell signal
-                    self.bb_signal[i] = 1
-                    sell_trigger = 2
-
-                if self.rsi_values[i] < self.standard_upper_threshold and sell_trigger == 2:  # Reset trigger
-                    sell_trigger = 0
-
-                # ...lower bound
-                if self.rsi_values[i] <= self.standard_lower_threshold and buy_trigger == 0:  # Initiate buy trigger
-                    buy_trigger = 1
-
-                if self.rsi_values[i] >= self.lower_bound[i] and buy_trigger == 1:  # Trigger buy signal
-                    self.bb_signal[i] = -1
-                    buy_trigger = 2
-
-                if self.rsi_values[i] > self.standard_lower_threshold and sell_trigger == 2:  # Reset trigger
-                    buy_trigger = 0
+            # ----------------- Trigger points determination (compiled kernel when available)
+            calc_rsi_triggers(self.bb_signal,
+                              gen_kernel_input(self.rsi_values),
+                              gen_kernel_input(self.upper_bound),
+                              gen_kernel_input(self.lower_bound),
+                              self.standard_upper_threshold, self.standard_lower_threshold,
+                              big_data.data_slice.slice_size)
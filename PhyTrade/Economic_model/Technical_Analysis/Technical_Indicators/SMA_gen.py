@@ -4,11 +4,9 @@
 Used for computing the SMA indicator
 """
 
-# Libs
-import numpy as np
-
 # Own modules
 from PhyTrade.Economic_model.Technical_Analysis.Technical_Indicators.ABSTRACT_indicator import ABSTRACT_indicator
+from PhyTrade.Tools.JIT_tools import calc_cross_triggers
 
 __version__ = '1.1.1'
 __author__ = 'Victor Guillet'
@@ -31,14 +29,18 @@ class SMA(ABSTRACT_indicator):
         self.timeperiod_2 = timeperiod_2
 
         # -------------------------- SMA CALCULATION ---------------------------
-        # --> Slice data to obtain Data falling in data slice + max timeframe
-        sma_df = big_data.data_slice.data[big_data.data_slice.start_index-max(self.timeperiod_1, timeperiod_2):big_data.data_slice.stop_index]
-
-        sma_1 = sma_df[big_data.data_slice.selection].rolling(window=self.timeperiod_1, center=False).mean()
-        sma_2 = sma_df[big_data.data_slice.selection].rolling(window=self.timeperiod_2, center=False).mean()
-
-        self.sma_1 = np.array(sma_1.values[self.timeperiod_1:])
-        self.sma_2 = np.array(sma_2.values[self.timeperiod_2:])
+        # --> Fetch SMAs from the indicator tables (data falling in data slice + max timeframe), shared per data slice
+        data_slice = big_data.data_slice
+        lookback = max(self.timeperiod_1, self.timeperiod_2)
+
+        self.sma_1 = data_slice.fetch_slice_artefact(
+            ("sma", lookback, self.timeperiod_1),
+            lambda: data_slice.indicator_tables.get_sma(data_slice.selection, data_slice.start_index,
+                                                        data_slice.stop_index, lookback, self.timeperiod_1))
+        self.sma_2 = data_slice.fetch_slice_artefact(
+            ("sma", lookback, self.timeperiod_2),
+            lambda: data_slice.indicator_tables.get_sma(data_slice.selection, data_slice.start_index,
+                                                        data_slice.stop_index, lookback, self.timeperiod_2))
 
     """
 
@@ -57,29 +59,15 @@ class SMA(ABSTRACT_indicator):
         from PhyTrade.Tools.MATH_tools import MATH_tools
 
         # ----------------- Bear/Bullish continuous signal
-        self.bb_signal = np.zeros(big_data.data_slice.slice_size)
+        slice_size = big_data.data_slice.slice_size
 
-        for i in range(big_data.data_slice.slice_size):
-            self.bb_signal[i] = (self.sma_1[i] - self.sma_2[i])/2
+        self.bb_signal = (self.sma_1[:slice_size] - self.sma_2[:slice_size])/2
 
         # --> Normalising sma bb signal values between -1 and 1
         # self.bb_signal = MATH_tools().normalise_minus_one_one(self.bb_signal)
         self.bb_signal = MATH_tools().alignator_minus_one_one(self.bb_signal, signal_max=15, signal_min=-15)
 
         if include_triggers_in_bb_signal:
-            # ----------------- Trigger points determination
-            # sma config can take two values, 0 for when sma_1 is higher than sma_2, and 2 for the other way around
-            if self.sma_1[0] > self.sma_2[0]:
-                sma_config = 0
-            else:
-                sma_config = 1
-
-            for i in range(big_data.data_slice.slice_size):
-                if sma_config == 0:
-                    if self.sma_2[i] > self.sma_1[i]:
-                        self.bb_signal[i] = 1
-                        sma_config = 1
-                else:
-                    if self.sma_1[i] > self.sma_2[i]:
-                        self.bb_signal[i] = -1
-                        sma_config = 0
+            # ----------------- Trigger points determination (compiled kernel when available)
+            # sma config can take two values, 0 for when sma_1 is higher than sma_2, and 1 for the other way around
+            calc_cross_triggers(self.bb_signal, self.sma_1, self.sma_2, slice_size)
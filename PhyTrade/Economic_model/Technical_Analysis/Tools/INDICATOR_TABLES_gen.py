@@ -0,0 +1,336 @@
+
+##################################################################################################################
+"""
+Used to precompute technical indicators over the full history of a ticker. One row is generated per
+indicator/column/timeframe combination the first time it is requested, and is then shared by every data slice
+and individual of the process (through the dataset registry).
+
+Indicator instances obtain their values from these rows (window starting at start_index - lookback):
+    - Rolling mean/std indicators (SMA, CCI, EOM) are computed by pandas over the window only, from element-wise
+      rows (typical price, EOM ratio): pandas rolling sums are updated incrementally and their rounding depends
+      on the window start. The values (including the NaN of degenerate windows) are those of the original windowed
+      computations, and are shared per data slice by the indicators (see data_slice.fetch_slice_artefact)
+    - Volatility is the correctly rounded sample standard deviation of each window (as statistics.stdev),
+      independent of the window start, and is a direct slice of its row
+    - Exponential indicators (EMA, RSI) are recovered from the full history recursion using the closed form
+      of the windowed recursion. They match the windowed pandas ewm up to rounding (~1e-14 relative)
+"""
+
+# Built-in/Generic Imports
+import math
+import threading
+
+# Libs
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+__version__ = '1.1.1'
+__author__ = 'Victor Guillet'
+__date__ = '10/09/2019'
+
+##################################################################################################################
+
+
+class Indicator_tables:
+    def __init__(self, data):
+        """
+        Generates the indicator tables of a technical dataset
+
+        :param data: Technical dataset (pandas dataframe)
+        """
+        self.data = data
+        self.data_length = len(data)
+
+        # --> (indicator, column, timeframe): full history row
+        self.rows = {}
+
+        # --> Rows can be generated from multiple threads (see the thread evaluation backend)
+        self.lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        with self.lock:
+            return sum(row.nbytes for row in self.rows.values())
+
+    def get_row(self, indicator, column, timeframe):
+        """
+        Fetch the full history row of an indicator, computing it if necessary
+
+        :param indicator: Indicator reference (ema, rsi_up, rsi_down, typical_price, eom_ratio, volatility)
+        :param column: Data column used
+        :param timeframe: Timeframe of the indicator
+        :return: Read-only numpy array
+        """
+        key = (indicator, column, timeframe)
+
+        if key not in self.rows:
+            if indicator == "ema":
+                row = self.gen_ema_row(column, timeframe)
+
+            elif indicator == "rsi_up":
+                row = self.gen_rsi_row(column, timeframe, up=True)
+
+            elif indicator == "rsi_down":
+                row = self.gen_rsi_row(column, timeframe, up=False)
+
+            elif indicator == "typical_price":
+                row = self.gen_typical_price_row()
+
+            elif indicator == "eom_ratio":
+                row = self.gen_eom_ratio_row()
+
+            elif indicator == "volatility":
+                row = self.gen_volatility_row(column, timeframe)
+
+            else:
+                raise ValueError("Invalid indicator reference: " + str(indicator))
+
+            row = np.ascontiguousarray(row, dtype=np.float64)
+            row.setflags(write=False)
+            self.record_row(key, row)
+
+        return self.rows[key]
+
+    def precompute(self, indicator, column, timeframes):
+        """
+        Compute the rows of an indicator for a range of timeframes in advance
+
+        :param indicator: Indicator reference (ema, rsi_up, rsi_down, volatility)
+        :param column: Data column used
+        :param timeframes: Iterable of timeframes
+        """
+        for timeframe in timeframes:
+            self.get_row(indicator, column, timeframe)
+
+    def get_window(self, start_index, stop_index, lookback):
+        """
+        Determine the absolute positions of the data window used by an indicator,
+        equivalent to data[start_index-lookback:stop_index]
+
+        :return: Window start position, window stop position
+        """
+        window_start, window_stop, _ = slice(start_index - lookback, stop_index).indices(self.data_length)
+
+        return window_start, max(window_start, window_stop)
+
+    # ========================================= Indicator values =========================================
+    def get_sma(self, column, start_index, stop_index, lookback, timeperiod):
+        window_start, window_stop = self.get_window(start_index, stop_index, lookback)
+
+        window = pd.Series(self.get_column(column)[window_start:window_stop])
+
+        return freeze(window.rolling(window=timeperiod, center=False).mean().values[timeperiod:])
+
+    def get_ema(self, column, start_index, stop_index, lookback, timeperiod):
+        window_start, window_stop = self.get_window(start_index, stop_index, lookback)
+
+        # --> Windowed adjusted ewm: y_t = (N_t - w^(t-s+1)*N_(s-1)) * (1-w)/(1-w^(t-s+1))
+        w = 1 - 2/(timeperiod + 1)
+        numerators = self.get_row("ema", column, timeperiod)
+
+        positions = np.arange(window_start + timeperiod, window_stop)
+        decay = w ** (positions - window_start + 1)
+
+        if window_start == 0:
+            previous_numerator = 0.
+        else:
+            previous_numerator = numerators[window_start - 1]
+
+        return (numerators[positions] - decay * previous_numerator) * (1 - w) / (1 - decay)
+
+    def get_rsi(self, column, start_index, stop_index, timeframe):
+        window_start, window_stop = self.get_window(start_index, stop_index, timeframe)
+
+        roll_up = self.get_windowed_rsi_ewm("rsi_up", column, window_start, window_stop, timeframe)
+        roll_down = np.abs(self.get_windowed_rsi_ewm("rsi_down", column, window_start, window_stop, timeframe))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 100 - 100 / (1 + roll_up / roll_down)
+
+    def get_cci(self, start_index, stop_index, timeperiod):
+        window_start, window_stop = self.get_window(start_index, stop_index, timeperiod)
+
+        tp = pd.Series(self.get_row("typical_price", None, None)[window_start:window_stop])
+
+        return freeze(((tp - tp.rolling(window=timeperiod, center=False).mean()) /
+                       (0.015 * tp.rolling(window=timeperiod, center=False).std())).values[timeperiod:])
+
+    def get_eom(self, start_index, stop_index, timeperiod):
+        window_start, window_stop = self.get_window(start_index, stop_index, timeperiod)
+
+        # --> The first distance moved of the window is undefined
+        eom = np.array(self.get_row("eom_ratio", None, None)[window_start:window_stop])
+        eom[:1] = np.nan
+
+        return freeze(pd.Series(eom).rolling(timeperiod, center=False).mean().values[timeperiod:])
+
+    def get_volatility(self, column, start_index, slice_size, timeframe):
+        """
+        Annualised volatility of every day of a slice, computed over the timeframe preceding each day (day included)
+        """
+        first_position = self.data_length + start_index
+
+        return self.get_row("volatility", column, timeframe)[first_position:first_position + slice_size]
+
+    def get_volatilities(self, column, start_index, slice_size, timeframes):
+        """
+        Annualised volatility of every day of a slice for multiple timeframes at once
+
+        :return: (timeframes x days) numpy array
+        """
+        self.precompute("volatility", column, timeframes)
+
+        return np.array([self.get_volatility(column, start_index, slice_size, timeframe) for timeframe in timeframes])
+
+    def get_windowed_rsi_ewm(self, indicator, column, window_start, window_stop, timeframe):
+        # --> First delta of the window is undefined, the windowed ewm starts on the following day (s)
+        # --> Windowed unadjusted ewm: y_t = R_t - w^(t-s)*(R_s - x_s)
+        w = 1 - 1/timeframe
+        first_position = window_start + 1
+
+        ewm_row = self.get_row(indicator, column, timeframe)
+        deltas = self.get_deltas(column, up=(indicator == "rsi_up"))
+
+        positions = np.arange(window_start + timeframe, window_stop)
+        decay = w ** (positions - first_position)
+
+        return ewm_row[positions] - decay * (ewm_row[first_position] - deltas[first_position])
+
+    # ========================================= Rows generation =========================================
+    def get_column(self, column):
+        return np.ascontiguousarray(self.data[column], dtype=np.float64)
+
+    def get_deltas(self, column, up=True):
+        key = ("delta_up" if up else "delta_down", column, None)
+
+        if key not in self.rows:
+            deltas = np.empty(self.data_length)
+            deltas[0] = np.nan
+            deltas[1:] = np.diff(self.get_column(column))
+
+            if up:
+                deltas[1:] = np.maximum(deltas[1:], 0)
+            else:
+                deltas[1:] = np.minimum(deltas[1:], 0)
+
+            deltas.setflags(write=False)
+            self.record_row(key, deltas)
+
+        return self.rows[key]
+
+    def record_row(self, key, row):
+        # --> Rows generated concurrently are identical, the first one recorded is kept
+        with self.lock:
+            self.rows.setdefault(key, row)
+
+    def gen_ema_row(self, column, timeperiod):
+        # --> Full history numerator of the adjusted ewm: N_t = w*N_(t-1) + x_t
+        w = 1 - 2/(timeperiod + 1)
+
+        return lfilter([1.], [1., -w], self.get_column(column))
+
+    def gen_rsi_row(self, column, timeframe, up=True):
+        # --> Full history unadjusted ewm of the gains/losses, starting from the first delta: R_t = w*R_(t-1) + a*x_t
+        alpha = 1/timeframe
+        deltas = self.get_deltas(column, up)
+
+        row = np.empty(self.data_length)
+        row[0] = np.nan
+
+        if self.data_length > 1:
+            row[1] = deltas[1]
+            row[2:] = lfilter([alpha], [1., -(1 - alpha)], deltas[2:], zi=[(1 - alpha) * deltas[1]])[0]
+
+        return row
+
+    def gen_typical_price_row(self):
+        return (self.get_column('High') + self.get_column('Low') + self.get_column('Close')) / 3
+
+    def gen_eom_ratio_row(self):
+        high = self.get_column('High')
+        low = self.get_column('Low')
+
+        dm = np.empty(self.data_length)
+        dm[0] = np.nan
+        dm[1:] = (high[1:] + low[1:])/2 - (high[:-1] + low[:-1])/2
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            br = (self.get_column('Volume') / 100000000) / (high - low)
+            return dm / br
+
+    def gen_volatility_row(self, column, timeframe):
+        # --> Sample standard deviation of each rolling window (exact, as statistics.stdev), annualised
+        values = self.get_column(column)
+
+        row = np.full(self.data_length, np.nan)
+
+        if timeframe >= 2 and self.data_length >= timeframe:
+            row[timeframe - 1:] = calc_rolling_stdev(values, timeframe)
+
+        return row*np.sqrt(252/timeframe)
+
+
+def freeze(array):
+    array.setflags(write=False)
+    return array
+
+
+def calc_rolling_stdev(values, window):
+    """
+    Correctly rounded sample standard deviation of every rolling window of a series (same values as statistics.stdev).
+    The values are converted to integers over a common power of two denominator, the sums of each window are
+    then exact. Windows containing non-finite values are NaN.
+
+    :param values: float64 numpy array
+    :param window: Window size (at least 2)
+    :return: float64 numpy array (one value per complete window)
+    """
+    stdevs = np.full(len(values) - window + 1, np.nan)
+    finite = np.isfinite(values)
+
+    if not finite.any():
+        return stdevs
+
+    # --> Exact integer representation of the values: value = integer/denominator
+    ratios = [value.as_integer_ratio() if is_finite else (0, 1) for value, is_finite in zip(values.tolist(), finite)]
+    denominator = max(ratio[1] for ratio in ratios)
+    integers = [numerator*(denominator//ratio_denominator) for numerator, ratio_denominator in ratios]
+
+    # --> Count of non-finite values in each window
+    non_finite_counts = np.convolve(~finite, np.ones(window, dtype=np.int64), mode="valid")
+
+    # --> Sum and sum of squares of the current window, mss = (n*sxx - sx^2)/(n*(n-1)*denominator^2)
+    sx = sum(integers[:window - 1])
+    sxx = sum(integer*integer for integer in integers[:window - 1])
+    mss_denominator = window*(window - 1)*denominator*denominator
+
+    for i in range(len(stdevs)):
+        sx += integers[i + window - 1]
+        sxx += integers[i + window - 1]**2
+
+        if non_finite_counts[i] == 0:
+            stdevs[i] = calc_float_sqrt_of_frac(window*sxx - sx*sx, mss_denominator)
+
+        sx -= integers[i]
+        sxx -= integers[i]**2
+
+    return stdevs
+
+
+def calc_float_sqrt_of_frac(numerator, denominator):
+    """
+    Correctly rounded square root of a non-negative fraction of integers (same method as the statistics module)
+    """
+    # --> Integer square root with at least 55 significant bits, rounded to odd (to round correctly to a float)
+    q = (numerator.bit_length() - denominator.bit_length() - 109) // 2
+
+    if q >= 0:
+        root = math.isqrt(numerator // (denominator << 2*q))
+        root = (root | (root*root*(denominator << 2*q) != numerator)) << q
+        return root / 1
+
+    root = math.isqrt((numerator << -2*q) // denominator)
+    root = root | (root*root*denominator != numerator << -2*q)
+
+    return root / (1 << -q)
@@ -21,3 +21,6 @@ class Metalabeling_settings:
         self.upper_barrier = 20
         self.lower_barrier = -20
         self.look_ahead = 20
+
+        # --> Save the full history barrier labels to disk (regenerated when the technical data is modified)
+        self.metalabels_disk_cache = False
@@ -25,6 +25,21 @@ class Optimiser_settings:
         self.multiprocessing = False
         self.max_process_count = multiprocessing.cpu_count() - 1
 
+        # --> Population evaluation backend, the worker pool backends are opt-in
+        #     (process backend falls back to serial when ran from a daemonic process)
+        self.evaluation_backends = ["serial", "process", "thread"]
+        self.evaluation_backend = "serial"
+        self.evaluation_chunks_per_process = 3
+
+        # --> Generate the economic models of the individuals evaluated together in batch (see Prototype_5_batch)
+        self.batch_evaluation = True
+
+        # --> Maximum number of individual evaluations memoised (0 to disable)
+        self.fitness_cache_size = 2000
+
+        # --> Seed of the random number generators (None: not seeded, the run can be seeded through random.seed)
+        self.random_seed = None
+
         # ___________________________ Print/plot parameters ______________________
         self.print_evoa_parameters_per_gen = True
         self.print_evaluation_status = False
@@ -64,8 +79,9 @@ class Optimiser_settings:
         self.random_ind_decay_function = 1
         self.mutation_decay_function = 1
 
-        self.parents_selection_methods = ["Elitic"]
+        self.parents_selection_methods = ["Elitic", "Tournament", "Roulette"]
         self.parents_selection_method = 0
+        self.parents_tournament_size = 3
 
         # ___________________________ Generation 0 parameters ____________________
         # -- Starting parameters
@@ -83,6 +99,21 @@ class Optimiser_settings:
         self.multiprocessing = False
         self.max_process_count = multiprocessing.cpu_count() - 1
 
+        # --> Population evaluation backend, the worker pool backends are opt-in
+        #     (process backend falls back to serial when ran from a daemonic process)
+        self.evaluation_backends = ["serial", "process", "thread"]
+        self.evaluation_backend = "serial"
+        self.evaluation_chunks_per_process = 3
+
+        # --> Generate the economic models of the individuals evaluated together in batch (see Prototype_5_batch)
+        self.batch_evaluation = True
+
+        # --> Maximum number of individual evaluations memoised (0 to disable)
+        self.fitness_cache_size = 2000
+
+        # --> Seed of the random number generators (None: not seeded, the run can be seeded through random.seed)
+        self.random_seed = None
+
         # ___________________________ Print/plot parameters ______________________
         self.print_evoa_parameters_per_gen = False
         self.print_evaluation_status = False
@@ -119,8 +150,9 @@ class Optimiser_settings:
         self.random_ind_decay_function = 1
         self.mutation_decay_function = 1
 
-        self.parents_selection_methods = ["Elitic"]
+        self.parents_selection_methods = ["Elitic", "Tournament", "Roulette"]
         self.parents_selection_method = 0
+        self.parents_tournament_size = 3
 
         # ___________________________ Generation 0 parameters ____________________
         # -- Starting parameters
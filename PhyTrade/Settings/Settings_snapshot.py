@@ -0,0 +1,99 @@
+
+##################################################################################################################
+"""
+Used to generate a read-only snapshot of the settings used on the hot paths (trade runs, individuals, economic models)
+
+The settings classes regenerate their attributes (and read the parameter sets from disk for the market settings)
+every time a gen_*_settings method is called. The snapshot generates them once per process, the first time it is
+requested (or when it is explicitly refreshed/set), and is then shared by every tradebot, account, individual and
+model instantiated in the process. Transaction cost parameters are precomputed.
+
+The optimiser refreshes the snapshot at the start of every run (see EVOA_optimiser), the evaluation pool worker
+processes are provided with the snapshot of the main process.
+"""
+
+# Own modules
+from PhyTrade.Settings.SETTINGS import SETTINGS
+
+__version__ = '1.1.1'
+__author__ = 'Victor Guillet'
+__date__ = '10/09/2019'
+
+##################################################################################################################
+
+# --> Process-wide settings snapshot (generated on first request)
+settings_snapshot = None
+
+
+class Frozen_settings:
+    def __init__(self, settings):
+        """
+        Read-only copy of the attributes of a generated settings class (lists are converted to tuples)
+
+        :param settings: Settings class instance with settings generated
+        """
+        for key, value in vars(settings).items():
+            if type(value) is list:
+                value = tuple(value)
+
+            object.__setattr__(self, key, value)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Settings snapshot is read-only (" + key + ")")
+
+    def __delattr__(self, key):
+        raise AttributeError("Settings snapshot is read-only (" + key + ")")
+
+
+class Settings_snapshot:
+    def __init__(self):
+        settings = SETTINGS()
+
+        settings.market_settings.gen_market_settings()
+        settings.tradebot_settings.gen_tradebot_settings()
+        settings.model_settings.gen_model_settings()
+        settings.individual_settings.gen_individual_settings()
+        settings.signal_training_settings.gen_evoa_settings()
+
+        self.market_settings = Frozen_settings(settings.market_settings)
+        self.tradebot_settings = Frozen_settings(settings.tradebot_settings)
+        self.model_settings = Frozen_settings(settings.model_settings)
+        self.individual_settings = Frozen_settings(settings.individual_settings)
+        self.signal_training_settings = Frozen_settings(settings.signal_training_settings)
+
+        # --> Broker settings
+        self.min_transaction_cost = self.market_settings.min_transaction_cost
+        self.transaction_cost_per_share = self.market_settings.transaction_cost_per_share
+
+    def calc_transaction_cost(self, asset_count):
+        transaction_cost = asset_count*self.transaction_cost_per_share
+        if transaction_cost < self.min_transaction_cost:
+            transaction_cost = self.min_transaction_cost
+
+        return transaction_cost
+
+
+def get_settings_snapshot(refresh=False):
+    """
+    Fetch the process-wide settings snapshot, generated on first request
+
+    :param refresh: Regenerate the snapshot (ie: after the settings files were modified)
+    :return: Settings_snapshot
+    """
+    global settings_snapshot
+
+    if settings_snapshot is None or refresh:
+        settings_snapshot = Settings_snapshot()
+
+    return settings_snapshot
+
+
+def set_settings_snapshot(snapshot):
+    """
+    Set the process-wide settings snapshot (ie: to provide worker processes with the snapshot of the main process)
+
+    :param snapshot: Settings_snapshot
+    """
+    global settings_snapshot
+
+    settings_snapshot = snapshot
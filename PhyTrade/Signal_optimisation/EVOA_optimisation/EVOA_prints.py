@@ -103,10 +103,9 @@ class EVOA_prints:
         index_best_individual = fitness_evaluation.index(max(fitness_evaluation))
 
         print("Net worth:", round(net_worth[index_best_individual], 3))
-        print("Transaction count:", population[index_best_individual].tradebot.buy_count +
-              population[index_best_individual].tradebot.sell_count)
-        print("Buy count:", population[index_best_individual].tradebot.buy_count)
-        print("Sell count:", population[index_best_individual].tradebot.sell_count)
+        print("Transaction count:", population[index_best_individual].metrics.transaction_count)
+        print("Buy count:", population[index_best_individual].metrics.buy_count)
+        print("Sell count:", population[index_best_individual].metrics.sell_count)
 
         print("\nBest Individual fitness:", round(max(fitness_evaluation), 3))
         print("Average fitness:", round((sum(fitness_evaluation) / len(fitness_evaluation)), 3), "\n")
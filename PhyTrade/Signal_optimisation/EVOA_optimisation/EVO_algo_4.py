@@ -7,13 +7,20 @@ This script contains the EVOA_optimiser class, which is a refactored and optimis
 # Built-in/Generic Imports
 import time
 import math
+import random
 
 # Own modules
+from PhyTrade.Data_Collection_preparation.Shared_technical_data import share_technical_data, \
+    release_shared_technical_data
+from PhyTrade.Settings.Settings_snapshot import get_settings_snapshot
 from PhyTrade.Signal_optimisation.EVOA_optimisation.EVOA_prints import EVOA_prints
 from PhyTrade.Signal_optimisation.EVOA_optimisation.Tools.EVOA_tools import EVOA_tools
+from PhyTrade.Signal_optimisation.EVOA_optimisation.Tools.EVOA_fitness_cache import Fitness_cache
 from PhyTrade.Signal_optimisation.EVOA_optimisation.Tools.EVOA_results_gen import EVOA_results_gen
+from PhyTrade.Signal_optimisation.EVOA_optimisation.Tools.EVOA_random_gen import EVOA_random_gen
 from PhyTrade.Tools.INDIVIDUAL_gen import Individual
 from PhyTrade.Tools.DATA_SLICE_gen import data_slice
+from PhyTrade.Tools.MULTI_PROCESSING_tools import Evaluation_pool
 from PhyTrade.Tools.Progress_bar_tool import Progress_bar
 
 __version__ = '1.1.1'
@@ -24,8 +31,12 @@ __date__ = '10/09/2019'
 
 
 class EVOA_optimiser:
-    def __init__(self, settings, ticker="AAPL", optimiser_setting="1"):
+    def __init__(self, settings, ticker="AAPL", optimiser_setting="1", data_handle=None):
         # ======================== GA OPTIMISATION INITIALISATION =======================
+        # --> Regenerate the settings snapshot used on the hot paths (settings may have changed since the last run,
+        #     worker processes are provided with it when the evaluation pool starts)
+        get_settings_snapshot(refresh=True)
+
         # ------------------ Tools and GA parameters initialisation
         # --> EVOA run as signal tuner
         if optimiser_setting == 1:
@@ -54,183 +65,243 @@ class EVOA_optimiser:
             settings.signal_training_settings.plot_eco_model_results = False
             settings.signal_training_settings.plot_best_individual_eco_model_results = False
 
-        self.data_slice = data_slice(ticker,
-                                     settings.start_date,
-                                     settings.market_settings.data_slice_size,
-                                     settings.signal_training_settings.data_slice_shift_per_gen,
-                                     data_selection=settings.market_settings.price_selection,
-                                     end_date=settings.end_date,
-                                     data_looper=settings.signal_training_settings.data_looper)
-
-        self.data_slice.gen_slice_metalabels(settings.metalabeling_settings.upper_barrier, settings.metalabeling_settings.lower_barrier,
-                                             settings.metalabeling_settings.look_ahead,
-                                             settings.metalabeling_settings.metalabeling_setting)
-
-        # --> Update generation count if end_date results in lower slice count
-        if abs(self.data_slice.default_start_index-self.data_slice.default_end_index) < settings.market_settings.data_slice_size*settings.signal_training_settings.nb_of_generations:
-            settings.signal_training_settings.nb_of_generations = \
-                math.ceil(abs(self.data_slice.default_start_index-self.data_slice.default_end_index)/settings.market_settings.data_slice_size)*settings.signal_training_settings.data_slice_cycle_count
+        # --> Initialise persistent evaluation pool (evaluation prints/plots require a sequential evaluation)
+        if settings.signal_training_settings.evaluation_backend == "serial" \
+                or settings.signal_training_settings.print_evaluation_status \
+                or settings.signal_training_settings.plot_eco_model_results:
+            self.evaluation_pool = None
 
-            if settings.signal_training_settings.multiprocessing is False:
-                print("\n--> Generation count updated to", settings.signal_training_settings.nb_of_generations, "to match available data <--\n")
-
-            # Re-adjust cycle count if evoa run as optimiser
-            if optimiser_setting == 2:
-                settings.signal_training_settings.data_slice_cycle_count = settings.signal_training_settings.nb_of_generations
+        else:
+            self.evaluation_pool = Evaluation_pool(settings.signal_training_settings.evaluation_backend,
+                                                   settings.signal_training_settings.max_process_count,
+                                                   settings.signal_training_settings.evaluation_chunks_per_process,
+                                                   settings.signal_training_settings.batch_evaluation)
+
+        # --> Share technical data with the worker processes
+        self.data_handle = data_handle
+        self.data_handle_owned = False
+
+        if self.data_handle is None and self.evaluation_pool is not None and self.evaluation_pool.backend == "process":
+            self.data_handle = share_technical_data(ticker)
+            self.data_handle_owned = True
+
+        self.data_slice = None
+
+        try:
+            self.data_slice = data_slice(ticker,
+                                         settings.start_date,
+                                         settings.market_settings.data_slice_size,
+                                         settings.signal_training_settings.data_slice_shift_per_gen,
+                                         data_selection=settings.market_settings.price_selection,
+                                         end_date=settings.end_date,
+                                         data_looper=settings.signal_training_settings.data_looper,
+                                         data_handle=self.data_handle)
+
+            self.data_slice.gen_slice_metalabels(settings.metalabeling_settings.upper_barrier, settings.metalabeling_settings.lower_barrier,
+                                                 settings.metalabeling_settings.look_ahead,
+                                                 settings.metalabeling_settings.metalabeling_setting,
+                                                 disk_cache=settings.metalabeling_settings.metalabels_disk_cache)
+
+            # --> Update generation count if end_date results in lower slice count
+            if abs(self.data_slice.default_start_index-self.data_slice.default_end_index) < settings.market_settings.data_slice_size*settings.signal_training_settings.nb_of_generations:
+                settings.signal_training_settings.nb_of_generations = \
+                    math.ceil(abs(self.data_slice.default_start_index-self.data_slice.default_end_index)/settings.market_settings.data_slice_size)*settings.signal_training_settings.data_slice_cycle_count
+
+                if settings.signal_training_settings.multiprocessing is False:
+                    print("\n--> Generation count updated to", settings.signal_training_settings.nb_of_generations, "to match available data <--\n")
+
+                # Re-adjust cycle count if evoa run as optimiser
+                if optimiser_setting == 2:
+                    settings.signal_training_settings.data_slice_cycle_count = settings.signal_training_settings.nb_of_generations
+
+            settings.signal_training_settings.exploitation_phase_len = \
+                round(settings.signal_training_settings.nb_of_generations*settings.signal_training_settings.exploitation_phase_len_percent)
+
+            # --> Initialise tools and counters
+            self.evoa_tools = EVOA_tools()
+
+            # --> Random number generators (random module used by the random individuals, numpy for mutation/selection)
+            if settings.signal_training_settings.random_seed is not None:
+                random.seed(settings.signal_training_settings.random_seed)
+
+            self.rng = EVOA_random_gen.gen_numpy_random_generator(settings.signal_training_settings.random_seed)
+
+            # --> Evaluation memoisation (disabled when evaluation prints/plots are required)
+            if settings.signal_training_settings.fitness_cache_size == 0 \
+                    or settings.signal_training_settings.print_evaluation_status \
+                    or settings.signal_training_settings.plot_eco_model_results:
+                self.fitness_cache = None
 
-        settings.signal_training_settings.exploitation_phase_len = \
-            round(settings.signal_training_settings.nb_of_generations*settings.signal_training_settings.exploitation_phase_len_percent)
+            else:
+                self.fitness_cache = Fitness_cache(settings.signal_training_settings.fitness_cache_size)
 
-        # --> Initialise tools and counters
-        self.evoa_tools = EVOA_tools()
-        self.data_slice_cycle_count = 0
+            self.data_slice_cycle_count = 0
 
-        self.nb_parents = None
-        self.nb_random_ind = None
+            self.nb_parents = None
+            self.nb_random_ind = None
 
-        # --> Initialise records
-        self.results = EVOA_results_gen(ticker)
-        self.results.data_slice_start_index = self.data_slice.start_index
+            # --> Initialise records
+            self.results = EVOA_results_gen(ticker)
+            self.results.data_slice_start_index = self.data_slice.start_index
 
-        self.results.run_start_time = time.time()
+            self.results.run_start_time = time.time()
 
-        # ========================= EVO OPTIMISATION PROCESS =============================
-        prints.evoa_run_initialisation_recap(optimiser_setting)
-        if optimiser_setting == 1 and not settings.signal_training_settings.multiprocessing:
-            cycle_progress_bar = Progress_bar(settings.signal_training_settings.data_slice_cycle_count, bar_size=40, label="Cycle", overwrite_setting=False)
-        if optimiser_setting == 2:
-            if not settings.signal_training_settings.multiprocessing:
+            # ========================= EVO OPTIMISATION PROCESS =============================
+            prints.evoa_run_initialisation_recap(optimiser_setting)
+            if optimiser_setting == 1 and not settings.signal_training_settings.multiprocessing:
+                cycle_progress_bar = Progress_bar(settings.signal_training_settings.data_slice_cycle_count, bar_size=40, label="Cycle", overwrite_setting=False)
+            if optimiser_setting == 2:
+                if not settings.signal_training_settings.multiprocessing:
+                    progress_bar = Progress_bar(settings.signal_training_settings.nb_of_generations, 50, label=ticker, overwrite_setting=False)
+            else:
                 progress_bar = Progress_bar(settings.signal_training_settings.nb_of_generations, 50, label=ticker, overwrite_setting=False)
-        else:
-            progress_bar = Progress_bar(settings.signal_training_settings.nb_of_generations, 50, label=ticker, overwrite_setting=False)
-
-        # ------------------ Initialise population
-        if settings.signal_training_settings.starting_parameters is None:
-            self.population = self.evoa_tools.gen_initial_population(ticker, settings.signal_training_settings.population_size)
-        else:
-            self.population = self.evoa_tools.generate_offsprings(ticker,
-                                                                  1,
-                                                                  1,
-                                                                  1,
-                                                                  1,
-                                                                  0,
-                                                                  settings.signal_training_settings.population_size,
-                                                                  [Individual(parameter_set=settings.signal_training_settings.starting_parameters)],
-                                                                  settings.signal_training_settings.nb_parents_in_next_gen,
-                                                                  1,
-                                                                  mutation_rate=settings.signal_training_settings.mutation_rate)
-        prints.init_pop_success_msg()
-
-        # ------------------ Run for # nb of generations:
-        for gen in range(settings.signal_training_settings.nb_of_generations+1):
-            generation_start_time = time.time()
-
-            if gen == settings.signal_training_settings.nb_of_generations-settings.signal_training_settings.exploitation_phase_len-1:
-                prints.exploration_phase_complete_msg()
-
-            if gen != 0:
-                # ------------------ Define the data slice to be used by the generation
-                self.data_slice_cycle_count += 1
-                if self.data_slice_cycle_count > settings.signal_training_settings.data_slice_cycle_count:
-                    self.data_slice.get_shifted_data_slice()
-                    self.data_slice.gen_slice_metalabels(settings.metalabeling_settings.upper_barrier, settings.metalabeling_settings.lower_barrier,
-                                                         settings.metalabeling_settings.look_ahead,
-                                                         settings.metalabeling_settings.metalabeling_setting)
-                    self.data_slice_cycle_count = 1
-                    if settings.signal_training_settings.multiprocessing is False:
-                        cycle_progress_bar = Progress_bar(settings.signal_training_settings.data_slice_cycle_count, bar_size=40, label="Cycle", overwrite_setting=False)
-
-                    if self.data_slice.end_of_dataset is True:
-                        break
-
-                prints.new_slice_info(self.data_slice, gen, settings.signal_training_settings.nb_of_generations, self.data_slice_cycle_count)
-
-                # ------------------ Determine new generation GA parameters
-                prints.det_new_generation_param_msg()
-                self.nb_parents, self.nb_parents_in_next_gen, self.nb_random_ind, self.mutation_rate = \
-                    self.evoa_tools.determine_evolving_gen_parameters(settings.signal_training_settings, gen, self.data_slice_cycle_count)
-
-                if sum(self.fitness_evaluation) != 0:
-                    # ------------------ Select individuals from previous generation
-                    prints.select_ind_msg()
-                    self.parents = self.evoa_tools.select_from_population(self.fitness_evaluation,
-                                                                          self.population,
-                                                                          selection_method=settings.signal_training_settings.parents_selection_method,
-                                                                          nb_parents=self.nb_parents)
-
-                    # ------------------ Generate offsprings with mutations
-                    prints.gen_offsprings_msg()
-                    self.new_population = self.evoa_tools.generate_offsprings(ticker,
-                                                                              gen,
-                                                                              settings.signal_training_settings.nb_of_generations,
-                                                                              self.data_slice_cycle_count,
-                                                                              settings.signal_training_settings.data_slice_cycle_count,
-                                                                              settings.signal_training_settings.mutation_decay_function,
-                                                                              settings.signal_training_settings.population_size,
-                                                                              self.parents, self.nb_parents_in_next_gen,
-                                                                              self.nb_random_ind,
-                                                                              parameter_blacklist=settings.signal_training_settings.parameter_blacklist,
-                                                                              mutation_rate=self.mutation_rate)
-                    # prints.darwin_in_charge_msg()
-                    self.population = self.new_population
-
-            # ------------------ Evaluate population
-            prints.eval_pop_msg()
-            self.fitness_evaluation, _, self.net_worth = \
-                self.evoa_tools.evaluate_population(self.population,
-                                                    self.data_slice,
-                                                    evaluation_setting=settings.signal_training_settings.evaluation_method,
-                                                    max_worker_processes=settings.signal_training_settings.max_process_count,
-                                                    multiprocessing=settings.signal_training_settings.multiprocessing,
-                                                    print_evaluation_status=settings.signal_training_settings.print_evaluation_status,
-                                                    plot_eco_model_results=settings.signal_training_settings.plot_eco_model_results)
-
-            if settings.signal_training_settings.evaluation_method == 1 and sum(self.fitness_evaluation) == 0:
-                prints.invalid_slice_msg()
-                self.results.invalid_slice_count += 1
-                self.data_slice_cycle_count = settings.signal_training_settings.data_slice_cycle_count
 
+            # ------------------ Initialise population
+            if settings.signal_training_settings.starting_parameters is None:
+                self.population = self.evoa_tools.gen_initial_population(ticker, settings.signal_training_settings.population_size)
             else:
-                # ------------------ Collect generation data
-                if self.nb_parents is not None and self.nb_random_ind is not None:
-                    self.results.nb_parents.append(self.nb_parents)
-                    self.results.nb_random_ind.append(self.nb_random_ind)
-
-                self.results.best_individual_fitness_per_gen.append(max(self.fitness_evaluation))
-                self.results.avg_fitness_per_gen.append(sum(self.fitness_evaluation)/len(self.fitness_evaluation))
-                # self.results.avg_fitness_per_gen.append(sum(self.fitness_evaluation[:-self.nb_random_ind])/len(self.fitness_evaluation[:-self.nb_random_ind]))
-
-                self.results.best_individual_net_worth_per_gen.append(max(self.net_worth))
-                self.results.avg_net_worth_per_gen.append(sum(self.net_worth) / len(self.net_worth))
-
-                self.data_slice.perform_trade_run()
-                self.results.data_slice_metalabel_pp.append(self.data_slice.metalabels_account.net_worth_history[-1])
+                self.population = self.evoa_tools.generate_offsprings(ticker,
+                                                                      1,
+                                                                      1,
+                                                                      1,
+                                                                      1,
+                                                                      0,
+                                                                      settings.signal_training_settings.population_size,
+                                                                      [Individual(parameter_set=settings.signal_training_settings.starting_parameters)],
+                                                                      settings.signal_training_settings.nb_parents_in_next_gen,
+                                                                      1,
+                                                                      mutation_rate=settings.signal_training_settings.mutation_rate,
+                                                                      rng=self.rng)
+            prints.init_pop_success_msg()
+
+            # ------------------ Run for # nb of generations:
+            for gen in range(settings.signal_training_settings.nb_of_generations+1):
+                generation_start_time = time.time()
+
+                if gen == settings.signal_training_settings.nb_of_generations-settings.signal_training_settings.exploitation_phase_len-1:
+                    prints.exploration_phase_complete_msg()
 
-                generation_end_time = time.time()
+                if gen != 0:
+                    # ------------------ Define the data slice to be used by the generation
+                    self.data_slice_cycle_count += 1
+                    if self.data_slice_cycle_count > settings.signal_training_settings.data_slice_cycle_count:
+                        self.data_slice.get_shifted_data_slice()
+                        self.data_slice.gen_slice_metalabels(settings.metalabeling_settings.upper_barrier, settings.metalabeling_settings.lower_barrier,
+                                                             settings.metalabeling_settings.look_ahead,
+                                                             settings.metalabeling_settings.metalabeling_setting,
+                                                             disk_cache=settings.metalabeling_settings.metalabels_disk_cache)
+                        self.data_slice_cycle_count = 1
+                        if settings.signal_training_settings.multiprocessing is False:
+                            cycle_progress_bar = Progress_bar(settings.signal_training_settings.data_slice_cycle_count, bar_size=40, label="Cycle", overwrite_setting=False)
+
+                        if self.data_slice.end_of_dataset is True:
+                            break
+
+                    prints.new_slice_info(self.data_slice, gen, settings.signal_training_settings.nb_of_generations, self.data_slice_cycle_count)
+
+                    # ------------------ Determine new generation GA parameters
+                    prints.det_new_generation_param_msg()
+                    self.nb_parents, self.nb_parents_in_next_gen, self.nb_random_ind, self.mutation_rate = \
+                        self.evoa_tools.determine_evolving_gen_parameters(settings.signal_training_settings, gen, self.data_slice_cycle_count)
+
+                    if sum(self.fitness_evaluation) != 0:
+                        # ------------------ Select individuals from previous generation
+                        prints.select_ind_msg()
+                        self.parents = self.evoa_tools.select_from_population(self.fitness_evaluation,
+                                                                              self.population,
+                                                                              selection_method=settings.signal_training_settings.parents_selection_method,
+                                                                              nb_parents=self.nb_parents,
+                                                                              tournament_size=settings.signal_training_settings.parents_tournament_size,
+                                                                              rng=self.rng)
+
+                        # ------------------ Generate offsprings with mutations
+                        prints.gen_offsprings_msg()
+                        self.new_population = self.evoa_tools.generate_offsprings(ticker,
+                                                                                  gen,
+                                                                                  settings.signal_training_settings.nb_of_generations,
+                                                                                  self.data_slice_cycle_count,
+                                                                                  settings.signal_training_settings.data_slice_cycle_count,
+                                                                                  settings.signal_training_settings.mutation_decay_function,
+                                                                                  settings.signal_training_settings.population_size,
+                                                                                  self.parents, self.nb_parents_in_next_gen,
+                                                                                  self.nb_random_ind,
+                                                                                  parameter_blacklist=settings.signal_training_settings.parameter_blacklist,
+                                                                                  mutation_rate=self.mutation_rate,
+                                                                                  rng=self.rng)
+                        # prints.darwin_in_charge_msg()
+                        self.population = self.new_population
+
+                # ------------------ Evaluate population
+                prints.eval_pop_msg()
+                self.fitness_evaluation, _, self.net_worth = \
+                    self.evoa_tools.evaluate_population(self.population,
+                                                        self.data_slice,
+                                                        evaluation_setting=settings.signal_training_settings.evaluation_method,
+                                                        max_worker_processes=settings.signal_training_settings.max_process_count,
+                                                        multiprocessing=settings.signal_training_settings.multiprocessing,
+                                                        print_evaluation_status=settings.signal_training_settings.print_evaluation_status,
+                                                        plot_eco_model_results=settings.signal_training_settings.plot_eco_model_results,
+                                                        evaluation_pool=self.evaluation_pool,
+                                                        fitness_cache=self.fitness_cache,
+                                                        batch_evaluation=settings.signal_training_settings.batch_evaluation)
+
+                if settings.signal_training_settings.evaluation_method == 1 and sum(self.fitness_evaluation) == 0:
+                    prints.invalid_slice_msg()
+                    self.results.invalid_slice_count += 1
+                    self.data_slice_cycle_count = settings.signal_training_settings.data_slice_cycle_count
+
+                else:
+                    # ------------------ Collect generation data
+                    if self.nb_parents is not None and self.nb_random_ind is not None:
+                        self.results.nb_parents.append(self.nb_parents)
+                        self.results.nb_random_ind.append(self.nb_random_ind)
+
+                    self.results.best_individual_fitness_per_gen.append(max(self.fitness_evaluation))
+                    self.results.avg_fitness_per_gen.append(sum(self.fitness_evaluation)/len(self.fitness_evaluation))
+                    # self.results.avg_fitness_per_gen.append(sum(self.fitness_evaluation[:-self.nb_random_ind])/len(self.fitness_evaluation[:-self.nb_random_ind]))
+
+                    self.results.best_individual_net_worth_per_gen.append(max(self.net_worth))
+                    self.results.avg_net_worth_per_gen.append(sum(self.net_worth) / len(self.net_worth))
+
+                    self.data_slice.perform_trade_run()
+                    self.results.data_slice_metalabel_pp.append(self.data_slice.metalabels_account.net_worth_history[-1])
+
+                    generation_end_time = time.time()
+
+                    # ------------------ Print generation info
+                    if settings.signal_training_settings.print_generation_info:
+                        prints.generation_info(gen, generation_start_time, generation_end_time,
+                                               self.results, self.net_worth, self.fitness_evaluation,
+                                               self.population)
+                    elif settings.signal_training_settings.multiprocessing is False:
+                        print("")
+
+                    if gen != 0:
+                        if settings.signal_training_settings.multiprocessing is False:
+                            print("\nOptimisation progress:")
+                            if optimiser_setting == 1 and not settings.signal_training_settings.multiprocessing:
+                                cycle_progress_bar.update_progress(self.data_slice_cycle_count-1)
+
+                        if optimiser_setting == 2:
+                            if not settings.signal_training_settings.multiprocessing:
+                                progress_bar.update_progress()
+                        else:
+                            progress_bar.update_progress()
 
-                # ------------------ Print generation info
-                if settings.signal_training_settings.print_generation_info:
-                    prints.generation_info(gen, generation_start_time, generation_end_time,
-                                           self.results, self.net_worth, self.fitness_evaluation,
-                                           self.population)
-                elif settings.signal_training_settings.multiprocessing is False:
-                    print("")
+                    if settings.signal_training_settings.plot_best_individual_eco_model_results is True:
+                        self.population[self.fitness_evaluation.index(max(self.fitness_evaluation))].gen_economic_model(
+                            self.data_slice, plot_eco_model_results=True)
 
-                if gen != 0:
-                    if settings.signal_training_settings.multiprocessing is False:
-                        print("\nOptimisation progress:")
-                        if optimiser_setting == 1 and not settings.signal_training_settings.multiprocessing:
-                            cycle_progress_bar.update_progress(self.data_slice_cycle_count-1)
+        finally:
+            # --> Release the worker processes and the shared technical data, even if the optimisation failed
+            if self.evaluation_pool is not None:
+                self.evaluation_pool.close()
 
-                    if optimiser_setting == 2:
-                        if not settings.signal_training_settings.multiprocessing:
-                            progress_bar.update_progress()
-                    else:
-                        progress_bar.update_progress()
+            if self.data_handle_owned:
+                release_shared_technical_data(ticker)
 
-                if settings.signal_training_settings.plot_best_individual_eco_model_results is True:
-                    self.population[self.fitness_evaluation.index(max(self.fitness_evaluation))].gen_economic_model(
-                        self.data_slice, plot_eco_model_results=True)
+                if self.data_slice is not None:
+                    self.data_slice.data_handle = None
 
         # ===============================================================================
         total_data_points_processed = -self.results.data_slice_start_index + self.data_slice.stop_index
@@ -245,9 +316,10 @@ class EVOA_optimiser:
             print("!!!!!!!!!!!!!!!!!!!!!!!!! BEST INDIVIDUAL NOT SELECTED !!!!!!!!!!!!!!!!!!!!!!!!!")
             self.fitness_evaluation = [1]
 
+        # --> Best individual is always selected elitically
         self.best_individual = self.evoa_tools.select_from_population(self.fitness_evaluation,
                                                                       self.population,
-                                                                      selection_method=settings.signal_training_settings.parents_selection_method,
+                                                                      selection_method=0,
                                                                       nb_parents=1)[0]
 
         self.results.individual = self.best_individual
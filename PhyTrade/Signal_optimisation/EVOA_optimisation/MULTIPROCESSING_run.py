@@ -2,12 +2,18 @@
 ################################################################################################################
 """
 Used for running optimiser on multiple cores
+
+The technical data of every ticker is copied once to shared memory by the parent process, the worker processes
+attach to it instead of loading their own copy (and close it once the ticker is optimised). The shared memory is
+released by the parent process once the pool is done, even if the optimisation failed.
 """
 
 # Built-in/Generic Imports
 from multiprocessing import Pool
 
 # Own modules
+from PhyTrade.Data_Collection_preparation.Shared_technical_data import share_technical_data, \
+    release_shared_technical_data, close_attached_shared_technical_data
 from PhyTrade.Settings.SETTINGS import SETTINGS
 from PhyTrade.Signal_optimisation.EVOA_optimisation.EVO_algo_4 import EVOA_optimiser
 
@@ -18,10 +24,15 @@ __date__ = '10/09/2019'
 ################################################################################################################
 
 
-def optimise(ticker, *args):
+def optimise(data_handle, *args):
     settings = SETTINGS()
     settings.market_settings.gen_market_settings()
-    EVOA_optimiser(settings, ticker)
+
+    try:
+        EVOA_optimiser(settings, data_handle.ticker, data_handle=data_handle)
+
+    finally:
+        close_attached_shared_technical_data(data_handle.shared_memory_name)
 
 
 if __name__ == "__main__":
@@ -31,7 +42,17 @@ if __name__ == "__main__":
 
     print(settings.market_settings.tickers)
 
-    pool = Pool(procs)
-    pool.map(optimise, settings.market_settings.tickers)
+    try:
+        # --> Copy technical data of all tickers to shared memory
+        data_handles = [share_technical_data(ticker) for ticker in settings.market_settings.tickers]
+
+        pool = Pool(procs)
+        pool.map(optimise, data_handles)
+
+        pool.close()
+        pool.join()
+
+    finally:
+        release_shared_technical_data()
 
     print("List processing complete.")
@@ -2,12 +2,16 @@
 ##################################################################################################################
 """
 Used for benchmarking model generated labels versus metalabels
+
+The confusion matrix is counted from the encoded (prediction, metalabel) pairs, the confusion tables and stats
+dataframes are only generated when requested (calculate_stats) or first accessed (ie: when writing results files).
 """
 
 # Built-in/Generic Imports
 from math import *
 
 # Libs
+import numpy as np
 import pandas as pd
 
 __version__ = '1.1.1'
@@ -18,158 +22,128 @@ __date__ = '10/09/2019'
 
 
 class Confusion_matrix_analysis:
+    # --> Confusion matrix rows/columns (prediction/metalabel): signal value
+    signals = {"Sell": 1, "Hold": 0, "Buy": -1}
+
+    # --> Attributes generated on first access (or on initialisation if calculate_stats is True)
+    stats_attributes = ["confusion_matrix",
+                        "confusion_table_ref",
+                        "confusion_table_sell", "confusion_table_buy", "confusion_table_hold",
+                        "sell_stats", "buy_stats", "hold_stats"]
+
     def __init__(self, model_predictions, metalabels, calculate_stats=False, print_benchmark_results=False):
 
         self.model_predictions = model_predictions
         self.metalabels = metalabels
 
-        # ------------------------------------------------- Confusion matrix
-        cm_init = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
+        predictions = np.asarray(model_predictions, dtype=np.float64)
+        labels = np.asarray(metalabels, dtype=np.float64)[:len(predictions)]
 
+        # ------------------------------------------------- Confusion matrix
         """Confusion_matrix columns = Metalabels, rows = Prediction"""
-        # confusion_matrix = pd.DataFrame(init, columns=[1, 0, -1], index=[1, 0, -1])
-        confusion_matrix = pd.DataFrame(cm_init, columns=["Sell", "Hold", "Buy"], index=["Sell", "Hold", "Buy"])
-
-        for i in range(len(model_predictions)):
-            if model_predictions[i] == metalabels[i]:
-                if model_predictions[i] == 1:
-                    confusion_matrix.at['Sell', 'Sell'] += 1
-                elif model_predictions[i] == -1:
-                    confusion_matrix.at['Buy', 'Buy'] += 1
-                else:
-                    confusion_matrix.at['Hold', 'Hold'] += 1
-
-            else:
-                if model_predictions[i] == 0 and metalabels[i] == 1:
-                    confusion_matrix.at['Hold', 'Sell'] += 1
-
-                elif model_predictions[i] == -1 and metalabels[i] == 1:
-                    confusion_matrix.at['Buy', 'Sell'] += 1
+        prediction_indexes = self.gen_signal_indexes(predictions)
+        label_indexes = self.gen_signal_indexes(labels)
 
-                elif model_predictions[i] == 1 and metalabels[i] == 0:
-                    confusion_matrix.at['Sell', 'Hold'] += 1
+        correct_predictions = predictions == labels
 
-                elif model_predictions[i] == -1 and metalabels[i] == 0:
-                    confusion_matrix.at['Buy', 'Hold'] += 1
+        # --> Encode (prediction, metalabel) pairs, correct predictions of other signal values are counted as holds
+        pairs = np.where(correct_predictions & (prediction_indexes == -1), 4, prediction_indexes*3 + label_indexes)
+        counted = correct_predictions | ((prediction_indexes != -1) & (label_indexes != -1))
 
-                elif model_predictions[i] == 1 and metalabels[i] == -1:
-                    confusion_matrix.at['Sell', 'Buy'] += 1
-
-                elif model_predictions[i] == 0 and metalabels[i] == -1:
-                    confusion_matrix.at['Hold', 'Buy'] += 1
-
-        self.confusion_matrix = confusion_matrix
+        self.confusion_matrix_counts = np.bincount(pairs[counted], minlength=9).reshape(3, 3)
 
         # ------------------------------------------------- Accuracy calculations
         # -- Overall accuracy
-        correct_prediction = 0
-        wrong_prediction = 0
-
-        correct_prediction_bs = 0
-        wrong_prediction_bs = 0
-
-        for i in range(len(self.model_predictions)):
-            if self.model_predictions[i] == self.metalabels[i]:
-                correct_prediction += 1
+        bs_predictions = (predictions == 1) | (predictions == -1)
 
-                if self.model_predictions[i] == 1 or self.model_predictions[i] == -1:
-                    correct_prediction_bs += 1
+        correct_prediction = int(np.count_nonzero(correct_predictions))
 
-            else:
-                wrong_prediction += 1
-
-                if self.model_predictions[i] == 1 or self.model_predictions[i] == -1:
-                    wrong_prediction_bs += 1
+        correct_prediction_bs = int(np.count_nonzero(correct_predictions & bs_predictions))
+        wrong_prediction_bs = int(np.count_nonzero(~correct_predictions & bs_predictions))
 
         self.overall_accuracy = correct_prediction / len(self.model_predictions) * 100
         self.overall_accuracy_bs = correct_prediction_bs / (correct_prediction_bs + wrong_prediction_bs or 1) * 100
-        
+
         if calculate_stats:
-            # ------------------------------------------------- Confusion tables
-            ct_init = [["", ""], ["", ""]]
-            # ---> Reference table
-            self.confusion_table_ref = pd.DataFrame(ct_init, columns=["Condition Positive", "Condition Negative"],
-                                                    index=["Predicted Condition Positive", "Predicted Condition Negative"])
-            # True positive
-            self.confusion_table_ref.at['Predicted Condition Positive', 'Condition Positive'] = 'True positive'
-            # True negative
-            self.confusion_table_ref.at['Predicted Condition Negative', 'Condition Negative'] = 'True negative'
-            # False Positive
-            self.confusion_table_ref.at['Predicted Condition Positive', 'Condition Negative'] = 'False positive'
-            # False Negative
-            self.confusion_table_ref.at['Predicted Condition Negative', 'Condition Positive'] = 'False Negative'
-
-            ct_init = [[0, 0], [0, 0]]
-
-            # ---> Sell
-            self.confusion_table_sell = pd.DataFrame(ct_init, columns=["Sell", "Non-Sell"], index=["Sell", "Non-Sell"])
-
-            # True Positive
-            self.confusion_table_sell.at['Sell', 'Sell'] = confusion_matrix.at['Sell', 'Sell']
-            # True Negative
-            self.confusion_table_sell.at['Non-Sell', 'Non-Sell'] = confusion_matrix.at['Hold', 'Hold'] + \
-                                                                   confusion_matrix.at['Buy', 'Buy'] + \
-                                                                   confusion_matrix.at['Hold', 'Buy'] + \
-                                                                   confusion_matrix.at['Buy', 'Hold']
-            # False Positive
-            self.confusion_table_sell.at['Sell', 'Non-Sell'] = confusion_matrix.at['Sell', 'Hold'] + \
-                                                               confusion_matrix.at['Sell', 'Buy']
-
-            # False Negative
-            self.confusion_table_sell.at['Non-Sell', 'Sell'] = confusion_matrix.at['Hold', 'Sell'] + \
-                                                               confusion_matrix.at['Buy', 'Sell']
-            # Calc stats
-            self.sell_stats = self.calc_stats(self.confusion_table_sell)
-
-            # ---> Buy
-            self.confusion_table_buy = pd.DataFrame(ct_init, columns=["Buy", "Non-Buy"], index=["Buy", "Non-Buy"])
-
-            # True Positive
-            self.confusion_table_buy.at['Buy', 'Buy'] = confusion_matrix.at['Buy', 'Buy']
-            # True Negative
-            self.confusion_table_buy.at['Non-Buy', 'Non-Buy'] = confusion_matrix.at['Hold', 'Hold'] + \
-                                                                 confusion_matrix.at['Sell', 'Sell'] + \
-                                                                 confusion_matrix.at['Hold', 'Sell'] + \
-                                                                 confusion_matrix.at['Sell', 'Hold']
-            # False Positive
-            self.confusion_table_buy.at['Buy', 'Non-Buy'] = confusion_matrix.at['Buy', 'Hold'] + \
-                                                             confusion_matrix.at['Buy', 'Sell']
-
-            # False Negative
-            self.confusion_table_buy.at['Non-Buy', 'Buy'] = confusion_matrix.at['Hold', 'Buy'] + \
-                                                             confusion_matrix.at['Sell', 'Buy']
-            # Calc stats
-            self.buy_stats = self.calc_stats(self.confusion_table_buy)
-
-            # ---> Hold
-            self.confusion_table_hold = pd.DataFrame(ct_init, columns=["Hold", "Non-Hold"], index=["Hold", "Non-Hold"])
-
-            # True Positive
-            self.confusion_table_hold.at['Hold', 'Hold'] = confusion_matrix.at['Hold', 'Hold']
-            # True Negative
-            self.confusion_table_hold.at['Non-Hold', 'Non-Hold'] = confusion_matrix.at['Sell', 'Sell'] + \
-                                                                   confusion_matrix.at['Buy', 'Buy'] + \
-                                                                   confusion_matrix.at['Sell', 'Buy'] + \
-                                                                   confusion_matrix.at['Buy', 'Sell']
-            # False Positive
-            self.confusion_table_hold.at['Hold', 'Non-Hold'] = confusion_matrix.at['Hold', 'Sell'] + \
-                                                               confusion_matrix.at['Hold', 'Buy']
-
-            # False Negative
-            self.confusion_table_hold.at['Non-Hold', 'Hold'] = confusion_matrix.at['Sell', 'Hold'] + \
-                                                               confusion_matrix.at['Buy', 'Hold']
-            # Calc stats
-            self.hold_stats = self.calc_stats(self.confusion_table_hold)
+            self.gen_stats()
 
         # TODO: Fix overall accuracy bs calc
         if print_benchmark_results:
             print("Overall accuracy achieved:", round(self.overall_accuracy))
             print("Overall accuracy achieved (excluding hold):", round(self.overall_accuracy_bs))
-            print("\nConfusion matrix:\n", confusion_matrix, "\n")
+            print("\nConfusion matrix:\n", self.confusion_matrix, "\n")
+
+    def __getattr__(self, item):
+        # --> Generate confusion tables and stats on first access
+        if item in Confusion_matrix_analysis.stats_attributes and "confusion_matrix_counts" in self.__dict__:
+            self.gen_stats()
+            return self.__dict__[item]
+
+        raise AttributeError(item)
+
+    @staticmethod
+    def gen_signal_indexes(signal):
+        """
+        Convert signal values to confusion matrix indexes (Sell: 0, Hold: 1, Buy: 2, other values: -1)
+        """
+        return np.select([signal == value for value in Confusion_matrix_analysis.signals.values()], [0, 1, 2], -1)
+
+    def gen_stats(self):
+        """
+        Generate the confusion matrix and confusion tables dataframes, along with the stats of every signal
+        """
+        # ------------------------------------------------- Confusion matrix
+        self.confusion_matrix = pd.DataFrame(self.confusion_matrix_counts,
+                                             columns=list(Confusion_matrix_analysis.signals),
+                                             index=list(Confusion_matrix_analysis.signals))
+
+        # ------------------------------------------------- Confusion tables
+        ct_init = [["", ""], ["", ""]]
+        # ---> Reference table
+        self.confusion_table_ref = pd.DataFrame(ct_init, columns=["Condition Positive", "Condition Negative"],
+                                                index=["Predicted Condition Positive", "Predicted Condition Negative"])
+        # True positive
+        self.confusion_table_ref.at['Predicted Condition Positive', 'Condition Positive'] = 'True positive'
+        # True negative
+        self.confusion_table_ref.at['Predicted Condition Negative', 'Condition Negative'] = 'True negative'
+        # False Positive
+        self.confusion_table_ref.at['Predicted Condition Positive', 'Condition Negative'] = 'False positive'
+        # False Negative
+        self.confusion_table_ref.at['Predicted Condition Negative', 'Condition Positive'] = 'False Negative'
+
+        # ---> Sell
+        self.confusion_table_sell = self.gen_confusion_table("Sell")
+        self.sell_stats = self.calc_stats(self.confusion_table_sell)
+
+        # ---> Buy
+        self.confusion_table_buy = self.gen_confusion_table("Buy")
+        self.buy_stats = self.calc_stats(self.confusion_table_buy)
+
+        # ---> Hold
+        self.confusion_table_hold = self.gen_confusion_table("Hold")
+        self.hold_stats = self.calc_stats(self.confusion_table_hold)
+
+    def gen_confusion_table(self, signal):
+        """
+        Generate the confusion table of a signal (signal vs non-signal) from the confusion matrix counts
+
+        :param signal: "Sell", "Hold" or "Buy"
+        :return: Confusion table dataframe
+        """
+        cm = self.confusion_matrix_counts
+        k = list(Confusion_matrix_analysis.signals).index(signal)
+
+        true_positive = cm[k, k]
+        false_positive = cm[k, :].sum() - true_positive
+        false_negative = cm[:, k].sum() - true_positive
+        true_negative = cm.sum() - true_positive - false_positive - false_negative
+
+        return pd.DataFrame([[true_positive, false_positive], [false_negative, true_negative]],
+                            columns=[signal, "Non-" + signal], index=[signal, "Non-" + signal])
 
     def calc_TPR(self, cm):
-        tp = float(cm.ix[0, 0])
-        fn = float(cm.ix[1, 0])
+        tp = float(cm.iloc[0, 0])
+        fn = float(cm.iloc[1, 0])
 
         try:
             return tp / (tp + fn)
@@ -177,8 +151,8 @@ class Confusion_matrix_analysis:
             return float('Inf')
 
     def calc_TNR(self, cm):
-        tn = float(cm.ix[1, 1])
-        fp = float(cm.ix[0, 1])
+        tn = float(cm.iloc[1, 1])
+        fp = float(cm.iloc[0, 1])
 
         try:
             return tn / (tn + fp)
@@ -186,8 +160,8 @@ class Confusion_matrix_analysis:
             return float('Inf')
 
     def calc_PPV(self, cm):
-        tp = float(cm.ix[0, 0])
-        fp = float(cm.ix[0, 1])
+        tp = float(cm.iloc[0, 0])
+        fp = float(cm.iloc[0, 1])
 
         try:
             return tp / (tp + fp)
@@ -195,89 +169,89 @@ class Confusion_matrix_analysis:
             return float('Inf')
 
     def calc_NPV(self, cm):
-        tn = float(cm.ix[1, 1])
-        fn = float(cm.ix[1, 0])
+        tn = float(cm.iloc[1, 1])
+        fn = float(cm.iloc[1, 0])
         try:
             return tn / (tn + fn)
         except ZeroDivisionError:
             return float('Inf')
 
     def calc_FNR(self, cm):
-        tp = float(cm.ix[0, 0])
-        fn = float(cm.ix[1, 0])
+        tp = float(cm.iloc[0, 0])
+        fn = float(cm.iloc[1, 0])
         try:
             return fn / (fn + tp)
         except ZeroDivisionError:
             return float('Inf')
 
     def calc_FPR(self, cm):
-        tn = float(cm.ix[1, 1])
-        fp = float(cm.ix[0, 1])
+        tn = float(cm.iloc[1, 1])
+        fp = float(cm.iloc[0, 1])
         try:
             return fp / (fp + tn)
         except ZeroDivisionError:
             return float('Inf')
 
     def calc_FDR(self, cm):
-        tp = float(cm.ix[0, 0])
-        fp = float(cm.ix[0, 1])
+        tp = float(cm.iloc[0, 0])
+        fp = float(cm.iloc[0, 1])
         try:
             return fp / (fp + tp)
         except ZeroDivisionError:
             return float('Inf')
 
     def calc_FOR(self, cm):
-        tn = float(cm.ix[1, 1])
-        fn = float(cm.ix[1, 0])
+        tn = float(cm.iloc[1, 1])
+        fn = float(cm.iloc[1, 0])
         try:
             return fn / (fn + tn)
         except ZeroDivisionError:
             return float('Inf')
 
     def calc_ACC(self, cm):
-        tp = float(cm.ix[0, 0])
-        tn = float(cm.ix[1, 1])
-        fp = float(cm.ix[0, 1])
-        fn = float(cm.ix[1, 0])
+        tp = float(cm.iloc[0, 0])
+        tn = float(cm.iloc[1, 1])
+        fp = float(cm.iloc[0, 1])
+        fn = float(cm.iloc[1, 0])
         try:
             return (tp + tn) / (tp + tn + fp + fn)
         except ZeroDivisionError:
             return float('Inf')
 
     def calc_F1(self, cm):
-        tp = float(cm.ix[0, 0])
-        fp = float(cm.ix[0, 1])
-        fn = float(cm.ix[1, 0])
+        tp = float(cm.iloc[0, 0])
+        fp = float(cm.iloc[0, 1])
+        fn = float(cm.iloc[1, 0])
         try:
             return 2 * tp / (2 * tp + fp + fn)
         except ZeroDivisionError:
             return float('Inf')
 
     def calc_MCC(self, cm):
-        tp = float(cm.ix[0, 0])
-        tn = float(cm.ix[1, 1])
-        fp = float(cm.ix[0, 1])
-        fn = float(cm.ix[1, 0])
+        tp = float(cm.iloc[0, 0])
+        tn = float(cm.iloc[1, 1])
+        fp = float(cm.iloc[0, 1])
+        fn = float(cm.iloc[1, 0])
         try:
             return (tp * tn - fp * fn) / sqrt((tp + fp) * (tp + fn) * (tn + fp) * (tn + fn))
         except ZeroDivisionError:
             return float('Inf')
 
     def calc_BM(self, cm):
-        tp = float(cm.ix[0, 0])
-        tn = float(cm.ix[1, 1])
-        fp = float(cm.ix[0, 1])
-        fn = float(cm.ix[1, 0])
+        tp = float(cm.iloc[0, 0])
+        tn = float(cm.iloc[1, 1])
+        fp = float(cm.iloc[0, 1])
+        fn = float(cm.iloc[1, 0])
         try:
             return tp / (tp + fn) + tn / (tn + fp) - 1
         except ZeroDivisionError:
             return float('Inf')
 
     def calc_MK(self, cm):
-        tp = float(cm.ix[0, 0])
-        tn = float(cm.ix[1, 1])
-        fp = float(cm.ix[0, 1])
-        fn = float(cm.ix[1, 0])
+        tp = float(cm.iloc[0, 0])
+        tn = float(cm.iloc[1, 1])
+        fp = float(cm.iloc[0, 1])
+        fn = float(cm.iloc[1, 0])
         try:
             return tp / (tp + fp) + tn / (tn + fn) - 1
         except ZeroDivisionError:
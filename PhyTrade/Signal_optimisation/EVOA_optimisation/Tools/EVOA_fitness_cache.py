@@ -0,0 +1,87 @@
+
+##################################################################################################################
+"""
+Used to memoise the evaluation of individuals. Evaluations are keyed by a canonical hash of the individual
+parameter set along with the data slice evaluated (ticker, start/stop index, price selection and metalabels settings),
+identical individuals evaluated on the same data slice (parents carried over, duplicate offsprings, etc...) are only
+evaluated once.
+"""
+
+# Built-in/Generic Imports
+import json
+import hashlib
+from collections import OrderedDict
+
+__version__ = '1.1.1'
+__author__ = 'Victor Guillet'
+__date__ = '10/09/2019'
+
+##################################################################################################################
+
+
+class Fitness_cache:
+    def __init__(self, max_size=2000):
+        """
+        LRU cache of individual evaluation metrics
+
+        :param max_size: Maximum number of evaluations kept in memory
+        """
+        self.max_size = max_size
+
+        # --> Key: Individual_metrics, ordered from least to most recently used
+        self.content = OrderedDict()
+
+        # --> Counters
+        self.hit_count = 0
+        self.miss_count = 0
+
+    @staticmethod
+    def gen_key(individual, data_slice, calculate_stats=False):
+        """
+        Generate the cache key of the evaluation of an individual on a data slice
+
+        :param individual: Individual
+        :param data_slice: Data slice (metalabels must be generated)
+        :param calculate_stats: Confusion matrix stats calculated
+        :return: Key
+        """
+        return (gen_parameter_set_hash(individual.parameter_dictionary),
+                data_slice.ticker, data_slice.start_index, data_slice.stop_index, data_slice.selection,
+                data_slice.metalabels_settings,
+                calculate_stats)
+
+    def get(self, key):
+        """
+        :return: Cached Individual_metrics, None if missing
+        """
+        if key in self.content:
+            self.hit_count += 1
+            self.content.move_to_end(key)
+            return self.content[key]
+
+        self.miss_count += 1
+        return None
+
+    def record(self, key, individual_metrics):
+        self.content[key] = individual_metrics
+        self.content.move_to_end(key)
+
+        while len(self.content) > self.max_size:
+            self.content.popitem(last=False)
+
+    def clear(self):
+        self.content.clear()
+
+    def __str__(self):
+        return "Fitness cache: " + str(len(self.content)) + " evaluations, hits - " + str(self.hit_count) \
+               + ", misses - " + str(self.miss_count)
+
+
+def gen_parameter_set_hash(parameter_dictionary):
+    """
+    Generate a canonical hash of a parameter set (independent of the dictionaries ordering)
+
+    :param parameter_dictionary: Parameter set
+    :return: sha1 hex digest
+    """
+    return hashlib.sha1(json.dumps(parameter_dictionary, sort_keys=True).encode()).hexdigest()
@@ -0,0 +1,225 @@
+
+##################################################################################################################
+"""
+Used to map parameter sets (nested dictionaries) to and from flat numeric genomes (float64 numpy vectors).
+
+A Genome_schema lists the mutable parameters (genes) of a parameter set structure in a canonical order, along with
+their type and bounds (see EVOA_random_gen.gene_settings). Parameters of a type without gene settings (indicator
+counts, etc...) or under a blacklisted key are not part of the genome. Individuals sharing the same parameter set
+structure share the same schema, allowing entire populations to be mutated with a handful of array operations.
+"""
+
+# Libs
+import numpy as np
+
+# Own modules
+from PhyTrade.Signal_optimisation.EVOA_optimisation.Tools.EVOA_random_gen import EVOA_random_gen
+
+__version__ = '1.1.1'
+__author__ = 'Victor Guillet'
+__date__ = '10/09/2019'
+
+##################################################################################################################
+
+# --> Structure key: Genome_schema
+genome_schemas = {}
+
+
+class Genome_schema:
+    def __init__(self, gene_paths):
+        """
+        Schema of a parameter set structure
+
+        :param gene_paths: Canonically ordered list of the paths (tuple of keys) of the genes
+        """
+        self.gene_paths = gene_paths
+
+        # --> Parameter type of each gene (second level key of the parameter set)
+        self.gene_types = [gene_path[1] for gene_path in gene_paths]
+
+        self.int_genes = np.array([EVOA_random_gen.gene_settings[gene_type]["type"] == "int" for gene_type in self.gene_types], dtype=bool)
+        self.bool_genes = np.array([EVOA_random_gen.gene_settings[gene_type]["type"] == "bool" for gene_type in self.gene_types], dtype=bool)
+
+        self.lower_bounds = np.array([EVOA_random_gen.gene_settings[gene_type]["lower_bound"] for gene_type in self.gene_types], dtype=np.float64)
+        self.upper_bounds = np.array([np.inf if EVOA_random_gen.gene_settings[gene_type]["upper_bound"] is None
+                                      else EVOA_random_gen.gene_settings[gene_type]["upper_bound"]
+                                      for gene_type in self.gene_types], dtype=np.float64)
+
+    @property
+    def nb_of_genes(self):
+        return len(self.gene_paths)
+
+    def encode(self, parameter_dictionary):
+        """
+        Convert a parameter set to a flat genome
+
+        :param parameter_dictionary: Parameter set
+        :return: float64 numpy array
+        """
+        return np.array([get_nested_value(parameter_dictionary, gene_path) for gene_path in self.gene_paths], dtype=np.float64)
+
+    def encode_population(self, population):
+        """
+        Convert the parameter sets of a list of individuals to a genome matrix
+
+        :param population: List of individuals
+        :return: (individuals x genes) float64 numpy array
+        """
+        return np.array([self.encode(individual.parameter_dictionary) for individual in population], dtype=np.float64).reshape(len(population), self.nb_of_genes)
+
+    def decode(self, genome, parameter_dictionary, genes=None):
+        """
+        Write the values of a genome to a parameter set (in place)
+
+        :param genome: Genome
+        :param parameter_dictionary: Parameter set with the structure of the schema
+        :param genes: Indexes of the genes to write, all genes are written if None
+        """
+        if genes is None:
+            genes = range(self.nb_of_genes)
+
+        for i in genes:
+            if self.bool_genes[i]:
+                value = bool(genome[i])
+            elif self.int_genes[i]:
+                value = int(genome[i])
+            else:
+                value = float(genome[i])
+
+            set_nested_value(parameter_dictionary, self.gene_paths[i], value)
+
+    def mutate(self, genomes, nb_of_genes_to_mutate,
+               current_generation, nb_of_generations,
+               current_slice_cycle, nb_of_slice_cycles,
+               decay_function,
+               rng=None):
+        """
+        Mutate a number of randomly selected (distinct) genes of every genome of a genome matrix
+
+        :param genomes: (individuals x genes) genome matrix
+        :param nb_of_genes_to_mutate: Number of genes mutated per genome
+        :param rng: numpy random Generator (see EVOA_random_gen.gen_numpy_random_generator)
+        :return: Mutated genome matrix, boolean mask of the mutated genes
+        """
+        if rng is None:
+            rng = EVOA_random_gen.gen_numpy_random_generator()
+
+        nb_of_genes_to_mutate = max(1, min(nb_of_genes_to_mutate, self.nb_of_genes))
+
+        # --> Select genes to mutate
+        selected_genes = np.argpartition(rng.random(genomes.shape), nb_of_genes_to_mutate - 1, axis=1)[:, :nb_of_genes_to_mutate]
+
+        mutation_mask = np.zeros(genomes.shape, dtype=bool)
+        np.put_along_axis(mutation_mask, selected_genes, True, axis=1)
+
+        # --> Determine throttled variation range of every gene
+        variation_ranges = {}
+        for gene_type in set(self.gene_types):
+            variation_ranges[gene_type] = EVOA_random_gen.calc_mutation_variation(gene_type,
+                                                                                  current_generation, nb_of_generations,
+                                                                                  current_slice_cycle, nb_of_slice_cycles,
+                                                                                  decay_function)
+        variation_ranges = np.array([variation_ranges[gene_type] or 0 for gene_type in self.gene_types], dtype=np.float64)
+
+        # --> Generate variations (integers drawn in [-range, range] for int genes)
+        variations = rng.uniform(-1, 1, genomes.shape)*variation_ranges
+        int_variations = np.floor(rng.random(genomes.shape)*(2*variation_ranges + 1)) - variation_ranges
+        variations = np.where(self.int_genes, int_variations, variations)
+
+        mutated_genomes = np.clip(genomes + variations, self.lower_bounds, self.upper_bounds)
+
+        # --> Boolean genes are redrawn
+        mutated_genomes = np.where(self.bool_genes, rng.random(genomes.shape) < 0.5, mutated_genomes)
+
+        return np.where(mutation_mask, mutated_genomes, genomes), mutation_mask
+
+
+def get_genome_schema(parameter_dictionary, parameter_blacklist=["general_settings"]):
+    """
+    Fetch the schema of a parameter set structure (schemas are shared between identical structures)
+
+    :param parameter_dictionary: Parameter set
+    :param parameter_blacklist: Keys excluded from the genome
+    :return: Genome_schema
+    """
+    gene_paths = tuple(gen_gene_paths(parameter_dictionary, parameter_blacklist))
+
+    if gene_paths not in genome_schemas:
+        genome_schemas[gene_paths] = Genome_schema(list(gene_paths))
+
+    return genome_schemas[gene_paths]
+
+
+def gen_gene_paths(dictionary, parameter_blacklist, path=()):
+    """
+    List the paths of the mutable parameters of a parameter set, in canonical (sorted keys) order
+    """
+    gene_paths = []
+
+    for key in sorted(dictionary):
+        if key in parameter_blacklist:
+            continue
+
+        gene_path = path + (key,)
+
+        if type(dictionary[key]) is dict:
+            gene_paths += gen_gene_paths(dictionary[key], parameter_blacklist, gene_path)
+
+        # --> Parameter type is given by the second level key
+        elif len(gene_path) > 1 and gene_path[1] in EVOA_random_gen.gene_settings:
+            gene_paths.append(gene_path)
+
+    return gene_paths
+
+
+def get_nested_value(dictionary, path):
+    for key in path:
+        dictionary = dictionary[key]
+
+    return dictionary
+
+
+def set_nested_value(dictionary, path, value):
+    for key in path[:-1]:
+        dictionary = dictionary[key]
+
+    dictionary[path[-1]] = value
+
+
+def mutate_population(population, mutation_rate,
+                      current_generation, nb_of_generations,
+                      current_slice_cycle, nb_of_slice_cycles,
+                      decay_function,
+                      parameter_blacklist=["general_settings"],
+                      rng=None):
+    """
+    Mutate the parameter sets of a list of individuals (in place), individuals are mutated in groups of identical
+    parameter set structures
+
+    :param population: List of individuals
+    :param mutation_rate: Ratio of the genes mutated per individual
+    :param rng: numpy random Generator (see EVOA_random_gen.gen_numpy_random_generator)
+    """
+    if rng is None:
+        rng = EVOA_random_gen.gen_numpy_random_generator()
+
+    # --> Group individuals per schema
+    schema_groups = {}
+    for individual in population:
+        schema = get_genome_schema(individual.parameter_dictionary, parameter_blacklist)
+        schema_groups.setdefault(id(schema), (schema, []))[1].append(individual)
+
+    for schema, individuals in schema_groups.values():
+        if schema.nb_of_genes == 0:
+            continue
+
+        genomes, mutation_mask = schema.mutate(schema.encode_population(individuals),
+                                               round(schema.nb_of_genes*mutation_rate) or 1,
+                                               current_generation, nb_of_generations,
+                                               current_slice_cycle, nb_of_slice_cycles,
+                                               decay_function,
+                                               rng=rng)
+
+        # --> Only write mutated genes back (preserving the type of the others)
+        for i, individual in enumerate(individuals):
+            schema.decode(genomes[i], individual.parameter_dictionary, genes=np.flatnonzero(mutation_mask[i]))
@@ -8,7 +8,7 @@ This class contains the results_gen class, used to generate results form the var
 import time
 
 # Own modules
-from PhyTrade.Settings.SETTINGS import SETTINGS
+from PhyTrade.Settings.Settings_snapshot import get_settings_snapshot
 from PhyTrade.Tools.MATH_tools import MATH_tools
 
 __version__ = '1.1.1'
@@ -22,8 +22,7 @@ class EVOA_results_gen:
     def __init__(self, ticker):
         
         # ---- Fetch EVOA settings
-        self.settings = SETTINGS()
-        self.settings.signal_training_settings.gen_evoa_settings()
+        self.settings = get_settings_snapshot()
         
         self.run_label = self.settings.signal_training_settings.config_name
         self.ticker = ticker
@@ -96,7 +95,7 @@ class EVOA_results_gen:
 
         self.results_file = open(full_file_name + ".txt", "w+")
 
-        print("Net worth:", self.individual.account.net_worth_history[-1])
+        print("Net worth:", self.individual.metrics.net_worth)
 
         self.results_file.write("====================== " + self.run_label + " ======================\n")
         self.results_file.write("\n~~~~~~~~~~~ Run configuration recap: ~~~~~~~~~~~\n")
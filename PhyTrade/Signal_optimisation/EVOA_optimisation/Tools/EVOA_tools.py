@@ -14,6 +14,9 @@ The class contains:
 # Built-in/Generic Imports
 import sys
 
+# Libs
+import numpy as np
+
 __version__ = '1.1.1'
 __author__ = 'Victor Guillet'
 __date__ = '10/09/2019'
@@ -37,67 +40,126 @@ class EVOA_tools:
                             max_worker_processes=4,
                             evaluation_setting=0,
                             calculate_stats=False, multiprocessing=False,
-                            print_evaluation_status=False, plot_eco_model_results=False):
-        from PhyTrade.Signal_optimisation.EVOA_optimisation.Tools.EVOA_benchmark_tool import Confusion_matrix_analysis
-        from PhyTrade.Tools.Progress_bar_tool import Progress_bar
+                            print_evaluation_status=False, plot_eco_model_results=False,
+                            evaluation_pool=None, fitness_cache=None, batch_evaluation=True):
+        """
+        Evaluate every individual of a population on a data slice
 
-        confusion_matrix_analysis = []
-        metalabel_accuracies = []
-        metalabel_accuracies_bs = []
-        avg_metalabel_accuracies = []
-        net_worth = []
-        buy_count = []
-        sell_count = []
-        transaction_count = []
+        :param evaluation_pool: Persistent Evaluation_pool used to evaluate the population in parallel,
+                                the population is evaluated sequentially if None
+        :param fitness_cache: Fitness_cache used to skip the evaluation of individuals already evaluated on the data slice
+        :param batch_evaluation: Generate the economic models of the individuals evaluated sequentially in batch
+        """
+        from PhyTrade.Economic_model.Analysis_protocols.Prototype_5_batch import Prototype_5_batch
+        from PhyTrade.Tools.INDIVIDUAL_gen import perform_batch_trade_run
+        from PhyTrade.Tools.Progress_bar_tool import Progress_bar
 
         data_slice.perform_trade_run()
         metalabel_net_worth = data_slice.metalabels_account.net_worth_history[-1]
 
-        # Disable progress bar and all print functions in case of multiprocessing run case
-        if multiprocessing is False:
-            progress_bar = Progress_bar(len(population_lst))
-
-        # -- List based evaluation
-        for i in range(len(population_lst)):
-            if print_evaluation_status:
-                print("\n--------------------------------------------------")
-                print("Parameter set", i + 1)
+        population_metrics = [None]*len(population_lst)
 
-            population_lst[i].gen_economic_model(data_slice, plot_eco_model_results=plot_eco_model_results)
-            population_lst[i].perform_trade_run(data_slice)
+        # -- Fetch cached evaluations
+        if fitness_cache is not None:
+            cache_keys = [fitness_cache.gen_key(individual, data_slice, calculate_stats) for individual in population_lst]
 
-            if print_evaluation_status:
-                print("\nMetalabels net worth:", round(metalabel_net_worth), "$")
-                print("Final net worth:", round(population_lst[i].account.net_worth_history[-1], 3), "$")
-                print("\nTransaction count:", population_lst[i].tradebot.buy_count + population_lst[i].tradebot.sell_count)
-                print("Buy count:", population_lst[i].tradebot.buy_count)
-                print("Sell count:", population_lst[i].tradebot.sell_count, "\n")
+            for i in range(len(population_lst)):
+                population_metrics[i] = fitness_cache.get(cache_keys[i])
 
-            individual_confusion_matrix_analysis = Confusion_matrix_analysis(population_lst[i].trade_signal,
-                                                                             data_slice.metalabels,
-                                                                             calculate_stats=calculate_stats,
-                                                                             print_benchmark_results=print_evaluation_status)
+                if population_metrics[i] is not None:
+                    population_lst[i].metrics = population_metrics[i]
 
-            # --> Save evaluations
-            confusion_matrix_analysis.append(individual_confusion_matrix_analysis)
+        # --> Only evaluate the first occurrence of identical individuals
+        evaluated_keys = {}
+        duplicates = []
+        to_evaluate = []
 
-            # --> Save metalabel accuracies
-            metalabel_accuracies.append(individual_confusion_matrix_analysis.overall_accuracy_bs)
-            metalabel_accuracies_bs.append(individual_confusion_matrix_analysis.overall_accuracy)
+        for i in range(len(population_lst)):
+            if population_metrics[i] is None:
+                if fitness_cache is not None and cache_keys[i] in evaluated_keys:
+                    duplicates.append(i)
+                else:
+                    if fitness_cache is not None:
+                        evaluated_keys[cache_keys[i]] = i
+                    to_evaluate.append(i)
 
-            avg_metalabel_accuracies.append((individual_confusion_matrix_analysis.overall_accuracy+individual_confusion_matrix_analysis.overall_accuracy_bs)/2)
+        # -- Parallel evaluation
+        if evaluation_pool is not None:
+            evaluated_metrics = evaluation_pool.evaluate([population_lst[i] for i in to_evaluate], data_slice,
+                                                         calculate_stats=calculate_stats)
 
-            # --> Save net worth
-            net_worth.append(population_lst[i].account.net_worth_history[-1])
-            buy_count.append(population_lst[i].tradebot.buy_count)
-            sell_count.append(population_lst[i].tradebot.sell_count)
-            transaction_count.append(population_lst[i].tradebot.buy_count + population_lst[i].tradebot.sell_count)
+            for i, individual_metrics in zip(to_evaluate, evaluated_metrics):
+                population_metrics[i] = individual_metrics
 
+        # -- List based evaluation
+        else:
+            # Disable progress bar and all print functions in case of multiprocessing run case
             if multiprocessing is False:
-                progress_bar.update_progress()
-
-        # -- Multi-thread evaluation
-        # TODO: Add multithreading
+                progress_bar = Progress_bar(len(to_evaluate))
+
+            if batch_evaluation and len(to_evaluate) != 0:
+                batch_analysis = Prototype_5_batch([population_lst[i].parameter_dictionary for i in to_evaluate],
+                                                   data_slice)
+            else:
+                batch_analysis = None
+
+            for batch_index, i in enumerate(to_evaluate):
+                population_lst[i].gen_economic_model(data_slice, plot_eco_model_results=plot_eco_model_results,
+                                                     batch_analysis=batch_analysis, batch_index=batch_index)
+
+            # --> Backtest all individuals at once (individual trade runs are required to print the evaluation status)
+            if batch_analysis is not None and not print_evaluation_status:
+                batch_tradebot = perform_batch_trade_run([population_lst[i] for i in to_evaluate], data_slice)
+            else:
+                batch_tradebot = None
+
+            for batch_index, i in enumerate(to_evaluate):
+                if print_evaluation_status:
+                    print("\n--------------------------------------------------")
+                    print("Parameter set", i + 1)
+
+                if batch_tradebot is None:
+                    population_lst[i].perform_trade_run(data_slice)
+
+                if print_evaluation_status:
+                    print("\nMetalabels net worth:", round(metalabel_net_worth), "$")
+                    print("Final net worth:", round(population_lst[i].account.net_worth_history[-1], 3), "$")
+                    print("\nTransaction count:", population_lst[i].tradebot.buy_count + population_lst[i].tradebot.sell_count)
+                    print("Buy count:", population_lst[i].tradebot.buy_count)
+                    print("Sell count:", population_lst[i].tradebot.sell_count, "\n")
+
+                population_metrics[i] = population_lst[i].gen_metrics(data_slice,
+                                                                       calculate_stats=calculate_stats,
+                                                                       print_benchmark_results=print_evaluation_status,
+                                                                       batch_tradebot=batch_tradebot,
+                                                                       batch_index=batch_index)
+
+                if multiprocessing is False:
+                    progress_bar.update_progress()
+
+        # -- Record new evaluations
+        if fitness_cache is not None:
+            for i in to_evaluate:
+                fitness_cache.record(cache_keys[i], population_metrics[i])
+
+            for i in duplicates:
+                population_metrics[i] = population_metrics[evaluated_keys[cache_keys[i]]]
+                population_lst[i].metrics = population_metrics[i]
+
+        # --> Save evaluations
+        confusion_matrix_analysis = [individual_metrics.confusion_matrix_analysis for individual_metrics in population_metrics]
+
+        # --> Save metalabel accuracies
+        metalabel_accuracies = [analysis.overall_accuracy_bs for analysis in confusion_matrix_analysis]
+        metalabel_accuracies_bs = [analysis.overall_accuracy for analysis in confusion_matrix_analysis]
+
+        avg_metalabel_accuracies = [(analysis.overall_accuracy+analysis.overall_accuracy_bs)/2 for analysis in confusion_matrix_analysis]
+
+        # --> Save net worth
+        net_worth = [individual_metrics.net_worth for individual_metrics in population_metrics]
+        buy_count = [individual_metrics.buy_count for individual_metrics in population_metrics]
+        sell_count = [individual_metrics.sell_count for individual_metrics in population_metrics]
+        transaction_count = [individual_metrics.transaction_count for individual_metrics in population_metrics]
 
         # --> Perform evaluation based on net worth
         if evaluation_setting == 0:
@@ -127,38 +189,72 @@ class EVOA_tools:
         return fitness_evaluation, confusion_matrix_analysis, net_worth
 
     @staticmethod
-    def select_from_population(fitness_evaluation, population, selection_method=0, nb_parents=3):
-        if sum(fitness_evaluation) != 0:
-            # --> Determine fitness ratio
-            fitness_ratios = []
-            for i in range(len(fitness_evaluation)):
-                fitness_ratios.append(fitness_evaluation[i]/sum(fitness_evaluation)*100)
-
-            # --> Select individuals
-            parents = []
+    def select_from_population(fitness_evaluation, population, selection_method=0, nb_parents=3, tournament_size=3,
+                               rng=None):
+        """
+        Select distinct parents from a population according to their fitness evaluation (the population and fitness
+        evaluation lists are left untouched)
+
+        :param fitness_evaluation: Fitness evaluation of each individual of the population
+        :param population: List of individuals
+        :param selection_method: 0: Elitic, 1: Tournament, 2: Roulette
+        :param nb_parents: Number of parents to select
+        :param tournament_size: Number of contenders per tournament (Tournament selection only)
+        :param rng: numpy random Generator (see EVOA_random_gen.gen_numpy_random_generator)
+        :return: List of parents (sorted by fitness for elitic selection)
+        """
+        fitness_evaluation = np.asarray(fitness_evaluation, dtype=np.float64)
+        nb_parents = min(nb_parents, len(fitness_evaluation))
+
+        if fitness_evaluation.sum() != 0:
+            # --> Reject incorrect settings
+            if selection_method not in (0, 1, 2):
+                raise ValueError("Invalid parent selection method reference: " + str(selection_method))
 
-            # TODO: Implement alternative selection methods
-            # --> Exit program if incorrect settings used
-            if selection_method > 0:
-                print("Invalid parent selection method reference")
-                sys.exit()
+            if rng is None:
+                from PhyTrade.Signal_optimisation.EVOA_optimisation.Tools.EVOA_random_gen import EVOA_random_gen
+                rng = EVOA_random_gen.gen_numpy_random_generator()
 
             # Elitic selection
             if selection_method == 0:
-                sorted_fitness_ratios = fitness_ratios
-                sorted_population = population
-                sorted_fitness_evaluation = fitness_evaluation
-
-                # Use bubblesort to sort population, fitness_evaluation, and fitness_ratios according to fitness_ratio
-                for _ in range(len(sorted_fitness_ratios)):
-                    for i in range(len(sorted_fitness_ratios) - 1):
-                        if sorted_fitness_ratios[i] < sorted_fitness_ratios[i + 1]:
-                            sorted_fitness_ratios[i], sorted_fitness_ratios[i + 1] = sorted_fitness_ratios[i + 1], sorted_fitness_ratios[i]
-                            sorted_population[i], sorted_population[i + 1] = sorted_population[i + 1], sorted_population[i]
-                            sorted_fitness_evaluation[i], sorted_fitness_evaluation[i + 1] = sorted_fitness_evaluation[i + 1], sorted_fitness_evaluation[i]
+                # --> Find fitness of the nb_parents-th best individual in O(n)
+                kth_fitness = np.partition(fitness_evaluation, len(fitness_evaluation) - nb_parents)[-nb_parents]
+
+                # --> Select all individuals above it, and the first individuals tied with it
+                selected = np.flatnonzero(fitness_evaluation > kth_fitness)
+                tied = np.flatnonzero(fitness_evaluation == kth_fitness)[:nb_parents - len(selected)]
+                selected = np.concatenate((selected, tied))
+
+                # --> Sort selection by decreasing fitness (ties kept in population order)
+                selection = selected[np.lexsort((selected, -fitness_evaluation[selected]))]
+
+            # Tournament selection
+            elif selection_method == 1:
+                # --> Contenders are drawn (without replacement) from the individuals not selected yet
+                candidates = np.arange(len(fitness_evaluation))
+                selection = np.empty(nb_parents, dtype=np.int64)
 
                 for i in range(nb_parents):
-                    parents.append(sorted_population[i])
+                    contenders = rng.choice(candidates, min(max(1, tournament_size), len(candidates)), replace=False)
+                    selection[i] = contenders[np.argmax(fitness_evaluation[contenders])]
+                    candidates = candidates[candidates != selection[i]]
+
+            # Roulette selection
+            else:
+                fitness_weights = np.clip(fitness_evaluation, 0, None)
+                if fitness_weights.sum() == 0:
+                    fitness_weights = np.ones(len(fitness_evaluation))
+
+                # --> Draw without replacement, completed uniformly if too few individuals have a positive fitness
+                nb_weighted_parents = min(nb_parents, np.count_nonzero(fitness_weights))
+                selection = rng.choice(len(fitness_evaluation), nb_weighted_parents, replace=False,
+                                       p=fitness_weights/fitness_weights.sum())
+
+                remaining = np.setdiff1d(np.arange(len(fitness_evaluation)), selection)
+                selection = np.concatenate((selection, rng.choice(remaining, nb_parents - nb_weighted_parents,
+                                                                  replace=False)))
+
+            parents = [population[i] for i in selection]
 
         else:
             # --> Select individuals randomly
@@ -176,45 +272,35 @@ class EVOA_tools:
                             decay_function,
                             population_size, parents, nb_parents_in_next_gen, nb_random_ind,
                             parameter_blacklist=["general_settings"],
-                            mutation_rate=0.2):
+                            mutation_rate=0.2,
+                            rng=None):
 
-        from PhyTrade.Signal_optimisation.EVOA_optimisation.Tools.EVOA_random_gen import EVOA_random_gen
+        from PhyTrade.Signal_optimisation.EVOA_optimisation.Tools.EVOA_genome_schema import mutate_population
         from PhyTrade.Tools.INDIVIDUAL_gen import Individual
-        import random
-        from copy import deepcopy
-
-        nb_of_parameters_to_mutate = round(Individual().nb_of_parameters * mutation_rate) or 1
 
         # --> Save single best parent to new population
         new_population = parents[:nb_parents_in_next_gen]
 
-        # --> Generate offsprings from parents with mutations
+        # --> Generate offsprings from parents
+        offsprings = []
+
         cycling = -1
         for _ in range(population_size - nb_parents_in_next_gen - nb_random_ind):
             cycling += 1
             if cycling >= len(parents):
                 cycling = 0
 
-            offspring = deepcopy(parents[cycling])
+            offsprings.append(parents[cycling].clone())
 
-            # --> Mutate offspring
-            for _ in range(nb_of_parameters_to_mutate):
-                # --> Select parameter class to modify
-                parameter_class_to_modify = random.choice(list(offspring.parameter_dictionary.keys()))
-                while parameter_class_to_modify in parameter_blacklist:
-                    parameter_class_to_modify = random.choice(list(offspring.parameter_dictionary.keys()))
+        # --> Mutate offsprings
+        mutate_population(offsprings, mutation_rate,
+                          current_generation, nb_of_generations,
+                          current_slice_cycle, nb_of_slice_cycles,
+                          decay_function,
+                          parameter_blacklist=parameter_blacklist,
+                          rng=rng)
 
-                # --> Select parameter type to modify
-                parameter_type_to_modify = random.choice(list(offspring.parameter_dictionary[parameter_class_to_modify].keys()))
-                while parameter_type_to_modify in parameter_blacklist:
-                    parameter_type_to_modify = random.choice(list(offspring.parameter_dictionary[parameter_class_to_modify].keys()))
-
-                offspring = EVOA_random_gen().modify_param(offspring, parameter_type_to_modify,
-                                                           current_generation, nb_of_generations,
-                                                           current_slice_cycle, nb_of_slice_cycles,
-                                                           decay_function)
-
-            new_population.append(offspring)
+        new_population += offsprings
 
         # --> Create random_ind number of random individuals and add to new population
         for _ in range(nb_random_ind):
@@ -345,10 +431,12 @@ class EVOA_tools:
         mutation_rate = min(mutation_rate_gen, mutation_rate_cycle)
 
         if settings.print_evoa_parameters_per_gen:
+            nb_of_parameters = Individual().nb_of_parameters
+
             print("Number of parents selected:", nb_parents)
             print("Number of parents included:", nb_parents_in_next_gen)
             print("Number of random individuals included:", nb_random_ind)
             print("Number of parameters mutated:",
-                  str(round(Individual().nb_of_parameters*mutation_rate) or 1)+"/"+str(Individual().nb_of_parameters), "\n")
+                  str(round(nb_of_parameters*mutation_rate) or 1)+"/"+str(nb_of_parameters), "\n")
 
         return nb_parents, nb_parents_in_next_gen, nb_random_ind, mutation_rate
@@ -5,12 +5,17 @@ This script contains the data_slice class used by the EVOA Optimisation. The sli
 information about the slice analysed, including the starting and stopping index, along with the metalabels generated
 """
 
+# Built-in/Generic Imports
+import threading
+
 # Libs
 import numpy as np
 
 # Own modules
-from PhyTrade.Data_Collection_preparation.Fetch_technical_data import fetch_technical_data
+from PhyTrade.Data_Collection_preparation.Fetch_technical_data import fetch_technical_data, \
+    fetch_technical_data_artefact
 from PhyTrade.Backtesting.Metalabeling.METALABELS_gen import MetaLabels_gen
+from PhyTrade.Backtesting.Metalabeling.METALABELS_cache import fetch_history_barrier_labels
 
 __version__ = '1.1.1'
 __author__ = 'Victor Guillet'
@@ -21,29 +26,43 @@ __date__ = '10/09/2019'
 
 class data_slice:
     def __init__(self, ticker, start_date, slice_size, data_slice_shift_per_gen,
-                 data_selection="Open", end_date=None, data_looper=False):
+                 data_selection="Open", end_date=None, data_looper=False, data_handle=None):
 
         self.ticker = ticker
+
+        # --> Attach to the shared memory technical data of the ticker if a handle is provided (ie: in worker processes)
+        self.data_handle = data_handle
+
+        if self.data_handle is not None:
+            self.data_handle.attach()
+
         self.data = fetch_technical_data(ticker)
         self.selection = data_selection
 
+        # --> Cached view of the current slice selection: ((start_index, stop_index, selection), view)
+        self.sliced_data_selection_cache = (None, None)
+
+        # --> Slice caches can be accessed from multiple threads (see the thread evaluation backend)
+        self.cache_lock = threading.RLock()
+
+        # --> Artefacts of the current slice shared by the models generated on it: (slice key, {artefact key: artefact})
+        self.slice_artefacts_cache = (None, {})
+
         # ---- Data slice properties
         # --> Find corresponding starting data index from start date and shift to next day if not available
-        found = False
-        while found != True:
-            if start_date in list(self.data["Date"]):
-                found = True
-            else:
-                print("!!!!! Start Date selected not present in data !!!!!")
-                start_date = start_date[:-1] + str(int(start_date[-1]) + 1)
+        self.start_index = self.find_date_index(start_date)
+
+        if self.start_index is None:
+            raise ValueError("Start date selected (" + start_date + ") is past the end of the data available")
 
-        self.start_index = -len(self.data)+np.flatnonzero(self.data['Date'] == start_date)[0]
+        if self.data.iloc[self.start_index]['Date'] != start_date:
+            print("!!!!! Start Date selected not present in data !!!!!")
 
         # --> Adjust slice size according to data available if necessary
         self.slice_size = slice_size
 
-        if len(self.data[self.start_index:]) < self.slice_size:
-            self.slice_size = -len(self.data[self.start_index:])
+        if -self.start_index < self.slice_size:
+            self.slice_size = self.start_index
             print("Data slice size adjusted to:", self.slice_size)
 
         # --> Find corresponding stop data index
@@ -55,9 +74,10 @@ class data_slice:
 
         self.default_end_date = end_date
         if self.default_end_date is not None:
-            try:
-                self.default_end_index = -len(self.data)+np.flatnonzero(self.data['Date'] == self.default_end_date)[0]
-            except:
+            self.default_end_index = self.find_date_index(self.default_end_date)
+
+            if self.default_end_index is None \
+                    or self.data.iloc[self.default_end_index]['Date'] != self.default_end_date:
                 print("!!!!! End Date selected not present in data !!!!!")
         else:
             self.default_end_index = -1
@@ -85,21 +105,57 @@ class data_slice:
 
     @property
     def data_selection(self):
-        return list(self.data[self.selection])
+        """
+        Full history of the selected column, as a shared read-only numpy array
+        """
+        return fetch_technical_data_artefact(self.ticker, ("column", self.selection),
+                                             lambda data: gen_column_array(data, self.selection))
 
     @property
     def sliced_data_selection(self):
-        return list(self.sliced_data[self.selection])
+        """
+        Selected column over the current slice, as a read-only numpy view (no copy). The view is
+        only regenerated when the slice indexes are moved
+        """
+        key = (self.start_index, self.stop_index, self.selection)
 
-    def gen_slice_metalabels(self, upper_barrier, lower_barrier, look_ahead, metalabeling_setting=0):
+        with self.cache_lock:
+            if self.sliced_data_selection_cache[0] != key:
+                self.sliced_data_selection_cache = (key, self.data_selection[self.start_index:self.stop_index])
+
+            return self.sliced_data_selection_cache[1]
+
+    def fetch_slice_artefact(self, key, builder):
+        """
+        Fetch an artefact derived from the current slice (ie: Bollinger band threshold variations), built once
+        per slice. Artefacts are dropped when the slice indexes are moved
+
+        :param key: Hashable reference of the artefact
+        :param builder: Callable returning the artefact
+        :return: Shared artefact
+        """
+        slice_key = (self.start_index, self.stop_index, self.slice_size, self.selection)
+
+        with self.cache_lock:
+            if self.slice_artefacts_cache[0] != slice_key:
+                self.slice_artefacts_cache = (slice_key, {})
+
+            if key not in self.slice_artefacts_cache[1]:
+                self.slice_artefacts_cache[1][key] = builder()
+
+            return self.slice_artefacts_cache[1][key]
+
+    def gen_slice_metalabels(self, upper_barrier, lower_barrier, look_ahead, metalabeling_setting=0, disk_cache=False):
         """
         Generate metalabels for a specific data slice. Only necessary to be ran when a
-        dataslice instance is initiated.
+        dataslice instance is initiated. The barrier labels (simple/hybrid metalabels) are sliced from
+        the full history labels of the ticker, generated once (see METALABELS_cache).
 
         :param upper_barrier: Upper barrier to be used
         :param lower_barrier: Lower barrier to be used
         :param look_ahead: Look ahead to be used
         :param metalabeling_setting: Metalabeling method to be used
+        :param disk_cache: Load/save the full history barrier labels from/to disk
         """
         # --> Create mock data slice and add parameters and info
         mock_data_slice = address_sim()
@@ -108,10 +164,20 @@ class data_slice:
         mock_data_slice.start_index = self.start_index
         mock_data_slice.stop_index = self.stop_index
 
+        # --> Fetch full history barrier labels
+        if metalabeling_setting in [1, 2]:
+            history_barrier_labels = fetch_history_barrier_labels(self.ticker, self.selection,
+                                                                  upper_barrier, lower_barrier, look_ahead,
+                                                                  disk_cache=disk_cache)
+        else:
+            history_barrier_labels = None
+
+        self.metalabels_settings = (upper_barrier, lower_barrier, look_ahead, metalabeling_setting)
         self.metalabels = MetaLabels_gen(upper_barrier, lower_barrier,
                                          look_ahead,
                                          mock_data_slice,
-                                         metalabel_setting=metalabeling_setting).metalabels
+                                         metalabel_setting=metalabeling_setting,
+                                         history_barrier_labels=history_barrier_labels).metalabels
         return
 
     def get_next_data_slice(self):
@@ -157,6 +223,39 @@ class data_slice:
         return
 
     # ========================================= Data slice tools =========================================
+    @property
+    def date_index(self):
+        """
+        Sorted datetime64 dates of the ticker and the corresponding data positions,
+        built once per dataset version and shared through the dataset registry
+        """
+        return fetch_technical_data_artefact(self.ticker, "date_index", gen_date_index)
+
+    @property
+    def indicator_tables(self):
+        """
+        Full history indicator tables of the ticker, shared through the dataset registry
+        """
+        from PhyTrade.Economic_model.Technical_Analysis.Tools.INDICATOR_TABLES_gen import Indicator_tables
+
+        return fetch_technical_data_artefact(self.ticker, "indicator_tables", Indicator_tables)
+
+    def find_date_index(self, date):
+        """
+        Find the (negative) data index of the first trading day on or after a date, in O(log n)
+
+        :param date: Date string (YYYY-MM-DD) or datetime64
+        :return: Negative data index, None if date is past the end of the data
+        """
+        dates, positions = self.date_index
+
+        sorted_position = np.searchsorted(dates, np.datetime64(date, 'D'), side='left')
+
+        if sorted_position == len(dates):
+            return None
+
+        return -len(dates) + int(positions[sorted_position])
+
     def check_end_data(self):
         if self.default_end_date is None:
             if self.stop_index >= -1:
@@ -199,10 +298,63 @@ class data_slice:
             else:
                 return
 
+    def __getstate__(self):
+        # --> Technical data is not pickled (ie: when sent to worker processes), it is fetched again on unpickling
+        # (from shared memory if a data handle is provided)
+        state = self.__dict__.copy()
+        del state["data"]
+        state["sliced_data_selection_cache"] = (None, None)
+        state["slice_artefacts_cache"] = (None, {})
+        del state["cache_lock"]
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.cache_lock = threading.RLock()
+
+        if self.data_handle is not None:
+            self.data_handle.attach()
+
+        self.data = fetch_technical_data(self.ticker)
+
     def __str__(self):
         return "Data slice: Ticker - " + self.ticker + ", Current start_date - " + self.start_date + ", Slice size: " + str(self.slice_size)
 
 
+def gen_column_array(data, column):
+    """
+    Generate contiguous read-only float64 array of a technical dataset column
+
+    :param data: Technical dataset
+    :param column: Column to be converted
+    :return: Numpy array
+    """
+    column_array = np.ascontiguousarray(data[column], dtype=np.float64)
+    column_array.setflags(write=False)
+
+    return column_array
+
+
+def gen_date_index(data):
+    """
+    Generate sorted date index of a technical dataset
+
+    :param data: Technical dataset
+    :return: Sorted datetime64 dates, data positions of the sorted dates
+    """
+    dates = np.array(data["Date"], dtype="datetime64[D]")
+
+    # --> Data is expected to be in chronological order, sort only if necessary
+    if len(dates) > 1 and not (dates[1:] >= dates[:-1]).all():
+        positions = np.argsort(dates, kind="stable")
+        dates = dates[positions]
+    else:
+        positions = np.arange(len(dates))
+
+    return dates, positions
+
+
 class address_sim:
     def __init__(self):
         pass
@@ -3,13 +3,19 @@
 """
 Used to generate individuals. Individuals contain a parameter set (either provided or generated)
 and can generate economic model, and perform trade runs
+
+Individuals only hold their genome (ticker and parameter set), the artefacts generated when evaluating them
+(analysis, splines, tradebot, account) are stored in a separate Individual_evaluation that can be discarded.
+The results of the last evaluation (net worth, counts, etc...) are kept in a lightweight Individual_metrics.
 """
 
+# Built-in/Generic Imports
+from copy import deepcopy
+
 # Own modules
-from PhyTrade.Settings.SETTINGS import SETTINGS
+from PhyTrade.Settings.Settings_snapshot import get_settings_snapshot
 from PhyTrade.Signal_optimisation.EVOA_optimisation.Tools.EVOA_random_gen import EVOA_random_gen
-from PhyTrade.Data_Collection_preparation.Fetch_technical_data import fetch_technical_data
-from PhyTrade.Tools.GENERAL_tools import GENERAL_tools
+from PhyTrade.Signal_optimisation.EVOA_optimisation.Tools.EVOA_genome_schema import get_genome_schema
 
 __version__ = '1.1.1'
 __author__ = 'Victor Guillet'
@@ -19,15 +25,17 @@ __date__ = '10/09/2019'
 
 
 class Individual:
+    __slots__ = ["ticker", "parameter_dictionary", "nb_of_parameters", "evaluation", "metrics"]
+
     def __init__(self, ticker="AAPL", parameter_set=None):
-        # ========================= DATA COLLECTION INITIALISATION =======================
+        # ========================= GENOME INITIALISATION =======================
         self.ticker = ticker
-        self.data = fetch_technical_data(self.ticker)
-        settings = SETTINGS()
-        settings.signal_training_settings.gen_evoa_settings()
+        self.evaluation = None
+        self.metrics = None
+
+        settings = get_settings_snapshot()
 
         if parameter_set is None:
-            settings.individual_settings.gen_individual_settings()
             self.gen_parameter_set(threshold_setting=settings.individual_settings.threshold_setting,
                                    buffer_setting=settings.individual_settings.buffer_setting,
                                    spline_interpolation_factor=settings.individual_settings.spline_interpolation_factor,
@@ -48,28 +56,83 @@ class Individual:
         else:
             self.parameter_dictionary = parameter_set
 
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ Counting number of parameters
-        self.nb_of_parameters = GENERAL_tools().calc_nested_dic_item_count(self.parameter_dictionary, settings.signal_training_settings.parameter_blacklist)
-
-        for i in self.parameter_dictionary:
-            for j in range(len(self.parameter_dictionary[i])):
-                self.nb_of_parameters += 1
-
-    def gen_economic_model(self, data_slice, plot_eco_model_results=False):
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ Counting number of parameters (genes)
+        self.nb_of_parameters = get_genome_schema(self.parameter_dictionary, settings.signal_training_settings.parameter_blacklist).nb_of_genes
+
+    # ========================================= Evaluation artefacts =========================================
+    @property
+    def analysis(self):
+        return self.evaluation.analysis
+
+    @property
+    def spline(self):
+        return self.evaluation.spline
+
+    @property
+    def trade_spline(self):
+        return self.evaluation.trade_spline
+
+    @property
+    def trade_signal(self):
+        return self.evaluation.trade_signal
+
+    @property
+    def tradebot(self):
+        return self.evaluation.tradebot
+
+    @property
+    def account(self):
+        return self.evaluation.account
+
+    def discard_evaluation(self):
+        self.evaluation = None
+
+    def clone(self):
+        """
+        Create a copy of the individual genome (parameter set), without its evaluation artefacts
+
+        :return: Individual
+        """
+        offspring = Individual.__new__(Individual)
+        offspring.ticker = self.ticker
+        offspring.parameter_dictionary = deepcopy(self.parameter_dictionary)
+        offspring.nb_of_parameters = self.nb_of_parameters
+        offspring.evaluation = None
+        offspring.metrics = None
+
+        return offspring
+
+    def gen_economic_model(self, data_slice, plot_eco_model_results=False, batch_analysis=None, batch_index=None):
+        """
+        Generate the economic model of the individual on a data slice
+
+        :param data_slice: Data slice to generate the model on
+        :param plot_eco_model_results: Plot the model output
+        :param batch_analysis: Prototype_5_batch containing the model of the individual, generated if None
+        :param batch_index: Index of the individual in the batch
+        """
         from PhyTrade.Economic_model.Analysis_protocols.Prototype_5 import Prototype_5
         from PhyTrade.Tools.PLOT_tools import PLOT_tools
 
-        self.analysis = Prototype_5(self.parameter_dictionary, data_slice)
+        self.evaluation = Individual_evaluation()
+
+        if batch_analysis is None:
+            self.evaluation.analysis = Prototype_5(self.parameter_dictionary, data_slice)
+            major_spline = self.analysis.big_data.Major_spline
+
+        else:
+            self.evaluation.analysis = batch_analysis
+            major_spline = batch_analysis.major_splines[batch_index]
 
-        self.spline = self.analysis.big_data.Major_spline.spline
-        self.trade_spline = self.analysis.big_data.Major_spline.trade_spline
-        self.trade_signal = self.analysis.big_data.Major_spline.trade_signal
+        self.evaluation.spline = major_spline.spline
+        self.evaluation.trade_spline = major_spline.trade_spline
+        self.evaluation.trade_signal = major_spline.trade_signal
 
         # analysis.plot(plot_1=False, plot_2=False, plot_3=plot_3)
         if plot_eco_model_results:
             PLOT_tools().plot_trade_process(data_slice, self.spline,
-                                            self.analysis.big_data.Major_spline.upper_threshold,
-                                            self.analysis.big_data.Major_spline.lower_threshold,
+                                            major_spline.upper_threshold,
+                                            major_spline.lower_threshold,
                                             self.trade_signal)
 
     def perform_trade_run(self,
@@ -84,20 +147,52 @@ class Individual:
 
         from PhyTrade.Trade_simulations.Trading_bots.Tradebot_v4 import Tradebot_v4
 
-        self.tradebot = Tradebot_v4(data_slice.sliced_data_selection,
-                                    self.trade_signal,
-                                    self.trade_spline,
-                                    investment_settings=investment_settings, cash_in_settings=cash_in_settings,
-                                    initial_funds=initial_funds,
-                                    initial_assets=initial_assets,
-                                    prev_stop_loss=prev_stop_loss, max_stop_loss=max_stop_loss,
-                                    max_investment_per_trade=max_investment_per_trade,
-                                    prev_simple_investment_assets=prev_simple_investment_assets,
-                                    print_trade_process=print_trade_process)
-
-        self.account = self.tradebot.account
+        self.evaluation.tradebot = Tradebot_v4(data_slice.sliced_data_selection,
+                                               self.trade_signal,
+                                               self.trade_spline,
+                                               investment_settings=investment_settings, cash_in_settings=cash_in_settings,
+                                               initial_funds=initial_funds,
+                                               initial_assets=initial_assets,
+                                               prev_stop_loss=prev_stop_loss, max_stop_loss=max_stop_loss,
+                                               max_investment_per_trade=max_investment_per_trade,
+                                               prev_simple_investment_assets=prev_simple_investment_assets,
+                                               print_trade_process=print_trade_process)
+
+        self.evaluation.account = self.tradebot.account
         # self.big_data = tradebot.analysis.big_data
 
+    def gen_metrics(self, data_slice, calculate_stats=False, print_benchmark_results=False,
+                    batch_tradebot=None, batch_index=None):
+        """
+        Generate the metrics of the current evaluation (requires the economic model and trade run to be generated)
+
+        :param data_slice: Data slice the individual was evaluated on
+        :param calculate_stats: Calculate confusion matrix stats
+        :param print_benchmark_results: Print confusion matrix analysis results
+        :param batch_tradebot: Tradebot_v4_batch containing the trade run of the individual, the individual trade run is used if None
+        :param batch_index: Index of the individual in the batch
+        :return: Individual_metrics
+        """
+        from PhyTrade.Signal_optimisation.EVOA_optimisation.Tools.EVOA_benchmark_tool import Confusion_matrix_analysis
+
+        self.metrics = Individual_metrics()
+
+        if batch_tradebot is None:
+            self.metrics.net_worth = self.account.net_worth_history[-1]
+            self.metrics.buy_count = self.tradebot.buy_count
+            self.metrics.sell_count = self.tradebot.sell_count
+
+        else:
+            self.metrics.net_worth = batch_tradebot.net_worth[batch_index]
+            self.metrics.buy_count = int(batch_tradebot.buy_count[batch_index])
+            self.metrics.sell_count = int(batch_tradebot.sell_count[batch_index])
+
+        self.metrics.confusion_matrix_analysis = Confusion_matrix_analysis(self.trade_signal,
+                                                                           data_slice.metalabels,
+                                                                           calculate_stats=calculate_stats,
+                                                                           print_benchmark_results=print_benchmark_results)
+        return self.metrics
+
     def gen_parameter_set(self,
                           threshold_setting=2,
                           buffer_setting=1,
@@ -236,3 +331,62 @@ class Individual:
         self.parameter_dictionary["spline_property"]["major_spline_standard_upper_thresholds"] = ga_random.major_spline_upper_threshold_random_gen()
         self.parameter_dictionary["spline_property"]["major_spline_standard_lower_thresholds"] = ga_random.major_spline_lower_threshold_random_gen()
         self.parameter_dictionary["indicator_properties"]["timeframes"]["threshold_timeframe"] = 20
+
+
+def perform_batch_trade_run(population_lst, data_slice,
+                            investment_settings=3, cash_in_settings=0,
+                            initial_funds=1000,
+                            initial_assets=0,
+                            prev_stop_loss=0.85, max_stop_loss=0.75,
+                            max_investment_per_trade=500,
+                            prev_simple_investment_assets=None):
+    """
+    Perform the trade runs of a list of individuals at once, in fitness-only mode (same settings as
+    Individual.perform_trade_run, the economic model of every individual must be generated)
+
+    :param population_lst: List of individuals
+    :param data_slice: Data slice the individuals are evaluated on
+    :return: Tradebot_v4_batch
+    """
+    from PhyTrade.Trade_simulations.Trading_bots.Tradebot_v4_batch import Tradebot_v4_batch
+
+    return Tradebot_v4_batch(data_slice.sliced_data_selection,
+                             [individual.trade_signal for individual in population_lst],
+                             [individual.trade_spline for individual in population_lst],
+                             investment_settings=investment_settings, cash_in_settings=cash_in_settings,
+                             initial_funds=initial_funds,
+                             initial_assets=initial_assets,
+                             prev_stop_loss=prev_stop_loss, max_stop_loss=max_stop_loss,
+                             max_investment_per_trade=max_investment_per_trade,
+                             prev_simple_investment_assets=prev_simple_investment_assets)
+
+
+class Individual_evaluation:
+    def __init__(self):
+        """
+        Artefacts generated by the evaluation of an individual on a data slice
+        """
+        self.analysis = None
+
+        self.spline = None
+        self.trade_spline = None
+        self.trade_signal = None
+
+        self.tradebot = None
+        self.account = None
+
+
+class Individual_metrics:
+    def __init__(self):
+        """
+        Results of the evaluation of an individual on a data slice
+        """
+        self.net_worth = None
+        self.buy_count = None
+        self.sell_count = None
+
+        self.confusion_matrix_analysis = None
+
+    @property
+    def transaction_count(self):
+        return self.buy_count + self.sell_count
@@ -0,0 +1,358 @@
+
+################################################################################################################
+"""
+Contains the sequential state-machine kernels used for generating dynamic thresholds/bounds and trigger signals.
+
+The kernels are compiled with Numba when it is installed, and run as plain Python functions otherwise. When running
+as plain Python, inputs are converted to lists beforehand as element access on lists is considerably faster than on
+numpy arrays (see gen_kernel_input).
+"""
+
+# Libs
+import numpy as np
+
+try:
+    from numba import njit
+    numba_available = True
+
+except ImportError:
+    numba_available = False
+
+__version__ = '1.1.1'
+__author__ = 'Victor Guillet'
+__date__ = '10/09/2019'
+
+################################################################################################################
+
+
+def jit(function):
+    """
+    Compile function with Numba if available, else return function as is
+    """
+    if numba_available:
+        return njit(cache=True, nogil=True)(function)
+
+    return function
+
+
+def gen_kernel_input(signal):
+    """
+    Convert a signal to the most efficient type for the kernel backend used
+    (contiguous float64 array for Numba, list for plain Python)
+
+    :param signal: Signal to convert
+    :return: Array or list
+    """
+    if numba_available:
+        return np.array(signal, dtype=np.float64)
+
+    return np.asarray(signal, dtype=np.float64).tolist()
+
+
+def gen_kernel_output(size):
+    """
+    Generate a zero-filled output buffer of the most efficient type for the kernel backend used
+
+    :param size: Size of the buffer
+    :return: Array or list
+    """
+    if numba_available:
+        return np.zeros(size)
+
+    return [0.] * size
+
+
+# ============================================== SPLINE kernels ==============================================
+@jit
+def calc_dynamic_upper_threshold(spline, upper_threshold, spline_buffer, buffer):
+    """
+    Define upper dynamic bound (in place)
+    """
+    max_prev = 1.
+    freeze_trade = False
+    for i in range(len(spline)):
+        if spline[i] < upper_threshold[i]:
+            max_prev = 1.
+            freeze_trade = False
+
+        if spline[i] > (upper_threshold[i] + (buffer * spline_buffer[i])) and not freeze_trade or spline[i] > max_prev:
+            new_upper_threshold = spline[i] - (buffer * spline_buffer[i])
+            if new_upper_threshold >= upper_threshold[i - 1]:
+                upper_threshold[i] = new_upper_threshold
+
+            elif spline[i] < upper_threshold[i - 1]:
+                max_prev = spline[i]
+                freeze_trade = True
+
+            else:
+                max_prev = spline[i]
+                upper_threshold[i] = upper_threshold[i - 1]
+
+
+@jit
+def calc_dynamic_lower_threshold(spline, lower_threshold, spline_buffer, buffer):
+    """
+    Define lower dynamic bound (in place)
+    """
+    min_prev = -1.
+    freeze_trade = False
+    for i in range(len(spline)):
+        if spline[i] > lower_threshold[i]:
+            min_prev = -1.
+            freeze_trade = False
+
+        if spline[i] < (lower_threshold[i] - (buffer * spline_buffer[i])) and not freeze_trade or spline[i] < min_prev:
+            new_lower_threshold = spline[i] + (buffer * spline_buffer[i])
+            if new_lower_threshold <= lower_threshold[i - 1]:
+                lower_threshold[i] = new_lower_threshold
+
+            elif spline[i] > lower_threshold[i - 1]:
+                min_prev = spline[i]
+                freeze_trade = True
+
+            else:
+                min_prev = spline[i]
+                lower_threshold[i] = lower_threshold[i - 1]
+
+
+@jit
+def calc_trade_signal(trade_signal, trade_spline, trade_upper_threshold, trade_lower_threshold, slice_size):
+    """
+    Generate trade signal from trade spline and thresholds (in place)
+
+    Buy and sell triggers can take three values:
+    0 for neutral, 1 for sell at next bound crossing and 2 for post-sell
+    """
+    sell_trigger = 0
+    buy_trigger = 0
+
+    max_prev = 0.
+    max_prev_set = False
+    min_prev = 0.
+    min_prev_set = False
+
+    back_range = 1
+
+    # --> Monotonic deques of the indexes of the running max upper/min lower threshold over the back range
+    # (the back range start (i - back_range + 1) never decreases, it is only extended while a trigger is armed)
+    upper_deque = np.empty(slice_size, dtype=np.int64)
+    upper_deque_start = 0
+    upper_deque_end = 0
+
+    lower_deque = np.empty(slice_size, dtype=np.int64)
+    lower_deque_start = 0
+    lower_deque_end = 0
+
+    for i in range(slice_size):
+        if sell_trigger == 1 or buy_trigger == 1:
+            back_range += 1
+
+        # --> Update running extremums of the thresholds over the back range
+        while upper_deque_end > upper_deque_start and \
+                trade_upper_threshold[upper_deque[upper_deque_end - 1]] <= trade_upper_threshold[i]:
+            upper_deque_end -= 1
+        upper_deque[upper_deque_end] = i
+        upper_deque_end += 1
+
+        while lower_deque_end > lower_deque_start and \
+                trade_lower_threshold[lower_deque[lower_deque_end - 1]] >= trade_lower_threshold[i]:
+            lower_deque_end -= 1
+        lower_deque[lower_deque_end] = i
+        lower_deque_end += 1
+
+        while upper_deque[upper_deque_start] < i - back_range + 1:
+            upper_deque_start += 1
+
+        while lower_deque[lower_deque_start] < i - back_range + 1:
+            lower_deque_start += 1
+
+        if trade_spline[i] > 0:
+            # ...upper bound
+            if trade_spline[i] >= trade_upper_threshold[i] and sell_trigger == 0:    # Initiate sell trigger
+                sell_trigger = 1
+                continue
+
+            if trade_spline[i] <= trade_upper_threshold[upper_deque[upper_deque_start]] and sell_trigger == 1:   # Trigger sell signal
+                trade_signal[i] = 1
+                max_prev = trade_spline[i]
+                max_prev_set = True
+                sell_trigger = 2
+
+                back_range = 1
+                continue
+
+            if trade_spline[i] <= trade_upper_threshold[i] and sell_trigger == 2:   # Reset trigger
+                max_prev_set = False
+                sell_trigger = 0
+                continue
+
+            if max_prev_set:  # Re-initiate sell trigger if signal increase past previous max
+                if trade_spline[i] > max_prev and sell_trigger == 2:
+                    sell_trigger = 1
+                    max_prev_set = False
+
+        else:
+            # ...lower bound
+            if trade_spline[i] <= trade_lower_threshold[i] and buy_trigger == 0:     # Initiate buy trigger
+                buy_trigger = 1
+                continue
+
+            if trade_spline[i] >= trade_lower_threshold[lower_deque[lower_deque_start]] and buy_trigger == 1:    # Trigger buy signal
+                trade_signal[i] = -1
+                min_prev = trade_spline[i]
+                min_prev_set = True
+                buy_trigger = 2
+
+                back_range = 1
+                continue
+
+            if trade_spline[i] >= trade_lower_threshold[i] and buy_trigger == 2:    # Reset trigger
+                min_prev_set = False
+                buy_trigger = 0
+                continue
+
+            if min_prev_set:        # Re-initiate buy trigger if signal decrease past previous min
+                if trade_spline[i] < min_prev and buy_trigger == 2:
+                    buy_trigger = 1
+                    min_prev_set = False
+
+    if buy_trigger == 1:
+        trade_signal[-1] = -1
+
+    if sell_trigger == 1:
+        trade_signal[-1] = 1
+
+
+# ============================================== Indicator kernels ==============================================
+@jit
+def calc_rsi_dynamic_bounds(rsi_values, upper_bound, lower_bound,
+                            standard_upper_threshold, standard_lower_threshold, rsi_buffer, slice_size):
+    """
+    Define RSI upper and lower dynamic bounds (in place)
+    """
+    # Define upper dynamic bound method
+    freeze_trade_upper = False
+
+    for i in range(slice_size):
+        if rsi_values[i] < standard_upper_threshold:
+            freeze_trade_upper = False
+
+        if rsi_values[i] > (standard_upper_threshold + rsi_buffer) and not freeze_trade_upper:
+            new_upper_bound = rsi_values[i] - rsi_buffer
+            if new_upper_bound >= upper_bound[i-1]:
+                upper_bound[i] = new_upper_bound
+
+            elif rsi_values[i] < upper_bound[i-1]:
+                freeze_trade_upper = True
+
+            else:
+                upper_bound[i] = upper_bound[i-1]
+
+    # Define lower dynamic bound method
+    freeze_trade_lower = False
+
+    for i in range(len(rsi_values)):
+        if rsi_values[i] > standard_lower_threshold:
+            freeze_trade_lower = False
+
+        if rsi_values[i] < (standard_lower_threshold - rsi_buffer) and not freeze_trade_lower:
+            new_lower_bound = rsi_values[i] + rsi_buffer
+            if new_lower_bound <= upper_bound[i-1]:
+                lower_bound[i] = new_lower_bound
+
+            elif rsi_values[i] > lower_bound[i - 1]:
+                freeze_trade_lower = True
+
+            else:
+                lower_bound[i] = lower_bound[i-1]
+
+
+@jit
+def calc_rsi_triggers(bb_signal, rsi_values, upper_bound, lower_bound,
+                      standard_upper_threshold, standard_lower_threshold, slice_size):
+    """
+    Maximise/minimise bb signal when RSI crosses upper/lower bound (in place)
+
+    Buy and sell triggers can take three values:
+    0 for neutral, 1 for sell at next bound crossing and 2 for post-sell
+    """
+    sell_trigger = 0
+    buy_trigger = 0
+
+    for i in range(slice_size):
+        # ...upper bound
+        if rsi_values[i] >= standard_upper_threshold and sell_trigger == 0:  # Initiate sell trigger
+            sell_trigger = 1
+
+        if rsi_values[i] <= upper_bound[i] and sell_trigger == 1:  # Trigger sell signal
+            bb_signal[i] = 1
+            sell_trigger = 2
+
+        if rsi_values[i] < standard_upper_threshold and sell_trigger == 2:  # Reset trigger
+            sell_trigger = 0
+
+        # ...lower bound
+        if rsi_values[i] <= standard_lower_threshold and buy_trigger == 0:  # Initiate buy trigger
+            buy_trigger = 1
+
+        if rsi_values[i] >= lower_bound[i] and buy_trigger == 1:  # Trigger buy signal
+            bb_signal[i] = -1
+            buy_trigger = 2
+
+        if rsi_values[i] > standard_lower_threshold and sell_trigger == 2:  # Reset trigger
+            buy_trigger = 0
+
+
+@jit
+def calc_cross_triggers_kernel(bb_signal, signal_1, signal_2, slice_size):
+    # --> Config can take two values, 0 for when signal_1 is higher than signal_2, and 1 for the other way around
+    if signal_1[0] > signal_2[0]:
+        config = 0
+    else:
+        config = 1
+
+    for i in range(slice_size):
+        if config == 0:
+            if signal_2[i] > signal_1[i]:
+                bb_signal[i] = 1
+                config = 1
+        else:
+            if signal_1[i] > signal_2[i]:
+                bb_signal[i] = -1
+                config = 0
+
+
+def calc_cross_triggers(bb_signal, signal_1, signal_2, slice_size):
+    """
+    Maximise bb signal when signal_2 crosses above signal_1, and minimise it when signal_1 crosses above signal_2 (in place)
+
+    :param bb_signal: bb signal (float64 array)
+    :param signal_1: First signal
+    :param signal_2: Second signal
+    :param slice_size: Number of days to process
+    """
+    if numba_available:
+        calc_cross_triggers_kernel(bb_signal, gen_kernel_input(signal_1[:slice_size]),
+                                   gen_kernel_input(signal_2[:slice_size]), slice_size)
+        return
+
+    # --> Position of signal_1 relative to signal_2 (1: signal_1 higher, -1: signal_1 lower, 0: equal or NaN)
+    signal_1 = np.asarray(signal_1[:slice_size])
+    signal_2 = np.asarray(signal_2[:slice_size])
+
+    relative_position = np.where(signal_1 > signal_2, 1, np.where(signal_2 > signal_1, -1, 0))
+
+    # --> Initial config (equal values are considered as config 1)
+    if relative_position[0] != 1:
+        relative_position[0] = -1
+
+    # --> Config preceding each day, carried forward from the last day with non-equal values
+    last_config_day = np.where(relative_position != 0, np.arange(len(relative_position)), 0)
+    last_config_day = np.maximum.accumulate(last_config_day)
+    previous_config = relative_position[np.concatenate(([0], last_config_day[:-1]))]
+
+    # --> Trigger when signals cross
+    triggers = (relative_position != 0) & (relative_position != previous_config)
+
+    bb_signal[:slice_size][triggers & (relative_position == -1)] = 1
+    bb_signal[:slice_size][triggers & (relative_position == 1)] = -1
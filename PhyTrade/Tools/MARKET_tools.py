@@ -5,7 +5,7 @@ Contain market specific tools
 """
 
 # Own modules
-from PhyTrade.Settings.SETTINGS import SETTINGS
+from PhyTrade.Settings.Settings_snapshot import get_settings_snapshot
 
 __version__ = '1.1.1'
 __author__ = 'Victor Guillet'
@@ -16,11 +16,4 @@ __date__ = '10/09/2019'
 
 class MARKET_tools:
     def calc_transaction_cost(self, asset_count):
-        settings = SETTINGS()
-        settings.market_settings.gen_market_settings()
-
-        transaction_cost = asset_count*settings.market_settings.transaction_cost_per_share
-        if transaction_cost < settings.market_settings.min_transaction_cost:
-            transaction_cost = settings.market_settings.min_transaction_cost
-
-        return transaction_cost
+        return get_settings_snapshot().calc_transaction_cost(asset_count)
@@ -16,66 +16,149 @@ __date__ = '10/09/2019'
 
 class MATH_tools:
     @staticmethod
-    def alignator_minus_one_one(signal, signal_max=100, signal_min=-100):
-        signal_normalised = np.zeros(len(signal))
+    def alignator_minus_one_one(signal, signal_max=100, signal_min=-100, out=None):
+        """
+        Align signal between -1 and 1 using fixed boundaries, values falling outside the boundaries are clipped.
+        Signals can be 1D or 2D (one signal per row)
+
+        :param signal: Signal to align
+        :param signal_max: Value aligned to 1
+        :param signal_min: Value aligned to -1
+        :param out: Optional float64 array in which the result is stored
+        :return: Aligned signal
+        """
+        signal = np.asarray(signal, dtype=np.float64)
+
+        out = np.subtract(signal, signal_min, out=out)
+        out *= 2
+        out /= ((signal_max - signal_min) or 1)
+        out -= 1
+
+        return np.clip(out, -1, 1, out=out)
 
-        for i in range(len(signal)):
-            signal_normalised[i] = 2*(signal[i] - signal_min) / ((signal_max - signal_min) or 1)-1
+    @staticmethod
+    def normalise_zero_one(signal, out=None):
+        signal = np.asarray(signal, dtype=np.float64)
+        signal_min, signal_range = MATH_tools.calc_signal_bounds(signal)
+
+        out = np.subtract(signal, signal_min, out=out)
+        out /= signal_range
+
+        return out
+
+    @staticmethod
+    def normalise_minus_one_one(signal, out=None):
+        signal = np.asarray(signal, dtype=np.float64)
+        signal_min, signal_range = MATH_tools.calc_signal_bounds(signal)
+
+        out = np.subtract(signal, signal_min, out=out)
+        out *= 2
+        out /= signal_range
+        out -= 1
+
+        return out
+
+    @staticmethod
+    def normalise_minus_x_x(signal, x, out=None):
+        signal = np.asarray(signal, dtype=np.float64)
+        signal_min, signal_range = MATH_tools.calc_signal_bounds(signal)
 
-        for i in range(len(signal_normalised)):
-            if signal_normalised[i] > 1:
-                signal_normalised[i] = 1
+        out = np.subtract(signal, signal_min, out=out)
+        out *= x
+        out /= signal_range
+        out -= x/2
 
-            elif signal_normalised[i] < -1:
-                signal_normalised[i] = -1
+        return out
 
-        return signal_normalised
+    @staticmethod
+    def amplify(signal, amplification_factor, out=None):
+        signal = np.asarray(signal, dtype=np.float64)
+
+        return np.multiply(signal, amplification_factor, out=out)
 
+    # ---------------------------------------------- Batched (2D) variants
     @staticmethod
-    def normalise_zero_one(signal):
-        signal_normalised = np.zeros(len(signal))
-
-        signal_min = min(signal)
-        signal_max = max(signal)
-        
-        for i in range(len(signal)):
-            signal_normalised[i] = (signal[i]-signal_min)/((signal_max-signal_min) or 1)
-        
-        return signal_normalised
-    
+    def normalise_zero_one_rows(signals, out=None):
+        """
+        Normalise each row of a 2D array between 0 and 1
+
+        :param signals: 2D array, one signal per row
+        :param out: Optional float64 array in which the result is stored
+        :return: Normalised signals
+        """
+        signals = np.asarray(signals, dtype=np.float64)
+        signals_min, signals_range = MATH_tools.calc_signal_bounds(signals, axis=1)
+
+        out = np.subtract(signals, signals_min, out=out)
+        out /= signals_range
+
+        return out
+
     @staticmethod
-    def normalise_minus_one_one(signal):
-        signal_normalised = np.zeros(len(signal))
+    def normalise_minus_one_one_rows(signals, out=None):
+        """
+        Normalise each row of a 2D array between -1 and 1
 
-        signal_min = min(signal)
-        signal_max = max(signal)
+        :param signals: 2D array, one signal per row
+        :param out: Optional float64 array in which the result is stored
+        :return: Normalised signals
+        """
+        signals = np.asarray(signals, dtype=np.float64)
+        signals_min, signals_range = MATH_tools.calc_signal_bounds(signals, axis=1)
 
-        for i in range(len(signal)):
-            signal_normalised[i] = 2*(signal[i] - signal_min) / ((signal_max - signal_min) or 1)-1
+        out = np.subtract(signals, signals_min, out=out)
+        out *= 2
+        out /= signals_range
+        out -= 1
 
-        return signal_normalised
+        return out
 
     @staticmethod
-    def normalise_minus_x_x(signal, x):
-        signal_normalised = np.zeros(len(signal))
+    def normalise_minus_x_x_rows(signals, x, out=None):
+        """
+        Normalise each row of a 2D array between -x/2 and x/2
 
-        signal_min = min(signal)
-        signal_max = max(signal)
+        :param signals: 2D array, one signal per row
+        :param x: Range of the normalised signals
+        :param out: Optional float64 array in which the result is stored
+        :return: Normalised signals
+        """
+        signals = np.asarray(signals, dtype=np.float64)
+        signals_min, signals_range = MATH_tools.calc_signal_bounds(signals, axis=1)
 
-        for i in range(len(signal)):
-            signal_normalised[i] = x*(signal[i] - signal_min) / ((signal_max - signal_min) or 1)-x/2
+        out = np.subtract(signals, signals_min, out=out)
+        out *= x
+        out /= signals_range
+        out -= x/2
 
-        return signal_normalised
+        return out
 
     @staticmethod
-    def amplify(signal, amplification_factor):
+    def calc_signal_bounds(signal, axis=None):
+        """
+        Compute the minimum and range of a signal (or of each row of a 2D array if axis=1).
+        Null ranges are replaced by 1
+
+        NaN values are handled as by the builtin min/max: they are ignored, unless the signal starts with a NaN
+        (in which case the bounds, and thus the whole normalised signal, are NaN)
+
+        :return: Signal min, signal range
+        """
+        if axis is None:
+            if np.isnan(signal[0]):
+                return np.nan, np.nan
+
+            signal_min = np.fmin.reduce(signal)
+            signal_range = (np.fmax.reduce(signal) - signal_min) or 1
 
-        signal_amplified = np.zeros(len(signal))
+        else:
+            leading_nan = np.isnan(signal[:, :1])
 
-        for i in range(len(signal)):
-            signal_amplified[i] = signal[i]*amplification_factor
+            signal_min = np.where(leading_nan, np.nan, np.fmin.reduce(signal, axis=axis, keepdims=True))
+            signal_range = np.fmax.reduce(signal, axis=axis, keepdims=True) - signal_min
+            signal_range[signal_range == 0] = 1
 
-        return signal_amplified
+        return signal_min, signal_range
 
     @staticmethod
     def best_fit(X, Y):
@@ -2,10 +2,27 @@
 ################################################################################################################
 """
 Used to running a task in parallel on multiple cores
+
+The Evaluation_pool is a persistent pool of workers (kept alive across generations) used to evaluate populations
+of individuals. Two backends are available:
+    - "process": evaluation split across worker processes (requires the run script to be protected by
+                 an if __name__ == "__main__" guard on platforms using the spawn start method, ie: Windows)
+    - "thread": evaluation split across worker threads (the shared dataset registry and data slice caches are
+                protected by locks, the evaluation itself remains bound by the GIL)
+
+The "process" backend falls back to "serial" when ran from a daemonic process (ie: multiprocessing.Pool workers,
+see MULTIPROCESSING_run), which is not allowed to create child processes.
+
+Individuals are sent to the workers in chunks of similar evaluation cost, and the workers only return the
+metrics of each individual (net worth, buy/sell counts and confusion matrix analysis).
 """
 
 # Built-in/Generic Imports
-from multiprocessing import Pool
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Own modules
+from PhyTrade.Settings.Settings_snapshot import get_settings_snapshot, set_settings_snapshot
 
 __version__ = '1.1.1'
 __author__ = 'Victor Guillet'
@@ -14,60 +31,190 @@ __date__ = '10/09/2019'
 ################################################################################################################
 
 
-def multi_process_pool(population_lst, data_slice,  max_worker_processes=6):
-    # -- Multi-process evaluation
+class Evaluation_pool:
+    def __init__(self, backend="process", max_worker_processes=4, chunks_per_worker=3, batch_evaluation=True):
+        """
+        Persistent pool of workers used to evaluate populations
+
+        :param backend: Backend to use ("process", "thread" or "serial")
+        :param max_worker_processes: Maximum number of workers
+        :param chunks_per_worker: Number of chunks the population is split in per worker (used for load balancing)
+        :param batch_evaluation: Generate the economic models of each chunk in batch
+        """
+        self.max_worker_processes = max(1, max_worker_processes)
+        self.chunks_per_worker = chunks_per_worker
+        self.batch_evaluation = batch_evaluation
+        self.backend = self.resolve_backend(backend, self.max_worker_processes)
+
+        # --> Workers are created on first use
+        self.executor = None
+
+    @staticmethod
+    def resolve_backend(backend, max_worker_processes):
+        """
+        Determine the backend that can effectively be used in the current context
+
+        :param backend: Backend requested ("process", "thread" or "serial")
+        :param max_worker_processes: Maximum number of workers
+        :return: Backend
+        """
+        if backend not in ["process", "thread", "serial"]:
+            raise ValueError("Invalid evaluation backend: " + str(backend))
+
+        if max_worker_processes <= 1:
+            return "serial"
+
+        # --> Daemonic processes (ie: multiprocessing.Pool workers) cannot have children, fall back to serial
+        if backend == "process" and multiprocessing.current_process().daemon:
+            return "serial"
+
+        return backend
+
+    def start(self):
+        if self.executor is None:
+            if self.backend == "process":
+                # --> Worker processes are provided with the settings snapshot of the main process
+                self.executor = ProcessPoolExecutor(max_workers=self.max_worker_processes,
+                                                    initializer=set_settings_snapshot,
+                                                    initargs=(get_settings_snapshot(),))
+
+            elif self.backend == "thread":
+                self.executor = ThreadPoolExecutor(max_workers=self.max_worker_processes)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def evaluate(self, population_lst, data_slice, calculate_stats=False):
+        """
+        Evaluate a population on a data slice. The metrics of every individual are stored in its metrics attribute
+
+        :param population_lst: List of individuals
+        :param data_slice: Data slice to evaluate the population on
+        :param calculate_stats: Calculate confusion matrix stats
+        :return: List of Individual_metrics (in population order)
+        """
+        if self.backend == "serial":
+            population_metrics = evaluate_population_chunk(data_slice, population_lst, calculate_stats,
+                                                           self.batch_evaluation)
+
+        else:
+            self.start()
+
+            # --> Split population in chunks of similar cost, most expensive chunks submitted first
+            chunks = gen_cost_balanced_chunks([calc_evaluation_cost(individual, data_slice.slice_size)
+                                               for individual in population_lst],
+                                              self.max_worker_processes*self.chunks_per_worker)
+
+            futures = [self.executor.submit(evaluate_population_chunk,
+                                            data_slice,
+                                            [population_lst[i] for i in chunk],
+                                            calculate_stats,
+                                            self.batch_evaluation) for chunk in chunks]
+
+            population_metrics = [None]*len(population_lst)
+            for chunk, future in zip(chunks, futures):
+                for i, individual_metrics in zip(chunk, future.result()):
+                    population_metrics[i] = individual_metrics
+
+        for individual, individual_metrics in zip(population_lst, population_metrics):
+            individual.metrics = individual_metrics
+
+        return population_metrics
+
+
+def evaluate_population_chunk(data_slice, population_chunk, calculate_stats=False, batch_evaluation=True):
+    """
+    Worker function, evaluate a list of individuals and only return their metrics
+    (the evaluation artefacts are discarded once the metrics are generated)
+
+    :param data_slice: Data slice to evaluate the individuals on
+    :param population_chunk: List of individuals
+    :param calculate_stats: Calculate confusion matrix stats
+    :param batch_evaluation: Generate the economic models of the chunk in batch
+    :return: List of Individual_metrics
+    """
+    from PhyTrade.Economic_model.Analysis_protocols.Prototype_5_batch import Prototype_5_batch
+    from PhyTrade.Tools.INDIVIDUAL_gen import perform_batch_trade_run
+
+    population_metrics = []
+
+    if batch_evaluation:
+        batch_analysis = Prototype_5_batch([individual.parameter_dictionary for individual in population_chunk],
+                                           data_slice)
+    else:
+        batch_analysis = None
+
+    for i, individual in enumerate(population_chunk):
+        individual.gen_economic_model(data_slice, batch_analysis=batch_analysis, batch_index=i)
+
+    # --> Backtest the whole chunk at once
+    if batch_evaluation and len(population_chunk) != 0:
+        batch_tradebot = perform_batch_trade_run(population_chunk, data_slice)
+
+    else:
+        batch_tradebot = None
+
+        for individual in population_chunk:
+            individual.perform_trade_run(data_slice)
 
-    def process_ind(individual):
-        print("\n ----------------------------------------------")
-        individual.gen_economic_model(data_slice)
-        individual.perform_trade_run(data_slice)
-        return individual
+    for i, individual in enumerate(population_chunk):
+        population_metrics.append(individual.gen_metrics(data_slice, calculate_stats=calculate_stats,
+                                                         batch_tradebot=batch_tradebot, batch_index=i))
+        individual.discard_evaluation()
 
+    return population_metrics
+
+
+def calc_evaluation_cost(individual, slice_size):
+    """
+    Estimate the relative cost of evaluating an individual: every indicator requires a spline to be fitted over
+    the slice, and its computation window grows with its timeframe
+
+    :param individual: Individual
+    :param slice_size: Size of the data slice evaluated
+    :return: Estimated cost
+    """
+    # --> Indicators + volume and volatility splines
+    spline_count = sum(individual.parameter_dictionary["indicators_count"].values()) + 2
+    timeframes = individual.parameter_dictionary["indicator_properties"]["timeframes"].values()
+
+    return spline_count*slice_size + sum(timeframes)
+
+
+def gen_cost_balanced_chunks(costs, nb_chunks):
+    """
+    Split a list of tasks into chunks of similar total cost (longest processing time first)
+
+    :param costs: List of task costs
+    :param nb_chunks: Maximum number of chunks
+    :return: List of chunks (lists of task indexes), sorted by decreasing cost
+    """
+    nb_chunks = max(1, min(nb_chunks, len(costs)))
+
+    chunks = [[] for _ in range(nb_chunks)]
+    chunks_cost = [0]*nb_chunks
+
+    for i in sorted(range(len(costs)), key=lambda task: costs[task], reverse=True):
+        cheapest_chunk = chunks_cost.index(min(chunks_cost))
+
+        chunks[cheapest_chunk].append(i)
+        chunks_cost[cheapest_chunk] += costs[i]
+
+    chunks = [chunks[i] for i in sorted(range(nb_chunks), key=lambda chunk: chunks_cost[chunk], reverse=True)]
+
+    return [chunk for chunk in chunks if len(chunk) != 0]
+
+
+def multi_process_pool(population_lst, data_slice, max_worker_processes=6):
+    # -- Multi-process evaluation
     print("======================> Start multiprocess")
-    p = Pool(max_worker_processes)
-    results = p.map(process_ind, population_lst)
+    evaluation_pool = Evaluation_pool("process", max_worker_processes)
+    results = evaluation_pool.evaluate(population_lst, data_slice)
 
-    p.close()
-    p.join()
+    evaluation_pool.close()
     print("======================> Finish multiprocess")
     print(results)
 
     return results
-
-    # p0 = Process(target=process, args=tasks)
-    # p1 = Process(target=process, args=tasks)
-    # p2 = Process(target=process, args=tasks)
-    # p3 = Process(target=process, args=tasks)
-    #
-    # p0.start()
-    # p1.start()
-    # p2.start()
-    # p2.start()
-    #
-    # p0.join()
-    # p1.join()
-    # p2.join()
-    # p3.join()
-
-    # # -- Create evaluation queue and fill with population lst
-    # evaluation_queue = queue.Queue(maxsize=len(tasks))
-    # for i in tasks:
-    #     evaluation_queue.put_nowait(i)
-    #
-    # # -- Define worker function for multi-processing
-    # def worker():
-    #     while True:
-    #         item = evaluation_queue.get()
-    #         Process(item)
-    #         print("Parameter set evaluation completed")
-    #         evaluation_queue.task_done()
-    #
-    # # -- Initiate multi-processing process
-    # for i in range(max_worker_processes):
-    #     t = Process(target=worker)
-    #     t.start()
-
-
-    # evaluation_queue.join()  # block until all tasks are done
-
-
@@ -0,0 +1,90 @@
+
+##################################################################################################################
+"""
+Used to memoise the splines fitted to signals (see SPLINE.calc_signal_to_spline). Splines are keyed by a fingerprint
+of the signal along with the smoothing factor, slice size and spline interpolation factor: models sharing a signal
+(same indicator and timeframe on the same data slice, volume signal, etc...) and smoothing factor only fit it once.
+
+The cache is shared by the whole process, the splines it contains are read-only.
+"""
+
+# Built-in/Generic Imports
+import hashlib
+import threading
+from collections import OrderedDict
+
+__version__ = '1.1.1'
+__author__ = 'Victor Guillet'
+__date__ = '10/09/2019'
+
+##################################################################################################################
+
+
+class Spline_cache:
+    def __init__(self, max_size=2000):
+        """
+        LRU cache of fitted and evaluated splines
+
+        :param max_size: Maximum number of splines kept in memory (0 to disable)
+        """
+        self.max_size = max_size
+
+        # --> Key: spline, ordered from least to most recently used
+        self.content = OrderedDict()
+
+        # --> Splines can be fetched from evaluation threads
+        self.lock = threading.Lock()
+
+        # --> Counters
+        self.hit_count = 0
+        self.miss_count = 0
+        self.eviction_count = 0
+
+    @staticmethod
+    def gen_key(big_data, signal, smoothing_factor):
+        """
+        Generate the cache key of the spline of a signal
+
+        :param big_data: BIGDATA class instance
+        :param signal: float64 numpy array
+        :param smoothing_factor: Smoothing factor of the spline
+        :return: Key
+        """
+        return (hashlib.blake2b(signal.tobytes(), digest_size=16).digest(), len(signal),
+                smoothing_factor, len(big_data.spline_x), big_data.spline_multiplication_coef)
+
+    def get(self, key):
+        """
+        :return: Cached spline, None if missing
+        """
+        with self.lock:
+            if key in self.content:
+                self.hit_count += 1
+                self.content.move_to_end(key)
+                return self.content[key]
+
+            self.miss_count += 1
+            return None
+
+    def record(self, key, spline):
+        spline.setflags(write=False)
+
+        with self.lock:
+            self.content[key] = spline
+            self.content.move_to_end(key)
+
+            while len(self.content) > self.max_size:
+                self.content.popitem(last=False)
+                self.eviction_count += 1
+
+    def clear(self):
+        with self.lock:
+            self.content.clear()
+
+    def __str__(self):
+        return "Spline cache: " + str(len(self.content)) + " splines, hits - " + str(self.hit_count) \
+               + ", misses - " + str(self.miss_count) + ", evictions - " + str(self.eviction_count)
+
+
+# --> Cache shared by the whole process
+spline_cache = Spline_cache()
@@ -7,6 +7,11 @@ This script contains tools for smoothing out and adding up signals, using interp
 # Libs
 import numpy as np
 
+# Own modules
+from PhyTrade.Tools.SPLINE_cache import spline_cache
+from PhyTrade.Tools.JIT_tools import gen_kernel_input, gen_kernel_output, \
+    calc_dynamic_upper_threshold, calc_dynamic_lower_threshold, calc_trade_signal
+
 __version__ = '1.1.1'
 __author__ = 'Victor Guillet'
 __date__ = '11/28/2018'
@@ -26,23 +31,33 @@ class SPLINE:
 
     @staticmethod
     def calc_signal_to_spline(big_data, signal, smoothing_factor=0.7):
+        """
+        Fit a spline to a signal and evaluate it over the spline points, splines are memoised (see SPLINE_cache)
+
+        :param big_data: BIGDATA class instance
+        :param signal: Signal (one value per day of the data slice)
+        :param smoothing_factor: Smoothing factor of the spline
+        :return: Spline (copy)
+        """
         from scipy.interpolate import UnivariateSpline
 
-        y = signal
-        spline_x = UnivariateSpline(big_data.spline_x, y)
-        spline_x.set_smoothing_factor(smoothing_factor)
+        y = np.asarray(signal, dtype=np.float64)
 
-        spline = spline_x(big_data.spline_xs)
+        key = spline_cache.gen_key(big_data, y, smoothing_factor)
+        spline = spline_cache.get(key)
 
-        # Limiting the magnitude of the signal when it reaches values above 1 or below -1
-        for i in range(len(spline)):
-            if spline[i] > 1:
-                spline[i] = 1
+        if spline is None:
+            spline_x = UnivariateSpline(big_data.spline_x, y)
+            spline_x.set_smoothing_factor(smoothing_factor)
 
-            if spline[i] < -1:
-                spline[i] = -1
+            spline = spline_x(big_data.spline_xs)
 
-        return spline
+            # Limiting the magnitude of the signal when it reaches values above 1 or below -1
+            np.clip(spline, -1, 1, out=spline)
+
+            spline_cache.record(key, spline)
+
+        return spline.copy()
 
     @staticmethod
     def combine_splines(spline_array, weights_array):
@@ -127,7 +142,6 @@ class SPLINE:
                         threshold_setting=1, buffer_setting=0):
         # -------------------------WEIGHTED BUFFER DEFINITION-----------------
         from PhyTrade.Data_Collection_preparation.Data_sources.Google_trends import pull_google_trends_data
-        from PhyTrade.Tools.MATH_tools import MATH_tools
 
         """        
         Buffer settings:
@@ -183,7 +197,57 @@ class SPLINE:
             upper_threshold = [standard_upper_threshold]*len(big_data.spline_xs)
             lower_threshold = [standard_lower_threshold] * len(big_data.spline_xs)
 
-        elif threshold_setting == 1:
+        elif threshold_setting in (1, 2):
+            upper_variation, lower_variation = \
+                SPLINE.calc_threshold_variations(big_data, bband_timeframe=bband_timeframe,
+                                                 threshold_setting=threshold_setting)
+
+            upper_threshold = standard_upper_threshold + standard_upper_threshold*0.5*upper_variation
+            lower_threshold = standard_lower_threshold - standard_upper_threshold*0.5*lower_variation
+
+        # ---- Define upper and lower dynamic bounds (compiled kernels when available)
+        spline = gen_kernel_input(spline)
+        spline_buffer = gen_kernel_input(spline_buffer)
+        upper_threshold = gen_kernel_input(upper_threshold)
+        lower_threshold = gen_kernel_input(lower_threshold)
+
+        calc_dynamic_upper_threshold(spline, upper_threshold, spline_buffer, buffer)
+        calc_dynamic_lower_threshold(spline, lower_threshold, spline_buffer, buffer)
+
+        upper_threshold = np.array(upper_threshold)
+        lower_threshold = np.array(lower_threshold)
+
+        return upper_threshold, lower_threshold
+
+    @staticmethod
+    def calc_threshold_variations(big_data, bband_timeframe=15, threshold_setting=1):
+        """
+        Fetch the variation splines applied to the standard thresholds by the Bollinger band based threshold
+        settings. The variations only depend on the data slice, they are generated once per slice and shared
+        (read-only) by all the models using the same settings
+
+        :param big_data: BIGDATA class instance
+        :param bband_timeframe: Timeframe of the Bollinger bands
+        :param threshold_setting: 1: bands spread, 2: price distance to the bands
+        :return: Upper threshold variation spline, lower threshold variation spline
+        """
+        return big_data.data_slice.fetch_slice_artefact(("threshold_variations", bband_timeframe, threshold_setting,
+                                                         big_data.spline_multiplication_coef),
+                                                        lambda: SPLINE.gen_threshold_variations(big_data,
+                                                                                                bband_timeframe,
+                                                                                                threshold_setting))
+
+    @staticmethod
+    def gen_threshold_variations(big_data, bband_timeframe=15, threshold_setting=1):
+        """
+        Compute the variation splines applied to the standard thresholds by the Bollinger band based threshold
+        settings (see calc_threshold_variations)
+
+        :return: Read-only upper threshold variation spline, read-only lower threshold variation spline
+        """
+        from PhyTrade.Tools.MATH_tools import MATH_tools
+
+        if threshold_setting == 1:
             bbands_df = big_data.data_slice.data[big_data.data_slice.start_index - bband_timeframe:big_data.data_slice.stop_index]
             mean_avg = bbands_df[big_data.data_slice.selection].rolling(window=bband_timeframe).mean()
             standard_dev = bbands_df[big_data.data_slice.selection].rolling(window=bband_timeframe).std()
@@ -202,9 +266,9 @@ class SPLINE:
             lower_band_spline = SPLINE(big_data).calc_signal_to_spline(big_data, lower_band_normalised)
 
             difference_band_spline = abs(upper_band_spline-lower_band_spline)
+            difference_band_spline.setflags(write=False)
 
-            upper_threshold = standard_upper_threshold + standard_upper_threshold*0.5*difference_band_spline
-            lower_threshold = standard_lower_threshold - standard_upper_threshold*0.5*difference_band_spline
+            return difference_band_spline, difference_band_spline
 
         elif threshold_setting == 2:
             bbands_df = big_data.data_slice.data[big_data.data_slice.start_index - bband_timeframe:big_data.data_slice.stop_index]
@@ -227,136 +291,31 @@ class SPLINE:
             upper_band_price_diff_spline = SPLINE(big_data).calc_signal_to_spline(big_data, upper_band_price_diff_normalised)
             lower_band_price_diff_spline = SPLINE(big_data).calc_signal_to_spline(big_data, lower_band_price_diff_normalised)
 
-            upper_threshold = standard_upper_threshold + standard_upper_threshold*0.5*upper_band_price_diff_spline
-            lower_threshold = standard_lower_threshold - standard_upper_threshold*0.5*lower_band_price_diff_spline
+            upper_band_price_diff_spline.setflags(write=False)
+            lower_band_price_diff_spline.setflags(write=False)
 
-        # ---- Define upper dynamic bound method
-        max_prev = 1
-        freeze_trade = False
-        for i in range(len(spline)):
-            if spline[i] < upper_threshold[i]:
-                max_prev = 1
-                freeze_trade = False
-
-            if spline[i] > (upper_threshold[i] + (buffer * spline_buffer[i])) and freeze_trade is False or spline[i] > max_prev:
-                new_upper_threshold = spline[i] - (buffer * spline_buffer[i])
-                if new_upper_threshold >= upper_threshold[i - 1]:
-                    upper_threshold[i] = new_upper_threshold
-
-                elif spline[i] < upper_threshold[i - 1]:
-                    max_prev = spline[i]
-                    freeze_trade = True
-
-                else:
-                    max_prev = spline[i]
-                    upper_threshold[i] = upper_threshold[i - 1]
-
-        # ---- Define lower dynamic bound method
-        min_prev = -1
-        freeze_trade = False
-        for i in range(len(spline)):
-            if spline[i] > lower_threshold[i]:
-                min_prev = -1
-                freeze_trade = False
+            return upper_band_price_diff_spline, lower_band_price_diff_spline
 
-            if spline[i] < (lower_threshold[i] - (buffer * spline_buffer[i])) and freeze_trade is False or spline[i] < min_prev:
-                new_lower_threshold = spline[i] + (buffer * spline_buffer[i])
-                if new_lower_threshold <= lower_threshold[i - 1]:
-                    lower_threshold[i] = new_lower_threshold
-
-                elif spline[i] > lower_threshold[i - 1]:
-                    min_prev = spline[i]
-                    freeze_trade = True
-
-                else:
-                    min_prev = spline[i]
-                    lower_threshold[i] = lower_threshold[i - 1]
-
-        return upper_threshold, lower_threshold
+        else:
+            raise ValueError("Invalid Bollinger band threshold setting: " + str(threshold_setting))
 
     @staticmethod
     def calc_trading_spline(big_data, spline, upper_threshold, lower_threshold):
         # Listing out point of spline which are date points
-        trade_spline = []
-        trade_upper_threshold = []
-        trade_lower_threshold = []
-
-        for i in range(0, len(spline), big_data.spline_multiplication_coef):
-            trade_spline.append(spline[i])
-            trade_upper_threshold.append(upper_threshold[i])
-            trade_lower_threshold.append(lower_threshold[i])
-
-        trade_signal = np.zeros(len(trade_spline))
-        # Buy and sell triggers can take three values:
-        # 0 for neutral, 1 for sell at next bound crossing and 2 for post-sell
-        sell_trigger = 0
-        buy_trigger = 0
-
-        max_prev = None
-        min_prev = None
-
-        back_range = 1
-
-        # Defining indicator trigger for...
-        for i in range(big_data.data_slice.slice_size):
-            # print("Sell: ({0})  {1:.3f} | {2:.3f} | {3:.3f}  ({4}) :Buy".format(sell_trigger, round(trade_upper_threshold[i], 3), round(trade_spline[i], 3), round(trade_lower_threshold[i], 3), round(buy_trigger)))
-
-            if sell_trigger == 1 or buy_trigger == 1:
-                back_range += 1
-
-            if trade_spline[i] > 0:
-                # ...upper bound
-                if trade_spline[i] >= trade_upper_threshold[i] and sell_trigger == 0:    # Initiate sell trigger
-                    sell_trigger = 1
-                    continue
-
-                if trade_spline[i] <= max(list(trade_upper_threshold[i-j] for j in range(back_range))) and sell_trigger == 1:   # Initiate sell trigger
-                    trade_signal[i] = 1
-                    max_prev = trade_spline[i]
-                    sell_trigger = 2
-
-                    back_range = 1
-                    continue
-
-                if trade_spline[i] <= trade_upper_threshold[i] and sell_trigger == 2:   # Reset trigger
-                    max_prev = None
-                    sell_trigger = 0
-                    continue
-
-                if max_prev is not None:  # Re-initiate sell trigger if signal increase past previous max
-                    if trade_spline[i] > max_prev and sell_trigger == 2:
-                        sell_trigger = 1
-                        max_prev = None
-
-            else:
-                # ...lower bound
-                if trade_spline[i] <= trade_lower_threshold[i] and buy_trigger == 0:     # Initiate buy trigger
-                    buy_trigger = 1
-                    continue
-
-                if trade_spline[i] >= min(list(trade_lower_threshold[i-j] for j in range(back_range))) and buy_trigger == 1:    # Initiate sell trigger
-                    trade_signal[i] = -1
-                    min_prev = trade_spline[i]
-                    buy_trigger = 2
-
-                    back_range = 1
-                    continue
-
-                if trade_spline[i] >= trade_lower_threshold[i] and buy_trigger == 2:    # Reset trigger
-                    min_prev = None
-                    buy_trigger = 0
-                    continue
-
-                if min_prev is not None:        # Re-initiate buy trigger if signal decrease past previous min
-                    if trade_spline[i] < min_prev and buy_trigger == 2:
-                        buy_trigger = 1
-                        min_prev = None
-
-        if buy_trigger == 1:
-            trade_signal[-1] = -1
-
-        if sell_trigger == 1:
-            trade_signal[-1] = 1
+        trade_spline = np.array(spline, dtype=np.float64)[::big_data.spline_multiplication_coef]
+        trade_upper_threshold = np.asarray(upper_threshold, dtype=np.float64)[::big_data.spline_multiplication_coef]
+        trade_lower_threshold = np.asarray(lower_threshold, dtype=np.float64)[::big_data.spline_multiplication_coef]
+
+        # --> Generate trade signal (compiled kernel when available)
+        trade_signal = gen_kernel_output(len(trade_spline))
+
+        calc_trade_signal(trade_signal,
+                          gen_kernel_input(trade_spline),
+                          gen_kernel_input(trade_upper_threshold),
+                          gen_kernel_input(trade_lower_threshold),
+                          big_data.data_slice.slice_size)
+
+        trade_signal = np.array(trade_signal)
 
         return trade_signal, trade_spline
 
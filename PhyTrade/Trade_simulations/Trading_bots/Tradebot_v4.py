@@ -9,7 +9,7 @@ Input that still require manual input:
 """
 
 # Own modules
-from PhyTrade.Settings.SETTINGS import SETTINGS
+from PhyTrade.Settings.Settings_snapshot import get_settings_snapshot
 from PhyTrade.Trade_simulations.Tools.S_ACCOUNT_gen import ACCOUNT
 
 __version__ = '1.1.1'
@@ -62,9 +62,7 @@ class Tradebot_v4:
         # ============================ TRADE_BOT ATTRIBUTES ============================
         # ~~~~~~~~~~~~~~~~ Settings ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # ---- Fetch tradebot settings
-        settings = SETTINGS()
-        settings.tradebot_settings.gen_tradebot_settings()
-        settings.market_settings.gen_market_settings()
+        settings = get_settings_snapshot()
 
         # --> Simple investment settings
         self.s_initial_investment = initial_funds
@@ -109,9 +107,17 @@ class Tradebot_v4:
         else:
             self.account.simple_investment_assets = prev_simple_investment_assets
 
+        # --> Running max of the net worth history (one net worth is recorded per day)
+        max_net_worth = None
+
         for i in range(len(self.trade_actions)):
             if self.print_trade_process:
                 print("----------------- Day ", i)
+
+            if len(self.account.net_worth_history) != 0 \
+                    and (max_net_worth is None or self.account.net_worth_history[-1] > max_net_worth):
+                max_net_worth = self.account.net_worth_history[-1]
+
             # ~~~~~~~~~~~~~~~~~~ Calculate simple investment value
             self.account.calc_simple_investment_value(self.daily_values[i])
 
@@ -171,7 +177,7 @@ class Tradebot_v4:
             # --> WRT max_net_worth and/or prev_net_worth
             if not len(self.account.net_worth_history) == 0 and \
                     self.account.calc_net_worth(self.daily_values[i]) < \
-                    max(self.account.net_worth_history) * self.max_stop_loss and \
+                    max_net_worth * self.max_stop_loss and \
                     not self.account.current_assets == 0 \
                     or\
                     not len(self.account.net_worth_history) == 0 and \
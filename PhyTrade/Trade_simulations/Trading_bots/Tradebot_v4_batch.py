@@ -0,0 +1,245 @@
+
+################################################################################################################
+"""
+Array based version of Tradebot_v4, used to simulate the trade runs of multiple trade signals over the same daily
+values at once (ie: an entire population in the EVOA). The accounts of all the trade runs are stepped through the
+days together, every daily operation being applied to all accounts with a single array operation. The results are
+identical to the ones of a Tradebot_v4 run on each trade signal.
+
+The max net worth used by the stop-loss is tracked as a running max, and the transaction costs are computed from
+the process-wide settings snapshot. In fitness-only mode (record_history=False), only the final net worth
+and the buy/sell/stop-loss counts of every trade run are generated.
+"""
+
+# Libs
+import numpy as np
+
+# Own modules
+from PhyTrade.Settings.Settings_snapshot import get_settings_snapshot
+
+__version__ = '1.1.1'
+__author__ = 'Victor Guillet'
+__date__ = '10/09/2019'
+
+################################################################################################################
+
+
+class Tradebot_v4_batch:
+    def __init__(self, daily_values,
+                 trade_signals, trade_splines=None,
+                 investment_settings=1, cash_in_settings=0,
+                 initial_funds=1000,
+                 initial_assets=0,
+                 prev_stop_loss=0.85, max_stop_loss=0.75,
+                 max_investment_per_trade=50000,
+                 prev_simple_investment_assets=None,
+                 record_history=False):
+        """
+        Used to simulate the trade runs of multiple trade signals (see Tradebot_v4 for the investment and cash-in settings)
+
+        :param daily_values: Daily values of the stock (days)
+        :param trade_signals: Trade signals, one per row (trade runs x days)
+        :param trade_splines: Trade splines, one per row (trade runs x days), required for the settings pegged to signal strength
+        :param investment_settings: Investing protocol
+        :param cash_in_settings: Cash-in protocol
+        :param initial_funds: Initial funds to be used
+        :param initial_assets: Initial assets to be used
+        :param prev_stop_loss: Stop loss as % of previous day value
+        :param max_stop_loss: Stop loss as % of max worth achieved
+        :param max_investment_per_trade: Maximum investment per trade allowed
+        :param prev_simple_investment_assets: Number of shares from previous simple investment, keep to None to start new simple investment
+        :param record_history: Record the funds/assets/net worth history of every trade run (fitness-only mode if False)
+        """
+
+        # ============================ TRADE_BOT ATTRIBUTES ============================
+        # ~~~~~~~~~~~~~~~~ Settings ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # ---- Fetch tradebot settings
+        settings = get_settings_snapshot()
+
+        # --> Investment settings
+        fixed_investment = settings.tradebot_settings.fixed_investment
+        investment_percentage = settings.tradebot_settings.investment_percentage
+
+        asset_liquidation_percentage = settings.tradebot_settings.asset_liquidation_percentage
+
+        # --> Broker settings
+        self.min_transaction_cost = settings.min_transaction_cost
+        self.transaction_cost_per_share = settings.transaction_cost_per_share
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # -- Daily stock prices
+        self.daily_values = np.asarray(daily_values, dtype=np.float64)
+
+        # -- Trade actions and splines
+        self.trade_actions = np.atleast_2d(np.asarray(trade_signals, dtype=np.float64))
+
+        if trade_splines is not None:
+            self.trade_splines = np.atleast_2d(np.asarray(trade_splines, dtype=np.float64))
+        else:
+            self.trade_splines = None
+
+        nb_of_runs, nb_of_days = self.trade_actions.shape
+
+        # -- Tradebot finance
+        self.initial_funds = initial_funds
+        self.initial_assets = initial_assets
+
+        self.current_funds = np.full(nb_of_runs, initial_funds, dtype=np.float64)
+        self.current_assets = np.full(nb_of_runs, initial_assets, dtype=np.float64)
+
+        self.buy_count = np.zeros(nb_of_runs, dtype=np.int64)
+        self.sell_count = np.zeros(nb_of_runs, dtype=np.int64)
+        self.stop_loss_count = np.zeros(nb_of_runs, dtype=np.int64)
+
+        # --> Last and max net worth recorded
+        self.net_worth = np.full(nb_of_runs, np.nan)
+        self.max_net_worth = np.full(nb_of_runs, np.nan)
+        recorded = np.zeros(nb_of_runs, dtype=bool)
+
+        self.record_history = record_history
+
+        if self.record_history:
+            self.funds_history = np.full((nb_of_runs, nb_of_days), np.nan)
+            self.assets_history = np.full((nb_of_runs, nb_of_days), np.nan)
+            self.net_worth_history = np.full((nb_of_runs, nb_of_days), np.nan)
+
+        # ==============================================================================
+        """
+
+
+
+
+        """
+        # ============================ TRADE PROTOCOL DEF ==============================
+        # ~~~~~~~~~~~~~~~~~~ Initiate simple investment
+        if prev_simple_investment_assets is None:
+            self.simple_investment_assets = initial_funds/self.daily_values[0]
+        else:
+            self.simple_investment_assets = prev_simple_investment_assets
+
+        if self.record_history:
+            self.simple_investment_net_worth = self.simple_investment_assets*self.daily_values[:nb_of_days]
+
+        for i in range(nb_of_days):
+            current_value = self.daily_values[i]
+            trade_actions = self.trade_actions[:, i]
+
+            # ~~~~~~~~~~~~~~~~~~ Define the investment per trade
+            # --> Fixed investment value per trade
+            if investment_settings == 0:
+                investment_per_trade = np.where(self.current_funds >= fixed_investment, fixed_investment, self.current_funds)
+
+            # --> Fixed investment percentage per trade
+            elif investment_settings == 1:
+                investment_per_trade = self.current_funds*investment_percentage
+
+            # --> Fixed investment value per trade pegged to signal strength
+            elif investment_settings == 2:
+                investment_per_trade = -((self.trade_splines[:, i]-1)*fixed_investment)
+
+            # --> Fixed investment percentage per trade pegged to signal strength
+            elif investment_settings == 3:
+                investment_per_trade = -((self.trade_splines[:, i]-1)*self.current_funds*investment_percentage)
+
+            else:
+                investment_per_trade = np.zeros(nb_of_runs)
+
+            # ----> Limit max investment per trade
+            investment_per_trade = np.where(investment_per_trade > max_investment_per_trade,
+                                            max_investment_per_trade, investment_per_trade)
+
+            # ~~~~~~~~~~~~~~~~~~ Define the assets sold per trade
+            # --> Total asset liquidation
+            if cash_in_settings == 0:
+                assets_sold_per_trade = self.current_assets
+
+            # --> Fixed asset liquidation percentage
+            elif cash_in_settings == 1:
+                assets_sold_per_trade = self.current_assets*asset_liquidation_percentage
+
+            # --> Asset liquidation percentage per trade pegged to signal strength
+            elif cash_in_settings == 2:
+                assets_sold_per_trade = (self.trade_splines[:, i]+1)*self.current_assets*asset_liquidation_percentage
+
+            else:
+                assets_sold_per_trade = np.full(nb_of_runs, 1000000.)
+
+            # ~~~~~~~~~~~~~~~~~~ Define trade protocol
+            # ----- Define stop-loss action
+            # --> WRT max_net_worth and/or prev_net_worth
+            current_net_worth = self.current_funds + self.current_assets*current_value
+
+            stop_loss = recorded & (self.current_assets != 0) \
+                & ((current_net_worth < self.max_net_worth*max_stop_loss)
+                   | (current_net_worth < self.net_worth*prev_stop_loss))
+
+            # ----- Define hold/buy/sell actions
+            hold = ~stop_loss & (trade_actions == 0)
+            buy_action = ~stop_loss & (trade_actions == -1)
+            sell_action = ~stop_loss & (trade_actions == 1)
+
+            buy = buy_action & (self.current_funds != 0)
+            sell = sell_action & (self.current_assets != 0)
+
+            # --> Buy orders
+            self.convert_funds_to_assets(buy, current_value, investment_per_trade)
+
+            # --> Sell orders (stop-loss liquidate all assets)
+            self.convert_assets_to_funds(stop_loss | sell, current_value,
+                                         np.where(stop_loss, self.current_assets, assets_sold_per_trade))
+
+            self.buy_count += buy
+            self.sell_count += sell
+            self.stop_loss_count += stop_loss
+
+            # ----- Record net worth
+            record = stop_loss | hold | buy_action | sell_action
+            net_worth = self.current_funds + self.current_assets*current_value
+
+            self.max_net_worth = np.where(record & (~recorded | (net_worth > self.max_net_worth)),
+                                          net_worth, self.max_net_worth)
+            self.net_worth = np.where(record, net_worth, self.net_worth)
+            recorded |= record
+
+            if self.record_history:
+                self.funds_history[:, i] = np.where(record, self.current_funds, np.nan)
+                self.assets_history[:, i] = np.where(record, self.current_assets, np.nan)
+                self.net_worth_history[:, i] = np.where(record, net_worth, np.nan)
+
+    def convert_funds_to_assets(self, orders, current_value, investment_per_trade):
+        """
+        Used to perform buy operations on the accounts of the trade runs placing an order
+
+        :param orders: Boolean array of the trade runs placing an order
+        :param current_value: Current value of the stock brought
+        :param investment_per_trade: Amount of investment to be performed by each trade run
+        """
+        # --> Calculate transaction cost
+        self.current_funds = np.where(orders,
+                                      self.current_funds - self.calc_transaction_cost(investment_per_trade/current_value),
+                                      self.current_funds)
+
+        # --> Create order
+        self.current_funds = np.where(orders, self.current_funds - investment_per_trade, self.current_funds)
+        self.current_assets = np.where(orders, self.current_assets + investment_per_trade/current_value, self.current_assets)
+
+    def convert_assets_to_funds(self, orders, current_value, assets_sold_per_trade):
+        """
+        Used to perform sell operations on the accounts of the trade runs placing an order
+
+        :param orders: Boolean array of the trade runs placing an order
+        :param current_value: Current value of the stock sold
+        :param assets_sold_per_trade: Amount of assets to be sold by each trade run
+        """
+        # --> Calculate transaction cost
+        self.current_funds = np.where(orders,
+                                      self.current_funds - self.calc_transaction_cost(assets_sold_per_trade/current_value),
+                                      self.current_funds)
+
+        self.current_funds = np.where(orders, self.current_funds + assets_sold_per_trade*current_value, self.current_funds)
+        self.current_assets = np.where(orders, self.current_assets - assets_sold_per_trade, self.current_assets)
+
+    def calc_transaction_cost(self, asset_counts):
+        transaction_costs = asset_counts*self.transaction_cost_per_share
+
+        return np.where(transaction_costs < self.min_transaction_cost, self.min_transaction_cost, transaction_costs)
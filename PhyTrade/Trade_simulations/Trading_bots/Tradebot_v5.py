@@ -9,7 +9,7 @@ Input that still require manual input:
 """
 
 # Own modules
-from PhyTrade.Settings.Tradebot_settings import Tradebot_settings
+from PhyTrade.Settings.Settings_snapshot import get_settings_snapshot
 from PhyTrade.Trade_simulations.Tools.ACCOUNT_gen import ACCOUNT
 
 __version__ = '1.1.1'
@@ -60,8 +60,7 @@ class Tradebot_v5:
         # ============================ TRADE_BOT ATTRIBUTES ============================
         # ~~~~~~~~~~~~~~~~ Settings ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # ---- Fetch tradebot settings
-        settings = Tradebot_settings()
-        settings.gen_tradebot_settings()
+        settings = get_settings_snapshot().tradebot_settings
 
         # --> Simple investment settings
         self.s_initial_investment = settings.s_initial_investment